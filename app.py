@@ -1,17 +1,27 @@
 import streamlit as st
-import psycopg2
 import pandas as pd
-from config import DATABASE_URL
-from database import fetch_all_data, authenticate_user
-from cases_tab import render_cases_tab
-from demographics_tab import render_demographics_tab
-from children_tab import render_children_tab
-from case_lookup_tab import render_case_lookup_tab
-from jamati_member_lookup_tab import render_jamati_member_lookup_tab
+from database import authenticate_user
+from data_store import load_data_snapshot, load_fdp_cases, refresh_data_snapshots
+from cases_tab import render_cases_tab, REQUIRED_TABLES as CASES_TABLES
+from demographics_tab import render_demographics_tab, REQUIRED_TABLES as DEMOGRAPHICS_TABLES
+from children_tab import render_children_tab, REQUIRED_TABLES as CHILDREN_TABLES
+from case_lookup_tab import render_case_lookup_tab, REQUIRED_TABLES as CASE_LOOKUP_TABLES
+from jamati_member_lookup_tab import render_jamati_member_lookup_tab, REQUIRED_TABLES as MEMBER_LOOKUP_TABLES
+from diagnostics_panel import (
+    is_admin,
+    render_cache_diagnostics,
+    render_compaction_diagnostics,
+    render_query_diagnostics,
+    render_rerun_profile,
+)
+from render_profiler import finish_rerun, profiled, start_rerun
 
 # Set page config to wide layout to reduce padding
 st.set_page_config(layout="wide")
 
+# Times this rerun when render_profiling is on (no-op otherwise)
+start_rerun()
+
 # Custom CSS to further reduce padding
 st.markdown("""
 <style>
@@ -73,62 +83,23 @@ def render_login():
             else:
                 st.warning("Please enter both email and password.")
 
+@profiled
+def load_tab_frames(tables):
+    """Return {table: frame} for the user's regions, loading any table not yet in memory"""
+    snapshot = load_data_snapshot(
+        allowed_regions=st.session_state.user_regions if st.session_state.user_regions else None,
+        tables=tables
+    )
+    if snapshot is None:
+        st.error("Failed to fetch data from the database. Please check your connection.")
+        return None
+    return snapshot['frames']
+
+@profiled
 def load_fdp_data(allowed_regions=None):
-    """Load and process FDP data"""
+    """Load the normalized FDP cases for the given regions"""
     try:
-        conn_fdp = psycopg2.connect(DATABASE_URL)
-        
-        # Build region filter if regions are provided
-        if allowed_regions and len(allowed_regions) > 0:
-            placeholders = ','.join(['%s'] * len(allowed_regions))
-            fdp_query = f"SELECT * FROM fdp_cases WHERE region IN ({placeholders})"
-            fdp_raw = pd.read_sql(fdp_query, conn_fdp, params=allowed_regions)
-        else:
-            fdp_query = "SELECT * FROM fdp_cases"
-            fdp_raw = pd.read_sql(fdp_query, conn_fdp)
-        conn_fdp.close()
-        
-        # Map FDP fields to CMS structure
-        fdp_df = fdp_raw.copy()
-        fdp_df = fdp_df.rename(columns={
-            'access_case': 'caseid',
-            'settlement_case_status': 'status',
-            'family_last_name': 'lastname',
-            'head_of_family_first_name': 'firstname',
-            'state_code_2_digits': 'state',
-            'access_case_creation_date': 'creationdate',
-            'settlement_cm': 'assignedto',
-            'phone': 'phonenumber',
-            'current_location': 'city',
-            'zip_code': 'zip'
-        })
-        
-        # Convert creation date to datetime
-        fdp_df['creationdate'] = pd.to_datetime(fdp_df['creationdate'], errors='coerce')
-        
-        # Map status values to CMS equivalents
-        status_mapping = {
-            'Active': 'Open',
-            'Closed': 'Closed',
-            'On Hold': 'Open',
-            'Completed': 'Closed'
-        }
-        fdp_df['status'] = fdp_df['status'].map(status_mapping).fillna(fdp_df['status'])
-        
-        # Ensure required columns exist
-        required_cols = ['caseid', 'region', 'status', 'creationdate', 'firstname', 'lastname', 'state']
-        for col in required_cols:
-            if col not in fdp_df.columns:
-                fdp_df[col] = 'N/A'
-        
-        # Handle missing or null regions
-        fdp_df['region'] = fdp_df['region'].fillna('Unknown')
-        
-        # Filter out any completely invalid rows
-        fdp_df = fdp_df.dropna(subset=['caseid'])
-        
-        return fdp_df
-        
+        return load_fdp_cases(allowed_regions)
     except Exception as e:
         st.error(f"Error loading FDP data: {e}")
         return None
@@ -136,6 +107,7 @@ def load_fdp_data(allowed_regions=None):
 # Check authentication
 if not st.session_state.authenticated:
     render_login()
+    finish_rerun()
 else:
     # Show logout button in sidebar
     with st.sidebar:
@@ -152,65 +124,90 @@ else:
     st.title("Settlement 360")
     st.markdown("**Last Data Sync:** 09-30-2025")
     
-    # Fetch all data from the database with region filtering
+    # Region-filtered views of the process-wide dataset (shared across sessions); only the
+    # case and member tables are loaded here, each tab loads the other tables it declares
     try:
-        df, jamati_member_df, education_df, finance_df, physical_mental_health_df, social_inclusion_agency_df = fetch_all_data(
+        snapshot = load_data_snapshot(
             allowed_regions=st.session_state.user_regions if st.session_state.user_regions else None
         )
         
-        if df is not None:
-            # Create tabs for different sections with updated titles
+        if snapshot is not None:
+            with st.sidebar:
+                st.caption(f"Data loaded at {snapshot['loaded_at'].strftime('%m-%d-%Y %H:%M')}")
+                if st.button("Refresh data now"):
+                    refresh_data_snapshots()
+                    st.rerun()
+            
+            # Create tabs for different sections with updated titles. Switching tabs reruns the
+            # app and only the open tab's body runs, so unopened tabs load and render nothing.
             cases, case_lookup, jamati_member_lookup, jamati_demographics, children_data = st.tabs([
                 "Cases (CMS + FDP + Compare)", 
                 "Case Lookup (CMS Only)",
                 "Jamati Member Lookup (CMS Only)",
                 "Jamati Demographics (CMS Only)", 
                 "Children's Data (CMS Only)"
-            ])
+            ], key="main_tabs", on_change="rerun")
 
             with cases:
-                # Data source selection
-                st.markdown("### 📊 Data Source Selection")
-                data_source = st.radio(
-                    "Select data source:",
-                    options=["CMS Data", "FDP Data", "Compare Both"],
-                    horizontal=True,
-                    key="data_source_selector"
-                )
-                st.markdown("---")
-                
-                # Load FDP data if needed
-                fdp_df = None
-                if data_source in ["FDP Data", "Compare Both"]:
-                    fdp_df = load_fdp_data(allowed_regions=st.session_state.user_regions if st.session_state.user_regions else None)
-                    if fdp_df is None:
-                        data_source = "CMS Data"  # Fallback to CMS
-                
-                # Select which dataset to use
-                if data_source == "CMS Data":
-                    working_df = df.copy()
-                    working_jamati_df = jamati_member_df.copy()
-                elif data_source == "FDP Data" and fdp_df is not None:
-                    working_df = fdp_df.copy()
-                    working_jamati_df = pd.DataFrame()  # FDP doesn't have jamati member details
-                else:  # Compare Both
-                    working_df = df.copy()
-                    working_jamati_df = jamati_member_df.copy()
-                
-                # Render the cases tab with the selected data
-                render_cases_tab(working_df, working_jamati_df, data_source, fdp_df if data_source == "Compare Both" else None, user_regions=st.session_state.user_regions)
+                if cases.open:
+                    frames = load_tab_frames(CASES_TABLES)
+                    if frames is not None:
+                        df, jamati_member_df = frames['SettlementCase'], frames['JamatiMember']
+                        
+                        # Data source selection
+                        st.markdown("### 📊 Data Source Selection")
+                        data_source = st.radio(
+                            "Select data source:",
+                            options=["CMS Data", "FDP Data", "Compare Both"],
+                            horizontal=True,
+                            key="data_source_selector"
+                        )
+                        st.markdown("---")
+                        
+                        # Load FDP data if needed
+                        fdp_df = None
+                        if data_source in ["FDP Data", "Compare Both"]:
+                            fdp_df = load_fdp_data(allowed_regions=st.session_state.user_regions if st.session_state.user_regions else None)
+                            if fdp_df is None:
+                                data_source = "CMS Data"  # Fallback to CMS
+                        
+                        # Select which dataset to use (shared frames are passed as-is; the tabs never modify them)
+                        if data_source == "CMS Data":
+                            working_df = df
+                            working_jamati_df = jamati_member_df
+                        elif data_source == "FDP Data" and fdp_df is not None:
+                            working_df = fdp_df
+                            working_jamati_df = pd.DataFrame()  # FDP doesn't have jamati member details
+                        else:  # Compare Both
+                            working_df = df
+                            working_jamati_df = jamati_member_df
+                        
+                        # Render the cases tab with the selected data
+                        render_cases_tab(working_df, working_jamati_df, data_source, fdp_df if data_source == "Compare Both" else None, user_regions=st.session_state.user_regions)
 
             with case_lookup:
-                render_case_lookup_tab(df, jamati_member_df, education_df, finance_df, physical_mental_health_df, social_inclusion_agency_df)
+                if case_lookup.open:
+                    frames = load_tab_frames(CASE_LOOKUP_TABLES)
+                    if frames is not None:
+                        render_case_lookup_tab(frames['SettlementCase'], frames['JamatiMember'])
 
             with jamati_member_lookup:
-                render_jamati_member_lookup_tab(jamati_member_df, education_df, finance_df, physical_mental_health_df, social_inclusion_agency_df)
+                if jamati_member_lookup.open:
+                    frames = load_tab_frames(MEMBER_LOOKUP_TABLES)
+                    if frames is not None:
+                        render_jamati_member_lookup_tab(frames['JamatiMember'])
 
             with jamati_demographics:
-                render_demographics_tab(jamati_member_df)
+                if jamati_demographics.open:
+                    frames = load_tab_frames(DEMOGRAPHICS_TABLES)
+                    if frames is not None:
+                        render_demographics_tab(frames['JamatiMember'])
 
             with children_data:
-                render_children_tab(df, jamati_member_df, education_df, finance_df, physical_mental_health_df, social_inclusion_agency_df)
+                if children_data.open:
+                    frames = load_tab_frames(CHILDREN_TABLES)
+                    if frames is not None:
+                        render_children_tab(frames['SettlementCase'], frames['JamatiMember'], frames['Education'])
 
         else:
             st.error("Failed to fetch data from the database. Please check your connection.")
@@ -218,3 +215,14 @@ else:
     except Exception as e:
         st.error(f"An error occurred: {e}")
         print(f"Error in main app: {e}")
+    
+    finish_rerun()
+
+    # Rendered last so the log includes this rerun's queries and the profile its timings
+    if is_admin(st.session_state.user_email):
+        with st.sidebar:
+            with st.expander("🩺 Diagnostics", expanded=False):
+                render_query_diagnostics()
+                render_cache_diagnostics()
+                render_compaction_diagnostics()
+                render_rerun_profile()
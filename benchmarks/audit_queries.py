@@ -0,0 +1,236 @@
+"""Run every query the app issues through EXPLAIN (ANALYZE, BUFFERS) and flag poor plans.
+
+The queries come from the same builders and statements database.py uses (bulk
+loads for all regions and for one region, key sets, delta syncs, per-person and
+per-case detail lookups, the regional summary view and the single-row lookups),
+with parameters sampled from the data. Each plan is reported with its execution
+time, rows and shared buffers, and flagged when:
+
+- seq_scan: a sequential scan discards more rows than it keeps (an index is
+  missing or unused); scans by the whole-table loads are expected and not flagged
+- slow: execution takes longer than --slow-ms
+
+Usage (from the repository root, against a local stand-in database):
+
+    SETTLEMENT_DATABASE_URL=postgresql://localhost/settlement_audit python -m benchmarks.audit_queries --generate 100000
+    python -m benchmarks.audit_queries --generate 100000 --no-indexes   # the schema without add_indexes.sql
+    python -m benchmarks.audit_queries --json plans.json --strict       # existing data; exit 1 on flags
+"""
+import argparse
+import json
+import os
+from datetime import timedelta
+
+from benchmarks.synthetic_data import create_schema, generate_dataset
+from database import (
+    CASE_BY_ID_QUERY,
+    CMS_TABLES,
+    CUSTOM_DATA_EXISTS_QUERY,
+    CUSTOM_DATA_QUERY,
+    DOMAIN_TABLES,
+    SIGN_IN_QUERY,
+    USER_REGIONS_QUERY,
+    build_delta_query,
+    build_detail_query,
+    build_key_query,
+    build_regional_summary_query,
+    build_table_query,
+    get_connection,
+)
+
+# Sequential scans on tables smaller than this are cheaper than an index and not flagged
+MIN_SCAN_ROWS = 1000
+
+
+def sample_parameters(conn):
+    """Pick real keys, a region and dates from the data for the parameterized queries"""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT Region, COUNT(*) FROM SettlementCase WHERE Region IS NOT NULL "
+            "GROUP BY Region ORDER BY COUNT(*) DESC LIMIT 1"
+        )
+        region = cursor.fetchone()[0]
+        cursor.execute("SELECT CaseID FROM JamatiMember WHERE CaseID IS NOT NULL ORDER BY PersonID LIMIT 50")
+        case_ids = sorted({row[0] for row in cursor.fetchall()})
+        cursor.execute("SELECT PersonID FROM JamatiMember WHERE CaseID = ANY(%s)", (case_ids,))
+        person_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT MAX(GREATEST(CreationDate, OpenReopenDate, LastLogDate)), MAX(CreationDate) FROM SettlementCase")
+        latest_activity, latest_creation = cursor.fetchone()
+        cursor.execute("SELECT id, email, password FROM user_accounts ORDER BY id LIMIT 1")
+        user_id, *user = cursor.fetchone() or (0, 'nobody@example.org', '')
+    return {
+        'region': region,
+        'case_ids': case_ids,
+        'person_ids': person_ids,
+        # A typical incremental sync: a week of activity
+        'since': latest_activity - timedelta(days=7),
+        # The Cases tab's date pickers narrowed to the last year
+        'start_date': latest_creation - timedelta(days=365),
+        'end_date': latest_creation,
+        'user': tuple(user),
+        'user_id': user_id,
+    }
+
+
+def audit_queries(sample):
+    """Return [{'name', 'query', 'params', 'full_scan'}] for every query the app issues"""
+    queries = []
+    for table in CMS_TABLES + ['fdp_cases']:
+        query, params = build_table_query(table)
+        queries.append({'name': f"load {table}", 'query': query, 'params': params, 'full_scan': True})
+        query, params = build_table_query(table, [sample['region']])
+        queries.append({'name': f"load {table} (one region)", 'query': query, 'params': params, 'full_scan': False})
+
+    for table in CMS_TABLES:
+        queries.append({'name': f"key set {table}", 'query': build_key_query(table), 'params': None, 'full_scan': True})
+
+    query, params = build_delta_query('SettlementCase', [], since=sample['since'])
+    queries.append({'name': "delta SettlementCase", 'query': query, 'params': params, 'full_scan': False})
+    query, params = build_delta_query('JamatiMember', [], parent_ids=sample['case_ids'])
+    queries.append({'name': "delta JamatiMember", 'query': query, 'params': params, 'full_scan': False})
+    for table in DOMAIN_TABLES:
+        query, params = build_delta_query(table, [], parent_ids=sample['person_ids'])
+        queries.append({'name': f"delta {table}", 'query': query, 'params': params, 'full_scan': False})
+
+    for table in DOMAIN_TABLES:
+        queries.append({
+            'name': f"detail {table} by person", 'query': build_detail_query(table, 'person'),
+            'params': (sample['person_ids'][0],), 'full_scan': False,
+        })
+        queries.append({
+            'name': f"detail {table} by case", 'query': build_detail_query(table, 'case'),
+            'params': (sample['case_ids'][0],), 'full_scan': False,
+        })
+
+    for source in ("CMS", "FDP"):
+        query, params = build_regional_summary_query(
+            source, [sample['region']], sample['start_date'], sample['end_date']
+        )
+        queries.append({'name': f"regional summary {source}", 'query': query, 'params': params, 'full_scan': False})
+
+    # Single-row lookups; the custom data writes are not run
+    queries += [
+        {
+            'name': "case by id (get_case_data_by_id)", 'query': CASE_BY_ID_QUERY,
+            'params': (sample['case_ids'][0],), 'full_scan': False,
+        },
+        {
+            'name': "custom data (get_custom_data_by_case_id)", 'query': CUSTOM_DATA_QUERY,
+            'params': (sample['case_ids'][0],), 'full_scan': False,
+        },
+        {
+            'name': "custom data exists (save_custom_data)", 'query': CUSTOM_DATA_EXISTS_QUERY,
+            'params': (sample['case_ids'][0],), 'full_scan': False,
+        },
+        {
+            'name': "sign-in (authenticate_user)", 'query': SIGN_IN_QUERY,
+            'params': sample['user'], 'full_scan': False,
+        },
+        {
+            'name': "user regions (get_user_regions)", 'query': USER_REGIONS_QUERY,
+            'params': (sample['user_id'],), 'full_scan': False,
+        },
+    ]
+    return queries
+
+
+def _plan_nodes(node):
+    """Yield a plan node and every node below it"""
+    yield node
+    for child in node.get('Plans', []):
+        yield from _plan_nodes(child)
+
+
+def explain(conn, query, params):
+    """Run one query under EXPLAIN (ANALYZE, BUFFERS) and summarize its plan"""
+    with conn.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", params)
+        result = cursor.fetchone()[0][0]
+    conn.rollback()
+
+    plan = result['Plan']
+    scans = []
+    for node in _plan_nodes(plan):
+        if node['Node Type'] == 'Seq Scan':
+            loops = node.get('Actual Loops', 1)
+            scans.append({
+                'relation': node['Relation Name'],
+                'rows': node['Actual Rows'] * loops,
+                'removed': node.get('Rows Removed by Filter', 0) * loops,
+            })
+    return {
+        'execution_ms': result['Execution Time'],
+        'planning_ms': result['Planning Time'],
+        'rows': plan['Actual Rows'],
+        'shared_hit': plan.get('Shared Hit Blocks', 0),
+        'shared_read': plan.get('Shared Read Blocks', 0),
+        'seq_scans': scans,
+        'plan': plan,
+    }
+
+
+def flag_plan(entry, summary, slow_ms):
+    """Return the flags for one audited query"""
+    flags = []
+    if not entry['full_scan']:
+        for scan in summary['seq_scans']:
+            if scan['rows'] + scan['removed'] >= MIN_SCAN_ROWS and scan['removed'] > scan['rows']:
+                flags.append(f"seq_scan:{scan['relation']}")
+    if summary['execution_ms'] > slow_ms:
+        flags.append('slow')
+    return flags
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--generate', type=int, metavar='MEMBERS',
+                        help='recreate the schema and load this many synthetic members first (see synthetic_data)')
+    parser.add_argument('--regions', type=int, default=6, help='regions for --generate')
+    parser.add_argument('--no-indexes', action='store_true', help='with --generate, skip add_indexes.sql')
+    parser.add_argument('--slow-ms', type=float, default=250, help='flag queries slower than this (default: 250)')
+    parser.add_argument('--json', dest='json_path', help='write every plan and flag to this file')
+    parser.add_argument('--strict', action='store_true', help='exit with status 1 if any query is flagged')
+    args = parser.parse_args()
+
+    if args.generate and not os.environ.get('SETTLEMENT_DATABASE_URL'):
+        parser.error("--generate drops the application tables; set SETTLEMENT_DATABASE_URL to the stand-in database")
+
+    results = []
+    with get_connection() as conn:
+        if args.generate:
+            create_schema(conn, indexes=not args.no_indexes)
+            generate_dataset(conn, args.generate, args.regions)
+        sample = sample_parameters(conn)
+        for entry in audit_queries(sample):
+            try:
+                summary = explain(conn, entry['query'], entry['params'])
+            except Exception as e:
+                conn.rollback()
+                results.append({'name': entry['name'], 'query': entry['query'], 'error': str(e).strip(), 'flags': ['error']})
+                continue
+            results.append({
+                'name': entry['name'], 'query': entry['query'],
+                **summary, 'flags': flag_plan(entry, summary, args.slow_ms),
+            })
+
+    print(f"{'query':<44}{'ms':>10}{'rows':>10}{'hit':>9}{'read':>9}  flags")
+    for row in results:
+        if 'error' in row:
+            print(f"{row['name']:<44}{'':>38}  error: {row['error'].splitlines()[0]}")
+            continue
+        print(
+            f"{row['name']:<44}{row['execution_ms']:>10.2f}{row['rows']:>10,}"
+            f"{row['shared_hit']:>9,}{row['shared_read']:>9,}  {', '.join(row['flags'])}"
+        )
+    flagged = [row for row in results if row['flags']]
+    print(f"\n{len(flagged)} of {len(results)} queries flagged")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as handle:
+            json.dump({'slow_ms': args.slow_ms, 'results': results}, handle, indent=2, default=str)
+    if args.strict and flagged:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
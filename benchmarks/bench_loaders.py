@@ -0,0 +1,72 @@
+"""Compare the read_sql, COPY and server-side cursor transfer paths on the same table queries.
+
+Usage (from the repository root):
+
+    SETTLEMENT_DATABASE_URL=postgresql://... python -m benchmarks.bench_loaders --repeat 5
+    python -m benchmarks.bench_loaders --regions NE,SE --json loaders.json
+
+With compact_dtypes on (the default), every loader's frame is converted to the
+compact dtypes inside the timed region, as fetch_all_data() does: the stream
+loader builds them while reading and the others run compact_frame() afterwards.
+Set SETTLEMENT_COMPACT_DTYPES=false to time the plain transfers instead.
+"""
+import argparse
+import json
+import statistics
+import time
+
+from config import COMPACT_DTYPES
+from database import DOMAIN_TABLES, fetch_table, get_connection
+from frame_dtypes import compact_frame
+
+LOADERS = ['read_sql', 'copy', 'stream']
+TABLES = ['SettlementCase', 'JamatiMember'] + DOMAIN_TABLES + ['fdp_cases']
+
+
+def time_loader(conn, table, loader, regions, repeat):
+    """Return (rows, per-run seconds) for loading one table with one loader"""
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        frame = fetch_table(conn, table, regions, loader=loader)
+        if COMPACT_DTYPES and loader != 'stream':
+            frame = compact_frame(frame, table)
+        timings.append(time.perf_counter() - started)
+        rows = len(frame)
+    return rows, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3, help='runs per table and loader (median is reported)')
+    parser.add_argument('--regions', default='', help='comma-separated region filter (default: all regions)')
+    parser.add_argument('--json', dest='json_path', help='write machine-readable results to this file')
+    args = parser.parse_args()
+
+    regions = [r for r in args.regions.split(',') if r] or None
+    results = []
+    with get_connection() as conn:
+        for table in TABLES:
+            row = {'table': table}
+            for loader in LOADERS:
+                rows, timings = time_loader(conn, table, loader, regions, args.repeat)
+                row['rows'] = rows
+                row[f'{loader}_seconds'] = statistics.median(timings)
+            for loader in LOADERS[1:]:
+                seconds = row[f'{loader}_seconds']
+                row[f'{loader}_speedup'] = row['read_sql_seconds'] / seconds if seconds else None
+            results.append(row)
+
+    print(f"compact_dtypes: {'on' if COMPACT_DTYPES else 'off'}")
+    print(f"{'table':<24}{'rows':>10}" + ''.join(f"{loader + ' s':>14}" for loader in LOADERS))
+    for row in results:
+        print(f"{row['table']:<24}{row['rows']:>10,}" + ''.join(f"{row[f'{loader}_seconds']:>14.4f}" for loader in LOADERS))
+
+    if args.json_path:
+        with open(args.json_path, 'w') as handle:
+            json.dump({'regions': regions, 'repeat': args.repeat, 'compact_dtypes': COMPACT_DTYPES, 'results': results}, handle, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""Time the app's loads and per-rerun computations at several synthetic dataset sizes.
+
+For each size the stand-in database is recreated and filled by synthetic_data,
+then every step below is run --repeat times on the loaded frames and the median,
+min and max are reported:
+
+- fetch_all_data: every CMS table through database.fetch_all_data (honours
+  data_loader, parallel_table_fetch and compact_dtypes)
+- partition_dataset: ordering the tables by region, as the shared dataset does
+- load_fdp_data: fetching fdp_cases and normalizing it (fdp_pipeline), the
+  work behind the Cases tab's FDP view
+- regional summary: summarize_regions for CMS and FDP over all regions, and the
+  regional_case_summary view read by fetch_regional_summary
+- option lists: the Region, Case ID and member selectbox options
+- member search: the Jamati Member Lookup search over a name and a number
+- children / demographics: the aggregations behind those tabs' tables and charts
+
+Usage (from the repository root; the application tables are dropped):
+
+    SETTLEMENT_DATABASE_URL=postgresql://localhost/settlement_bench python -m benchmarks.bench_scaling --sizes 10k,100k,1m --json scaling.json
+    python -m benchmarks.bench_scaling --no-generate --steps "member search,regional summary"   # the data already loaded
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks.synthetic_data import SIZE_PRESETS, create_schema, generate_dataset, parse_size
+from cases_tab import build_region_options, summarize_regions
+from children_tab import select_children, summarize_children_by_region
+from config import COMPACT_DTYPES, DATA_LOADER, PARALLEL_TABLE_FETCH
+from database import CMS_TABLES, fetch_all_data, fetch_regional_summary, fetch_table, get_connection
+from demographics_tab import member_ages, value_distribution
+from fdp_pipeline import normalize_fdp_cases
+from jamati_member_lookup_tab import build_member_display_frame, build_member_options, search_members, with_member_ages
+from region_partitions import partition_dataset
+
+# Search terms for the member search: part of a generated last name, and part of an ID
+SEARCH_TERMS = {'text': 'kar', 'number': '42'}
+
+
+def _result_rows(result):
+    """Return the number of rows or items in a step's result, if it has one"""
+    if isinstance(result, tuple):
+        return sum(_result_rows(item) or 0 for item in result)
+    if isinstance(result, (pd.DataFrame, pd.Series, list)):
+        return len(result)
+    return None
+
+
+def time_step(func, repeat):
+    """Return (last result, per-run seconds) for running func() repeat times"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return result, timings
+
+
+def benchmark_steps(frames, fdp_df):
+    """Return [(step name, callable)] over the loaded, region-ordered frames"""
+    cases, members, education = frames['SettlementCase'], frames['JamatiMember'], frames['Education']
+    display_df = build_member_display_frame(members)
+    children = select_children(members)
+    regions = cases['region'].dropna().unique()
+    return [
+        ('regional summary CMS', lambda: summarize_regions(cases, members, "CMS")),
+        ('regional summary FDP', lambda: summarize_regions(fdp_df, pd.DataFrame(), "FDP")),
+        ('regional summary CMS (view)', lambda: fetch_regional_summary("CMS")),
+        ('regional summary FDP (view)', lambda: fetch_regional_summary("FDP")),
+        ('option list regions', lambda: build_region_options(cases)),
+        ('option list case ids', lambda: sorted(cases['caseid'].unique().tolist())),
+        ('option list members', lambda: build_member_options(
+            with_member_ages(members, 'yearofbirth'), 'personid', 'caseid', 'firstname', 'lastname'
+        )),
+        ('member display frame', lambda: build_member_display_frame(members)),
+        ('member search text', lambda: search_members(display_df, SEARCH_TERMS['text'])),
+        ('member search number', lambda: search_members(display_df, SEARCH_TERMS['number'])),
+        ('children select', lambda: select_children(members)),
+        ('children summary by region', lambda: summarize_children_by_region(cases, children, regions)),
+        ('children education merge', lambda: children.merge(
+            education[education['personid'].isin(children['personid'])], on='personid', how='inner'
+        )),
+        ('demographics origin counts', lambda: value_distribution(members['countryoforigin'])),
+        ('demographics education counts', lambda: value_distribution(members['educationlevel'])),
+        ('demographics ages', lambda: member_ages(members)),
+    ]
+
+
+def run_size(members, args):
+    """Benchmark one dataset size; returns (size record, [step records])"""
+    size = {'members': members, 'tables': None, 'generate_seconds': None}
+    if members is not None:
+        started = time.perf_counter()
+        with get_connection() as conn:
+            create_schema(conn, indexes=not args.no_indexes)
+            size['tables'] = generate_dataset(conn, members, args.regions, args.seed)
+        size['generate_seconds'] = time.perf_counter() - started
+
+    records = []
+
+    def record(step, result, timings):
+        records.append({
+            'members': members,
+            'step': step,
+            'rows': _result_rows(result),
+            'runs': len(timings),
+            'median_seconds': statistics.median(timings),
+            'min_seconds': min(timings),
+            'max_seconds': max(timings),
+        })
+        print(f"{members or 'existing':>10}  {step:<34}{statistics.median(timings):>12.4f} s")
+
+    def wanted(step):
+        return not args.steps or any(step.startswith(prefix) for prefix in args.steps)
+
+    loaded, timings = time_step(lambda: fetch_all_data(tables=CMS_TABLES), args.repeat)
+    if loaded[0] is None:
+        raise RuntimeError("fetch_all_data failed; see the output above")
+    if wanted('fetch_all_data'):
+        record('fetch_all_data', loaded, timings)
+
+    (frames, _), timings = time_step(lambda: partition_dataset(dict(zip(CMS_TABLES, loaded))), args.repeat)
+    if wanted('partition_dataset'):
+        record('partition_dataset', list(frames.values()), timings)
+
+    def load_fdp():
+        with get_connection() as conn:
+            return normalize_fdp_cases(fetch_table(conn, 'fdp_cases'))
+    fdp_df, timings = time_step(load_fdp, args.repeat)
+    if wanted('load_fdp_data'):
+        record('load_fdp_data', fdp_df, timings)
+
+    for step, func in benchmark_steps(frames, fdp_df):
+        if wanted(step):
+            result, timings = time_step(func, args.repeat)
+            record(step, result, timings)
+    return size, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10k,100k',
+                        help=f"comma-separated member counts or presets ({', '.join(SIZE_PRESETS)}); default: 10k,100k")
+    parser.add_argument('--no-generate', action='store_true', help='benchmark the data already in the database once')
+    parser.add_argument('--regions', type=int, default=6, help='regions the generated cases are spread over')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for the generated data')
+    parser.add_argument('--no-indexes', action='store_true', help='generate without add_indexes.sql')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per step (median is reported)')
+    parser.add_argument('--steps', default='', help='comma-separated step name prefixes to run (default: all)')
+    parser.add_argument('--json', dest='json_path', help='write machine-readable results to this file')
+    args = parser.parse_args()
+    args.steps = [step.strip() for step in args.steps.split(',') if step.strip()]
+
+    if not args.no_generate and not os.environ.get('SETTLEMENT_DATABASE_URL'):
+        parser.error("generating drops the application tables; set SETTLEMENT_DATABASE_URL to the stand-in database")
+    try:
+        sizes = [None] if args.no_generate else [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    size_records, results = [], []
+    for members in sizes:
+        size, records = run_size(members, args)
+        size_records.append(size)
+        results.extend(records)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as handle:
+            json.dump({
+                'run_at': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'settings': {
+                    'data_loader': DATA_LOADER,
+                    'parallel_table_fetch': PARALLEL_TABLE_FETCH,
+                    'compact_dtypes': COMPACT_DTYPES,
+                },
+                'repeat': args.repeat,
+                'regions': args.regions,
+                'seed': args.seed,
+                'indexes': not args.no_indexes,
+                'sizes': size_records,
+                'results': results,
+            }, handle, indent=2)
+
+
+if __name__ == '__main__':
+    main()
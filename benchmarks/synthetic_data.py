@@ -0,0 +1,317 @@
+"""Generate schema-faithful synthetic data in a local stand-in database.
+
+Recreates the tables of updated_schema.sql, fdp_cases.sql and custom_data.sql
+(plus regional_summary.sql and, unless --no-indexes, add_indexes.sql) and fills
+them with generated rows: cases spread unevenly over the regions, one to six
+members per case, one domain row per member for most members and FDP cases for
+half as many families. Columns the app reads get realistic values; the others
+are filled from their declared type. Every table this script touches is dropped
+first, so it only runs against the database named by SETTLEMENT_DATABASE_URL.
+
+Usage (from the repository root):
+
+    SETTLEMENT_DATABASE_URL=postgresql://localhost/settlement_bench python -m benchmarks.synthetic_data --members 100000
+    python -m benchmarks.synthetic_data --members 1m --regions 12 --no-indexes
+
+--members takes a count or one of the size presets (10k, 100k, 1m).
+"""
+import argparse
+import io
+import os
+import re
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from database import DOMAIN_TABLES, get_connection
+from frame_dtypes import CATEGORY_COLUMNS
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCHEMA_FILES = ['updated_schema.sql', 'fdp_cases.sql', 'custom_data.sql', 'regional_summary.sql']
+INDEX_FILE = 'add_indexes.sql'
+TABLES = ['SettlementCase', 'JamatiMember'] + DOMAIN_TABLES + ['fdp_cases', 'custom_data', 'user_accounts']
+
+REGION_CODES = ['NE', 'SE', 'SW', 'MW', 'CA', 'TX', 'NW', 'MA', 'FL', 'GA', 'IL', 'NY']
+STATES = ['TX', 'CA', 'GA', 'NY', 'IL', 'FL', 'WA', 'MA', 'NJ', 'VA', 'NC', 'AZ', 'CO', 'MN', 'OH', 'PA']
+CMS_STATUSES = ['Open', 'Closed', 'Reopen', 'Pending']
+FDP_STATUSES = ['Active', 'Closed', 'On Hold', 'Completed']
+COUNTRIES = ['Afghanistan', 'Tajikistan', 'Pakistan', 'Syria', 'Iran', 'India', '']
+RELATIONS = ['Spouse', 'Child', 'Child', 'Parent', 'Sibling']
+LEGAL_STATUSES = ['Asylum', 'Refugee', 'Parole', 'Green Card', 'Citizen', 'SIV']
+FLUENCY = ['None', 'Basic', 'Intermediate', 'Fluent']
+EDUCATION_LEVELS = ['None', 'Primary', 'Secondary', 'High School', 'Bachelors', 'Masters']
+FIRST_NAMES = ['Aziz', 'Farida', 'Karim', 'Laila', 'Nadir', 'Shirin', 'Rahim', 'Zara', 'Salim', 'Amina']
+LAST_NAMES = ['Hussaini', 'Karimi', 'Nazari', 'Rahimi', 'Shah', 'Jaffer', 'Merchant', 'Lakhani']
+WORDS = 'family needs follow up with case manager about housing school benefits and employment support'.split()
+
+# Named dataset sizes (JamatiMember rows) shared with the benchmark suite
+SIZE_PRESETS = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+# Dates span the last six years
+FIRST_DATE = date(2019, 1, 1)
+DAY_SPAN = 6 * 365
+# Domain rows are generated and copied this many at a time to bound memory at large sizes
+CHUNK_ROWS = 200_000
+
+
+def region_codes(count):
+    """Return ``count`` two-letter region codes (the Region column is VARCHAR(2))"""
+    codes = list(REGION_CODES[:count])
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    extra = (a + b for a in letters for b in letters if a + b not in REGION_CODES)
+    while len(codes) < count:
+        codes.append(next(extra))
+    return codes
+
+
+def parse_size(value):
+    """Return the member count for a size preset such as "100k" or a plain number"""
+    value = str(value).strip().lower()
+    if value in SIZE_PRESETS:
+        return SIZE_PRESETS[value]
+    try:
+        return int(value.replace('_', '').replace(',', ''))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number or one of {', '.join(SIZE_PRESETS)}, got {value!r}")
+
+
+def create_schema(conn, indexes=True):
+    """Drop and recreate the application tables from the repository's DDL files"""
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {', '.join(TABLES)} CASCADE")
+        for name in SCHEMA_FILES + ([INDEX_FILE] if indexes else []):
+            sql = (REPO_ROOT / name).read_text()
+            # The production owner role does not exist in a stand-in database
+            sql = re.sub(r'ALTER TABLE[^;]*OWNER to[^;]*;', '', sql)
+            cursor.execute(sql)
+    conn.commit()
+
+
+def _table_columns(conn, table):
+    """Return [(column, data_type, max_length)] for a table in declaration order"""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT column_name, data_type, character_maximum_length FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = %s ORDER BY ordinal_position",
+            (table.lower(),),
+        )
+        return cursor.fetchall()
+
+
+def _with_nulls(rng, values, fraction):
+    """Return ``values`` as an object array with about ``fraction`` of them set to None"""
+    values = np.asarray(values, dtype=object)
+    values[rng.random(len(values)) < fraction] = None
+    return values
+
+
+def _random_dates(rng, rows, start=FIRST_DATE, span=DAY_SPAN):
+    return pd.to_datetime(start) + pd.to_timedelta(rng.integers(0, span, rows), unit='D')
+
+
+def _generic_column(rng, table, column, data_type, max_length, rows):
+    """Fill a column the app does not interpret from its declared type"""
+    if data_type == 'boolean':
+        return _with_nulls(rng, rng.random(rows) < 0.5, 0.2)
+    if data_type in ('integer', 'smallint', 'bigint'):
+        return pd.array(_with_nulls(rng, rng.integers(0, 10, rows), 0.1), dtype='Int64')
+    if data_type in ('double precision', 'real', 'numeric'):
+        return np.where(rng.random(rows) < 0.1, np.nan, rng.uniform(0, 60000, rows).round(2))
+    if data_type == 'date':
+        return _with_nulls(rng, _random_dates(rng, rows).date, 0.1)
+    if data_type.startswith('timestamp'):
+        return _with_nulls(rng, _random_dates(rng, rows).to_pydatetime(), 0.1)
+    if column.endswith('comments') or (data_type == 'text' and column not in CATEGORY_COLUMNS.get(table, [])):
+        # Free text: a few words to a couple of sentences, often empty
+        sentences = np.array([' '.join(rng.choice(WORDS, n)) for n in rng.integers(3, 40, 64)], dtype=object)
+        return _with_nulls(rng, rng.choice(sentences, rows), 0.4)
+    labels = np.array([f"{column} {k}"[:max_length or None] for k in range(1, 6)], dtype=object)
+    return _with_nulls(rng, rng.choice(labels, rows), 0.15)
+
+
+def _build_frame(rng, columns, table, rows, known):
+    """Return a frame with a column for every table column, using ``known`` where given"""
+    data = {}
+    for column, data_type, max_length in columns:
+        if column in known:
+            data[column] = known[column]
+        else:
+            data[column] = _generic_column(rng, table, column, data_type, max_length, rows)
+    return pd.DataFrame(data)
+
+
+def _copy_frame(conn, table, frame):
+    """Bulk-load a frame with COPY FROM STDIN"""
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False, na_rep='\\N')
+    buffer.seek(0)
+    with conn.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(frame.columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer
+        )
+
+
+def _case_rows(rng, case_count, regions):
+    # Regions are deliberately uneven, like the real caseload
+    weights = 1 / np.sqrt(np.arange(1, len(regions) + 1))
+    created = _random_dates(rng, case_count)
+    reopened = created + pd.to_timedelta(rng.integers(0, 90, case_count), unit='D')
+    logged = created + pd.to_timedelta(rng.integers(0, 400, case_count), unit='D')
+    return {
+        'caseid': np.array([f"C{n:07d}" for n in range(1, case_count + 1)], dtype=object),
+        'region': rng.choice(regions, case_count, p=weights / weights.sum()),
+        'jamatkhana': np.array([f"JK {n}" for n in rng.integers(1, 40, case_count)], dtype=object),
+        'status': rng.choice(CMS_STATUSES, case_count, p=[0.45, 0.35, 0.1, 0.1]),
+        'creationdate': _with_nulls(rng, created.date, 0.01),
+        'openreopendate': _with_nulls(rng, reopened.date, 0.3),
+        'lastlogdate': _with_nulls(rng, logged.date, 0.2),
+        'firstname': rng.choice(FIRST_NAMES, case_count),
+        'lastname': rng.choice(LAST_NAMES, case_count),
+        'state': rng.choice(STATES, case_count),
+        'zip': np.char.zfill(rng.integers(1000, 99999, case_count).astype(str), 5),
+    }
+
+
+def _family_sizes(rng, members):
+    """Return one to six members per case, adding up to exactly ``members``"""
+    sizes = rng.integers(1, 7, members // 3 + 10)
+    while sizes.sum() < members:
+        sizes = np.concatenate([sizes, rng.integers(1, 7, len(sizes))])
+    case_count = int(np.searchsorted(np.cumsum(sizes), members)) + 1
+    sizes = sizes[:case_count]
+    sizes[-1] -= sizes.sum() - members
+    return sizes
+
+
+def _member_rows(rng, case_ids, sizes):
+    """Return the member columns for cases of the given sizes, the first member of each being the head"""
+    member_count = int(sizes.sum())
+    is_head = np.zeros(member_count, dtype=bool)
+    is_head[np.cumsum(sizes) - sizes] = True
+    relation = np.where(is_head, 'Head', rng.choice(RELATIONS, member_count))
+    adult_years = rng.integers(1945, 2003, member_count)
+    child_years = rng.integers(2006, 2025, member_count)
+    years = np.where(relation == 'Child', child_years, adult_years)
+    return {
+        'personid': np.arange(1, member_count + 1),
+        'caseid': np.repeat(case_ids, sizes),
+        'firstname': rng.choice(FIRST_NAMES, member_count),
+        'lastname': rng.choice(LAST_NAMES, member_count),
+        'yearofbirth': pd.array(_with_nulls(rng, years, 0.05), dtype='Int64'),
+        'countryoforigin': _with_nulls(rng, rng.choice(COUNTRIES, member_count), 0.05),
+        'relationtohead': relation,
+        'legalstatus': _with_nulls(rng, rng.choice(LEGAL_STATUSES, member_count), 0.1),
+        'usarrivalyear': pd.array(_with_nulls(rng, rng.integers(2015, 2025, member_count), 0.2), dtype='Int64'),
+        'englishfluency': _with_nulls(rng, rng.choice(FLUENCY, member_count), 0.1),
+        'educationlevel': _with_nulls(rng, rng.choice(EDUCATION_LEVELS, member_count), 0.1),
+    }
+
+
+def _fdp_rows(rng, row_count, regions):
+    created = _random_dates(rng, row_count).strftime('%Y-%m-%d').to_numpy(dtype=object)
+    # A few creation dates are missing or unparseable, as in the imported sheet
+    created[rng.random(row_count) < 0.01] = 'unknown'
+    return {
+        'no': np.arange(1, row_count + 1),
+        'region': _with_nulls(rng, rng.choice(regions, row_count), 0.05),
+        'access_case': np.array([f"FDP{n:07d}" for n in range(1, row_count + 1)], dtype=object),
+        'access_case_creation_date': _with_nulls(rng, created, 0.02),
+        'settlement_case_status': rng.choice(FDP_STATUSES, row_count),
+        'family_last_name': rng.choice(LAST_NAMES, row_count),
+        'head_of_family_first_name': rng.choice(FIRST_NAMES, row_count),
+        'state_code_2_digits': rng.choice(STATES, row_count),
+        'number_in_family': np.where(rng.random(row_count) < 0.05, np.nan, rng.integers(1, 9, row_count)),
+    }
+
+
+def generate_dataset(conn, members, region_count=6, seed=0):
+    """Fill freshly created tables with ``members`` members and their cases
+
+    Returns:
+        Dict of table name -> rows written
+    """
+    rng = np.random.default_rng(seed)
+    regions = region_codes(region_count)
+    counts = {}
+
+    sizes = _family_sizes(rng, members)
+    case_count = len(sizes)
+    cases = _case_rows(rng, case_count, regions)
+    _copy_frame(conn, 'SettlementCase', _build_frame(rng, _table_columns(conn, 'SettlementCase'), 'SettlementCase', case_count, cases))
+    counts['SettlementCase'] = case_count
+
+    member_count = members
+    member_columns = _member_rows(rng, cases['caseid'], sizes)
+    _copy_frame(conn, 'JamatiMember', _build_frame(rng, _table_columns(conn, 'JamatiMember'), 'JamatiMember', member_count, member_columns))
+    counts['JamatiMember'] = member_count
+
+    for table in DOMAIN_TABLES:
+        columns = _table_columns(conn, table)
+        id_column = columns[0][0]
+        # Most members have a row in each domain table
+        person_ids = member_columns['personid'][rng.random(member_count) < 0.85]
+        for start in range(0, len(person_ids), CHUNK_ROWS):
+            chunk = person_ids[start:start + CHUNK_ROWS]
+            known = {id_column: np.arange(start + 1, start + len(chunk) + 1), 'personid': chunk}
+            _copy_frame(conn, table, _build_frame(rng, columns, table, len(chunk), known))
+        counts[table] = len(person_ids)
+
+    fdp_count = max(1, case_count // 2)
+    _copy_frame(conn, 'fdp_cases', _build_frame(rng, _table_columns(conn, 'fdp_cases'), 'fdp_cases', fdp_count, _fdp_rows(rng, fdp_count, regions)))
+    counts['fdp_cases'] = fdp_count
+
+    # One user per region and one who sees every region
+    users = pd.DataFrame({
+        'email': [f"{region.lower()}@example.org" for region in regions] + ['all@example.org'],
+        'first_name': 'Synthetic',
+        'last_name': regions + ['All'],
+        'regions': [f"{{{region}}}" for region in regions] + [None],
+        'password': 'synthetic',
+    })
+    _copy_frame(conn, 'user_accounts', users)
+    counts['user_accounts'] = len(users)
+
+    with conn.cursor() as cursor:
+        # The SERIAL keys were written explicitly, so move their sequences past them
+        for table in ['JamatiMember'] + DOMAIN_TABLES + ['user_accounts']:
+            id_column = _table_columns(conn, table)[0][0]
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE(MAX({id_column}), 0) + 1, false) FROM {table}",
+                (table.lower(), id_column),
+            )
+        cursor.execute("REFRESH MATERIALIZED VIEW regional_case_summary")
+    conn.commit()
+
+    # ANALYZE cannot run inside a transaction block
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"ANALYZE {', '.join(TABLES)}")
+    finally:
+        conn.autocommit = False
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--members', type=parse_size, default=10_000,
+                        help=f"number of JamatiMember rows or a preset ({', '.join(SIZE_PRESETS)})")
+    parser.add_argument('--regions', type=int, default=6, help='number of regions the cases are spread over')
+    parser.add_argument('--seed', type=int, default=0, help='random seed; the same seed gives the same data')
+    parser.add_argument('--no-indexes', action='store_true', help='skip add_indexes.sql (to audit the bare schema)')
+    args = parser.parse_args()
+
+    if not os.environ.get('SETTLEMENT_DATABASE_URL'):
+        parser.error("set SETTLEMENT_DATABASE_URL to the stand-in database; its application tables are dropped")
+
+    with get_connection() as conn:
+        create_schema(conn, indexes=not args.no_indexes)
+        counts = generate_dataset(conn, args.members, args.regions, args.seed)
+    for table, rows in counts.items():
+        print(f"{table:<24}{rows:>12,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""Case counts by region, status, state and creation month for the Cases tab.
+
+A CaseCube counts a case frame's rows once (per frame object, so once per data
+version and region set) into an array with one axis per dimension. The tab's
+filters are then slices of that array: a region or the open statuses select
+positions on their axes, and a date range keeps the whole months between its
+bounds and recounts only the rows of a partial first or last month (found with
+date_index), so the counts match filtering the rows by day. The KPI buttons,
+pie, map, bar and line charts are sums over the other axes, whose cost depends
+on the number of regions, statuses, states and months rather than on the
+number of cases.
+
+The last position on every axis counts rows where that value is missing, so
+totals include them as len() of the rows would.
+"""
+import numpy as np
+import pandas as pd
+
+from date_index import get_date_index
+from frame_cache import cached_for_frame
+
+DIMENSIONS = ['region', 'status', 'state']
+
+def _labels(values):
+    """Return the distinct values of a column, in the order a groupby on it sorts them"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.categories
+    return pd.Index(np.sort(values.dropna().unique()))
+
+def _codes(values, labels):
+    """Return each value's position in labels, with missing or unknown values at len(labels)"""
+    if isinstance(values.dtype, pd.CategoricalDtype) and values.cat.categories.equals(labels):
+        codes = values.cat.codes.to_numpy().astype(np.int64)
+    else:
+        codes = labels.get_indexer(values)
+    codes[codes < 0] = len(labels)
+    return codes
+
+def _months(dates):
+    return dates.to_numpy(dtype='datetime64[ns]').astype('datetime64[M]')
+
+class CaseCube:
+    """Case counts of a frame by region, status, state and month of creationdate
+
+    ``counts`` has shape (regions + 1, statuses + 1, states + 1, months + 1);
+    ``months`` holds the months that have cases, in order.
+    """
+
+    def __init__(self, frame):
+        self.labels = {column: _labels(frame[column]) for column in DIMENSIONS}
+        months = _months(frame['creationdate'])
+        self.months = np.unique(months[~np.isnat(months)])
+        self.counts = self._count(frame)
+
+    def _count(self, rows):
+        """Return the counts array of some rows of the cubed frame"""
+        shape = [len(self.labels[column]) + 1 for column in DIMENSIONS] + [len(self.months) + 1]
+        months = _months(rows['creationdate'])
+        month_codes = np.searchsorted(self.months, months)
+        month_codes[np.isnat(months)] = len(self.months)
+
+        flat = np.zeros(len(rows), dtype=np.int64)
+        for column, size in zip(DIMENSIONS, shape):
+            flat = flat * size + _codes(rows[column], self.labels[column])
+        flat = flat * shape[-1] + month_codes
+        return np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+
+    def _between(self, frame, start, end):
+        """Return the counts of the rows created from start to end: whole months from the cube, the rest from the rows"""
+        date_index = get_date_index(frame)
+        # Whole months are those from first_month up to (not including) last_month
+        first_month = None
+        if start is not None:
+            first_month = np.datetime64(start.to_datetime64(), 'M')
+            if first_month < start.to_datetime64():
+                first_month += 1
+        last_month = np.datetime64(end.to_datetime64(), 'M') if end is not None else None
+        if first_month is not None and last_month is not None and first_month >= last_month:
+            return self._count(date_index.rows(frame, start, end))
+
+        low = np.searchsorted(self.months, first_month) if first_month is not None else 0
+        high = np.searchsorted(self.months, last_month) if last_month is not None else len(self.months)
+        counts = np.zeros_like(self.counts)
+        counts[..., low:high] = self.counts[..., low:high]
+        if first_month is not None and first_month > start.to_datetime64():
+            counts += self._count(date_index.rows(frame, start, pd.Timestamp(first_month) - pd.Timedelta(1)))
+        if last_month is not None:
+            counts += self._count(date_index.rows(frame, pd.Timestamp(last_month), end))
+        return counts
+
+    def select(self, frame, start=None, end=None, region=None):
+        """Return the counts of the cases of ``frame`` (the cubed frame) matching the Cases tab's filters
+
+        ``start`` and ``end`` are inclusive creation date bounds as for
+        DateIndex.rows(), and ``region`` keeps only that region; each may be
+        None for no filter.
+        """
+        counts = self.counts
+        if start is not None or end is not None:
+            counts = self._between(frame, start, end)
+        if region is not None:
+            keep = np.append(self.labels['region'] == region, False)
+            counts = counts * keep[:, None, None, None]
+        return CaseCounts(self.labels, self.months, counts)
+
+class CaseCounts:
+    """A filtered slice of a CaseCube, summed into the Cases tab's KPIs and charts"""
+
+    def __init__(self, labels, months, counts):
+        self.labels = labels
+        self.months = months
+        self.counts = counts
+
+    def _totals(self, column):
+        """Return the number of cases per position on one dimension's axis"""
+        axis = DIMENSIONS.index(column)
+        return self.counts.sum(axis=tuple(other for other in range(self.counts.ndim) if other != axis))
+
+    def with_statuses(self, statuses):
+        """Return the counts of the cases with one of ``statuses``"""
+        keep = np.append(self.labels['status'].isin(statuses), False)
+        return CaseCounts(self.labels, self.months, self.counts * keep[None, :, None, None])
+
+    def total(self):
+        """Return the number of cases, including those with missing values"""
+        return int(self.counts.sum())
+
+    def count_by(self, column):
+        """Return the number of cases per region, status or state, largest first, like value_counts()"""
+        counts = pd.Series(self._totals(column)[:-1], index=self.labels[column].rename(column), name='count')
+        return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+    def nunique(self, column):
+        """Return the number of distinct values of a column among the cases, counting missing as one"""
+        return int(np.count_nonzero(self._totals(column)))
+
+    def by_region_status(self):
+        """Return region, status, count rows for the combinations with cases, like groupby().size()"""
+        totals = self.counts.sum(axis=(2, 3))[:-1, :-1]
+        regions, statuses = np.nonzero(totals)
+        return pd.DataFrame({
+            'region': self.labels['region'][regions],
+            'status': self.labels['status'][statuses],
+            'count': totals[regions, statuses],
+        })
+
+    def month_range(self):
+        """Return the first and last months with dated cases, or None if there are none"""
+        months = np.flatnonzero(self.counts.sum(axis=(0, 1, 2))[:-1])
+        if len(months) == 0:
+            return None
+        return pd.Timestamp(self.months[months[0]]), pd.Timestamp(self.months[months[-1]])
+
+    def monthly_by_region(self):
+        """Return month_year, region, case_count rows per region and for 'Total', as the line chart plots them
+
+        Months are 'YYYY-MM' strings, with cases without a date under 'NaT'; the
+        total includes cases without a region.
+        """
+        totals = self.counts.sum(axis=(1, 2))
+        month_labels = np.append(np.datetime_as_string(self.months, unit='M'), 'NaT')
+        months, regions = np.nonzero(totals[:-1].T)
+        by_region = pd.DataFrame({
+            'month_year': month_labels[months],
+            'region': self.labels['region'][regions],
+            'case_count': totals[regions, months],
+        })
+        month_totals = totals.sum(axis=0)
+        months = np.flatnonzero(month_totals)
+        total = pd.DataFrame({'month_year': month_labels[months], 'case_count': month_totals[months]})
+        total['region'] = 'Total'
+        return pd.concat([by_region, total], ignore_index=True)
+
+def get_case_cube(frame):
+    """Return the CaseCube of a frame, building it the first time the frame is seen"""
+    return cached_for_frame(frame, 'case_cube', CaseCube)
@@ -2,8 +2,15 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, date
 from database import get_custom_data_by_case_id, save_custom_data, delete_custom_data
+from detail_store import fetch_case_details
+from frame_dtypes import row_for_display
+from render_profiler import profiled
 
-def render_case_lookup_tab(df, jamati_member_df, education_df, finance_df, physical_mental_health_df, social_inclusion_agency_df):
+# Tables this tab reads from the shared dataset; domain rows are fetched per case by detail_store
+REQUIRED_TABLES = ['SettlementCase', 'JamatiMember']
+
+@profiled
+def render_case_lookup_tab(df, jamati_member_df):
     """Render the Case Lookup tab with comprehensive case and family member information"""
     
     st.subheader("Settlement Case Lookup")
@@ -70,13 +77,20 @@ def render_case_lookup_tab(df, jamati_member_df, education_df, finance_df, physi
         # Display a summary of family members
         st.markdown(f"### Family Members ({len(jamati_members)})")
 
+        # Domain records of the whole family, fetched by case ID
+        details = fetch_case_details(selected_case_id)
+
         # Loop through each family member
         for idx, member in jamati_members.iterrows():
+            member = row_for_display(member)
             person_id = member['personid']
 
             # Create an expandable section for each member
             with st.expander(f"{member['firstname']} {member['lastname']} ({member['relationtohead']})"):
-                render_family_member_tabs(member, person_id, education_df, social_inclusion_agency_df, finance_df, physical_mental_health_df)
+                render_family_member_tabs(
+                    member, person_id, details['Education'], details['SocialInclusionAgency'],
+                    details['Finance'], details['PhysicalMentalHealth']
+                )
 
 def render_case_information(case_data):
     """Render the case information section"""
@@ -269,7 +283,7 @@ def render_member_education_tab(person_id, education_df):
     edu_data = education_df[education_df['personid'] == person_id]
     
     if not edu_data.empty:
-        edu = edu_data.iloc[0]
+        edu = row_for_display(edu_data.iloc[0])
         
         col1, col2 = st.columns(2)
         
@@ -303,7 +317,7 @@ def render_member_education_tab(person_id, education_df):
         else:
             st.markdown("**Challenges:** None reported")
         
-        # Display all comments
+        # Display all comments (detail rows include the comment columns)
         comments = []
         comment_fields = [
             'comfortablewithteachercomments',
@@ -327,7 +341,7 @@ def render_member_social_inclusion_tab(person_id, social_inclusion_agency_df):
     social_data = social_inclusion_agency_df[social_inclusion_agency_df['personid'] == person_id]
     
     if not social_data.empty:
-        social = social_data.iloc[0]
+        social = row_for_display(social_data.iloc[0])
         
         col1, col2 = st.columns(2)
         
@@ -348,7 +362,7 @@ def render_member_social_inclusion_tab(person_id, social_inclusion_agency_df):
         st.markdown("### Additional Information")
         st.markdown(f"**Current Situation:** {social['currentsituation']}")
         
-        # Display all comments
+        # Display all comments (detail rows include the comment columns)
         comments = []
         comment_fields = [
             'socialsupportcomments',
@@ -375,7 +389,7 @@ def render_member_finance_tab(person_id, finance_df):
     finance_data = finance_df[finance_df['personid'] == person_id]
     
     if not finance_data.empty:
-        finance = finance_data.iloc[0]
+        finance = row_for_display(finance_data.iloc[0])
         
         col1, col2 = st.columns(2)
         
@@ -395,7 +409,7 @@ def render_member_finance_tab(person_id, finance_df):
             st.markdown(f"**Needs Help Managing Finances:** {'Yes' if finance['ishelpneededmanagingfinance'] else 'No'}")
             st.markdown(f"**Has Debt:** {'Yes' if finance['havedebt'] else 'No'}")
         
-        # Display all comments
+        # Display all comments (detail rows include the comment columns)
         comments = []
         comment_fields = [
             'governmentbenefits',
@@ -423,7 +437,7 @@ def render_member_health_tab(person_id, physical_mental_health_df):
     health_data = physical_mental_health_df[physical_mental_health_df['personid'] == person_id]
     
     if not health_data.empty:
-        health = health_data.iloc[0]
+        health = row_for_display(health_data.iloc[0])
         
         col1, col2 = st.columns(2)
         
@@ -460,7 +474,7 @@ def render_member_health_tab(person_id, physical_mental_health_df):
         else:
             st.markdown("No mental health concerns reported")
         
-        # Display all comments
+        # Display all comments (detail rows include the comment columns)
         comments = []
         comment_fields = [
             'medicalcomments',
@@ -1,7 +1,21 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from case_cube import get_case_cube
+from chart_sections import chart_section, show_chart
+from config import SUMMARY_VIEWS
+from data_store import get_data_version, normalize_regions
+from date_index import get_date_index
+from database import fetch_regional_summary
+from figure_cache import cached_figure
+from region_partitions import region_rows
+from regional_summary import OPEN_STATUSES, cached_regional_summary, compute_regional_summary
+from render_profiler import profiled
 
+# Tables this tab reads from the shared dataset; fdp_cases is loaded only once an FDP view is selected
+REQUIRED_TABLES = ['SettlementCase', 'JamatiMember']
+
+@profiled
 def render_cases_tab(df, jamati_member_df, data_source="CMS Data", fdp_df=None, user_regions=None):
     """Render the Cases tab with regional summary, filtering, and visualizations"""
     
@@ -12,6 +26,7 @@ def render_cases_tab(df, jamati_member_df, data_source="CMS Data", fdp_df=None,
         # Comparison mode
         render_comparison_view(df, jamati_member_df, fdp_df, user_regions=user_regions)
 
+@profiled
 def render_single_view(df, jamati_member_df, data_source, user_regions=None):
     """Render single data source view"""
     data_label = "CMS" if data_source == "CMS Data" else "FDP"
@@ -19,12 +34,14 @@ def render_single_view(df, jamati_member_df, data_source, user_regions=None):
     # Date Filter Section (integrated with data source selection)
     st.markdown("Select a date range to filter all data:")
     
-    # Convert creationdate to datetime if it's not already
-    df['creationdate'] = pd.to_datetime(df['creationdate'], errors='coerce')
+    # Convert creationdate to datetime if it's not already (without writing to the shared frame)
+    if not pd.api.types.is_datetime64_any_dtype(df['creationdate']):
+        df = df.assign(creationdate=pd.to_datetime(df['creationdate'], errors='coerce'))
     
-    # Get min and max dates from the data
-    min_date = df['creationdate'].min()
-    max_date = df['creationdate'].max()
+    # Date bounds and lookup, built once per frame (see date_index)
+    date_index = get_date_index(df)
+    min_date = date_index.min_date
+    max_date = date_index.max_date
     
     # Create date picker columns
     col1, col2 = st.columns(2)
@@ -47,40 +64,28 @@ def render_single_view(df, jamati_member_df, data_source, user_regions=None):
             key=f"end_date_{data_source}"
         )
     
-    # Apply date filter to the dataframe
+    # Apply date filter to the dataframe; the charts read the unfiltered frame's case cube
+    cases_df = df
+    start_datetime = pd.to_datetime(start_date) if start_date else None
+    end_datetime = pd.to_datetime(end_date) if end_date else None
     date_range_text = ""
     if start_date and end_date:
-        start_datetime = pd.to_datetime(start_date)
-        end_datetime = pd.to_datetime(end_date)
-        df = df[(df['creationdate'] >= start_datetime) & (df['creationdate'] <= end_datetime)]
+        df = date_index.rows(df, start_datetime, end_datetime)
         date_range_text = f"{start_date} to {end_date}"
         st.info(f"Showing data from {start_date} to {end_date}")
     elif start_date:
-        start_datetime = pd.to_datetime(start_date)
-        df = df[df['creationdate'] >= start_datetime]
+        df = date_index.rows(df, start=start_datetime)
         date_range_text = f"from {start_date}"
         st.info(f"Showing data from {start_date} onwards")
     elif end_date:
-        end_datetime = pd.to_datetime(end_date)
-        df = df[df['creationdate'] <= end_datetime]
+        df = date_index.rows(df, end=end_datetime)
         date_range_text = f"up to {end_date}"
         st.info(f"Showing data up to {end_date}")
     else:
         date_range_text = "all available data"
     
     # Region filter - only show user's allowed regions
-    regions = df['region'].unique()
-    if user_regions and len(user_regions) > 0:
-        # Filter to only show regions that user has access to
-        available_regions = [r for r in regions if r in user_regions]
-        if len(available_regions) == 1:
-            # If only one region, default to it (but still show selector)
-            default_region = available_regions[0]
-            region_options = [default_region]
-        else:
-            region_options = ["All"] + sorted(available_regions)
-    else:
-        region_options = ["All"] + sorted(list(regions))
+    region_options = build_region_options(df, user_regions)
     
     selected_region = st.selectbox("Select Region", options=region_options, key=f"region_filter_{data_source}")
     
@@ -93,35 +98,12 @@ def render_single_view(df, jamati_member_df, data_source, user_regions=None):
     # --- Summary Table at the Top ---
     st.markdown(f"## 🗺️ Regional Summary ({data_label} Data)")
     
-    # 1. Aggregate number of cases per region
-    case_counts = df.groupby('region')['caseid'].nunique().reset_index(name='Number of Cases')
-
-    # 2. For each region, count the number of individuals
-    if data_source == "CMS Data":
-        def count_individuals(region):
-            case_ids = df[df['region'] == region]['caseid'].unique()
-            return jamati_member_df[jamati_member_df['caseid'].isin(case_ids)].shape[0]
-        case_counts['Number of Individuals'] = case_counts['region'].apply(count_individuals)
-    else:
-        # For FDP data, use aggregated family size data if available
-        def count_fdp_individuals(region):
-            region_cases = df[df['region'] == region]
-            if 'number_in_family' in region_cases.columns:
-                return region_cases['number_in_family'].fillna(0).sum()
-            return 0
-        case_counts['Number of Individuals'] = case_counts['region'].apply(count_fdp_individuals)
-
-    # 3. Calculate number of open cases per region
-    open_cases_df = df[df['status'].isin(['Open', 'Reopen'])]
-    open_case_counts = open_cases_df.groupby('region')['caseid'].nunique().reset_index(name='Open Cases')
-
-    # 4. Calculate number of closed cases per region
-    closed_cases_df = df[df['status'].isin(['Closed'])]
-    closed_case_counts = closed_cases_df.groupby('region')['caseid'].nunique().reset_index(name='Closed Cases')
-
-    # 5. Merge open and closed case counts into the summary table
-    case_counts = case_counts.merge(open_case_counts, on='region', how='left').fillna(0)
-    case_counts = case_counts.merge(closed_case_counts, on='region', how='left').fillna(0)
+    # 1-5. Cases, individuals, open and closed cases per region
+    data_version = get_data_version()
+    case_counts = summarize_regions(
+        df, jamati_member_df, data_label, allowed_regions=user_regions, start_date=start_date, end_date=end_date,
+        data_version=data_version
+    )
 
     # 6. Format numbers with commas
     case_counts['Number of Cases'] = case_counts['Number of Cases'].map('{:,}'.format)
@@ -141,14 +123,14 @@ def render_single_view(df, jamati_member_df, data_source, user_regions=None):
     )
     st.markdown("---")
     
-    # Filter the dataframe based on region selection
-    filtered_df = df.copy()
-    if selected_region != "All":
-        filtered_df = filtered_df[filtered_df['region'] == selected_region]
+    # Case counts for the selected region and dates, from the case cube (see case_cube)
+    counts = get_case_cube(cases_df).select(
+        cases_df, start_datetime, end_datetime, region=selected_region if selected_region != "All" else None
+    )
+    open_counts = counts.with_statuses(OPEN_STATUSES)
 
     # Calculate total number of cases and open cases
-    total_cases = len(filtered_df)
-    open_cases = filtered_df[filtered_df['status'].isin(['Open', 'Reopen'])]
+    total_cases = counts.total()
 
     # Display headers side by side with custom color for open cases
     col1, col2 = st.columns(2)
@@ -186,7 +168,7 @@ def render_single_view(df, jamati_member_df, data_source, user_regions=None):
 
     with col2:
         if st.button(
-            f"Open Cases: {len(open_cases)}",
+            f"Open Cases: {open_counts.total()}",
             type="primary" if st.session_state.active_view == 'open' else "secondary",
             use_container_width=True
         ):
@@ -196,119 +178,150 @@ def render_single_view(df, jamati_member_df, data_source, user_regions=None):
 
     # Filter based on active view
     if st.session_state.active_view == 'open':
-        filtered_df = filtered_df[filtered_df['status'].isin(['Open', 'Reopen'])]
+        counts = open_counts
+
+    # Figures are cached per data version and filter state (see figure_cache)
+    figure_key = (
+        data_version, data_label, normalize_regions(user_regions), start_date, end_date, selected_region,
+        st.session_state.active_view
+    )
 
     # Create two columns for pie chart and map
     pie_col, map_col = st.columns(2)
 
     with pie_col:
-        with st.expander("📊 Case Status Distribution (Pie Chart)", expanded=False):
-            # Display pie chart
-            status_counts = filtered_df['status'].value_counts()
-            fig = px.pie(status_counts, values=status_counts.values, names=status_counts.index, 
-                         title=f'Case Status Distribution ({data_label}) - {date_range_text}')
-            st.plotly_chart(fig, use_container_width=True)
+        with chart_section("📊 Case Status Distribution (Pie Chart)", f"status_pie_chart_{data_source}", "status pie chart") as chart_open:
+            if chart_open:
+                fig = cached_figure('status pie', figure_key, lambda: build_status_pie(
+                    counts, f'Case Status Distribution ({data_label}) - {date_range_text}'
+                ))
+                show_chart(fig, use_container_width=True)
 
     with map_col:
-        with st.expander("🗺️ Cases by State (US Map)", expanded=False):
-            # Create US map visualization
-            state_counts = filtered_df['state'].value_counts().reset_index()
-            state_counts.columns = ['state', 'count']
-            
-            # Create the choropleth map
-            fig_map = px.choropleth(
-                state_counts,
-                locations='state',
-                locationmode='USA-states',
-                color='count',
-                scope='usa',
-                color_continuous_scale=['white', 'blue'],
-                title=f'Number of Cases by State ({data_label}) - {date_range_text}',
-                labels={'count': 'Number of Cases'}
-            )
-            
-            # Update the layout for better visualization and remove background
-            fig_map.update_layout(
-                geo_scope='usa',
-                margin=dict(l=0, r=0, t=30, b=0),
-                geo=dict(
-                    showlakes=False,
-                    showland=False,
-                    bgcolor='rgba(0,0,0,0)'
-                ),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)'
-            )
-            
-            # Display the map
-            st.plotly_chart(fig_map, use_container_width=True)
+        with chart_section("🗺️ Cases by State (US Map)", f"state_map_chart_{data_source}", "state map chart") as chart_open:
+            if chart_open:
+                fig_map = cached_figure('state map', figure_key, lambda: build_state_map(
+                    counts, f'Number of Cases by State ({data_label}) - {date_range_text}'
+                ))
+                show_chart(fig_map, use_container_width=True)
 
     # Create stacked bar chart showing case statuses by region
-    with st.expander("📊 Case Status by Region (Stacked Bar Chart)", expanded=False):
-        # Prepare data for stacked bar chart
-        status_region_df = filtered_df.groupby(['region', 'status']).size().reset_index(name='count')
-        
-        if not status_region_df.empty:
-            # Create stacked bar chart
-            stacked_fig = px.bar(
-                status_region_df, 
-                x='region', 
-                y='count', 
-                color='status',
-                title=f'Case Status Distribution by Region ({data_label}) - {date_range_text}',
-                labels={'count': 'Number of Cases', 'region': 'Region'},
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            
-            # Update layout for better readability
-            stacked_fig.update_layout(
-                xaxis_tickangle=-45,
-                height=500,
-                showlegend=True,
-                legend=dict(
-                    orientation="v",
-                    yanchor="top",
-                    y=1,
-                    xanchor="left",
-                    x=1.02
-                )
-            )
-            
-            st.plotly_chart(stacked_fig, use_container_width=True)
-        else:
-            st.warning(f"No data available for status distribution by region ({data_label})")
+    with chart_section("📊 Case Status by Region (Stacked Bar Chart)", f"status_by_region_chart_{data_source}", "status by region chart") as chart_open:
+        if chart_open:
+            stacked_fig = cached_figure('status by region', figure_key, lambda: build_status_by_region_bar(
+                counts, f'Case Status Distribution by Region ({data_label}) - {date_range_text}'
+            ))
+            if stacked_fig is not None:
+                show_chart(stacked_fig, use_container_width=True)
+            else:
+                st.warning(f"No data available for status distribution by region ({data_label})")
 
     # Create a line chart based on the CreationDate, grouped by Region
-    with st.expander("📈 New Cases Over Time by Region (Line Chart)", expanded=False):
-        line_df = filtered_df.copy()
-        line_df['creationdate'] = pd.to_datetime(line_df['creationdate'])
+    with chart_section("📈 New Cases Over Time by Region (Line Chart)", f"cases_over_time_chart_{data_source}", "cases over time chart") as chart_open:
+        if chart_open:
+            line_fig = cached_figure('cases over time', figure_key, lambda: build_cases_over_time(
+                counts, f'New Cases Over Time by Region - Monthly ({data_label}) - {date_range_text}'
+            ))
+            if line_fig is not None:
+                show_chart(line_fig)
+            else:
+                st.warning(f"No valid {data_label} data available for timeline visualization")
 
-        if not line_df.empty:
-            # Create a month column for monthly aggregation
-            line_df['month_year'] = line_df['creationdate'].dt.to_period('M')
-            
-            # Group by Month and Region, then count the number of cases
-            df_grouped = line_df.groupby([line_df['month_year'].astype(str), 'region']).size().reset_index(name='case_count')
-            
-            # Calculate total cases per month (sum across all regions)
-            df_total = line_df.groupby([line_df['month_year'].astype(str)]).size().reset_index(name='case_count')
-            df_total['region'] = 'Total'
-            
-            # Combine regional data with total data
-            df_combined = pd.concat([df_grouped, df_total], ignore_index=True)
+def build_status_pie(counts, title):
+    """Return the pie chart of cases per status"""
+    status_counts = counts.count_by('status')
+    return px.pie(status_counts, values=status_counts.values, names=status_counts.index, title=title)
 
-            # Create the line chart
-            line_fig = px.line(df_combined, x='month_year', y='case_count', color='region', 
-                               title=f'New Cases Over Time by Region - Monthly ({data_label}) - {date_range_text}', 
-                               labels={'month_year': 'Month', 'case_count': 'Number of Cases'})
-            
-            # Update layout to double the height
-            line_fig.update_layout(height=600)
-            
-            st.plotly_chart(line_fig)
-        else:
-            st.warning(f"No valid {data_label} data available for timeline visualization")
+def build_state_map(counts, title):
+    """Return the US map of cases per state"""
+    state_counts = counts.count_by('state').reset_index()
+    state_counts.columns = ['state', 'count']
+    
+    # Create the choropleth map
+    fig_map = px.choropleth(
+        state_counts,
+        locations='state',
+        locationmode='USA-states',
+        color='count',
+        scope='usa',
+        color_continuous_scale=['white', 'blue'],
+        title=title,
+        labels={'count': 'Number of Cases'}
+    )
+    
+    # Update the layout for better visualization and remove background
+    fig_map.update_layout(
+        geo_scope='usa',
+        margin=dict(l=0, r=0, t=30, b=0),
+        geo=dict(
+            showlakes=False,
+            showland=False,
+            bgcolor='rgba(0,0,0,0)'
+        ),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_map
 
+def build_status_by_region_bar(counts, title):
+    """Return the stacked bar chart of cases per region and status, or None if there are none"""
+    status_region_df = counts.by_region_status()
+    if status_region_df.empty:
+        return None
+
+    stacked_fig = px.bar(
+        status_region_df, 
+        x='region', 
+        y='count', 
+        color='status',
+        title=title,
+        labels={'count': 'Number of Cases', 'region': 'Region'},
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    
+    # Update layout for better readability
+    stacked_fig.update_layout(
+        xaxis_tickangle=-45,
+        height=500,
+        showlegend=True,
+        legend=dict(
+            orientation="v",
+            yanchor="top",
+            y=1,
+            xanchor="left",
+            x=1.02
+        )
+    )
+    return stacked_fig
+
+def build_cases_over_time(counts, title):
+    """Return the line chart of new cases per month by region and in total, or None if there are no cases"""
+    if counts.total() == 0:
+        return None
+
+    # Monthly cases per region, plus the total across all regions
+    df_combined = counts.monthly_by_region()
+    line_fig = px.line(df_combined, x='month_year', y='case_count', color='region', 
+                       title=title, 
+                       labels={'month_year': 'Month', 'case_count': 'Number of Cases'})
+    
+    # Update layout to double the height
+    line_fig.update_layout(height=600)
+    return line_fig
+
+def build_region_options(df, user_regions=None):
+    """Return the Region selectbox options: "All" and the regions in ``df`` the user may see"""
+    regions = df['region'].unique()
+    if user_regions and len(user_regions) > 0:
+        # Filter to only show regions that user has access to
+        available_regions = [r for r in regions if r in user_regions]
+        if len(available_regions) == 1:
+            # If only one region, default to it (but still show selector)
+            return [available_regions[0]]
+        return ["All"] + sorted(available_regions)
+    return ["All"] + sorted(list(regions))
+
+@profiled
 def render_comparison_view(cms_df, jamati_member_df, fdp_df, user_regions=None):
     """Render comparison view between CMS and FDP data"""
     
@@ -316,16 +329,19 @@ def render_comparison_view(cms_df, jamati_member_df, fdp_df, user_regions=None):
     st.markdown("Select a date range to filter all data:")
     
     # Convert creationdate to datetime for both datasets
-    cms_df['creationdate'] = pd.to_datetime(cms_df['creationdate'], errors='coerce')
-    if fdp_df is not None:
-        fdp_df['creationdate'] = pd.to_datetime(fdp_df['creationdate'], errors='coerce')
+    if not pd.api.types.is_datetime64_any_dtype(cms_df['creationdate']):
+        cms_df = cms_df.assign(creationdate=pd.to_datetime(cms_df['creationdate'], errors='coerce'))
+    if fdp_df is not None and not pd.api.types.is_datetime64_any_dtype(fdp_df['creationdate']):
+        fdp_df = fdp_df.assign(creationdate=pd.to_datetime(fdp_df['creationdate'], errors='coerce'))
     
-    # Get min and max dates from both datasets
-    cms_min_date = cms_df['creationdate'].min()
-    cms_max_date = cms_df['creationdate'].max()
+    # Get min and max dates from both datasets (see date_index)
+    cms_index = get_date_index(cms_df)
+    cms_min_date = cms_index.min_date
+    cms_max_date = cms_index.max_date
     
-    fdp_min_date = fdp_df['creationdate'].min() if fdp_df is not None else None
-    fdp_max_date = fdp_df['creationdate'].max() if fdp_df is not None else None
+    fdp_index = get_date_index(fdp_df) if fdp_df is not None else None
+    fdp_min_date = fdp_index.min_date if fdp_df is not None else None
+    fdp_max_date = fdp_index.max_date if fdp_df is not None else None
     
     # Find overall min and max dates
     all_dates = [d for d in [cms_min_date, cms_max_date, fdp_min_date, fdp_max_date] if pd.notna(d)]
@@ -353,28 +369,27 @@ def render_comparison_view(cms_df, jamati_member_df, fdp_df, user_regions=None):
             key="end_date_comparison"
         )
     
-    # Apply date filter to both dataframes
+    # Apply date filter to both dataframes; the charts and metrics read the unfiltered frames' case cubes
+    cms_cases, fdp_cases = cms_df, fdp_df
+    start_datetime = pd.to_datetime(start_date) if start_date else None
+    end_datetime = pd.to_datetime(end_date) if end_date else None
     date_range_text = ""
     if start_date and end_date:
-        start_datetime = pd.to_datetime(start_date)
-        end_datetime = pd.to_datetime(end_date)
-        cms_df = cms_df[(cms_df['creationdate'] >= start_datetime) & (cms_df['creationdate'] <= end_datetime)]
+        cms_df = cms_index.rows(cms_df, start_datetime, end_datetime)
         if fdp_df is not None:
-            fdp_df = fdp_df[(fdp_df['creationdate'] >= start_datetime) & (fdp_df['creationdate'] <= end_datetime)]
+            fdp_df = fdp_index.rows(fdp_df, start_datetime, end_datetime)
         date_range_text = f"{start_date} to {end_date}"
         st.info(f"Showing data from {start_date} to {end_date}")
     elif start_date:
-        start_datetime = pd.to_datetime(start_date)
-        cms_df = cms_df[cms_df['creationdate'] >= start_datetime]
+        cms_df = cms_index.rows(cms_df, start=start_datetime)
         if fdp_df is not None:
-            fdp_df = fdp_df[fdp_df['creationdate'] >= start_datetime]
+            fdp_df = fdp_index.rows(fdp_df, start=start_datetime)
         date_range_text = f"from {start_date}"
         st.info(f"Showing data from {start_date} onwards")
     elif end_date:
-        end_datetime = pd.to_datetime(end_date)
-        cms_df = cms_df[cms_df['creationdate'] <= end_datetime]
+        cms_df = cms_index.rows(cms_df, end=end_datetime)
         if fdp_df is not None:
-            fdp_df = fdp_df[fdp_df['creationdate'] <= end_datetime]
+            fdp_df = fdp_index.rows(fdp_df, end=end_datetime)
         date_range_text = f"up to {end_date}"
         st.info(f"Showing data up to {end_date}")
     else:
@@ -402,9 +417,17 @@ def render_comparison_view(cms_df, jamati_member_df, fdp_df, user_regions=None):
     
     # Apply region filter to both dataframes
     if selected_region != "All":
-        cms_df = cms_df[cms_df['region'] == selected_region]
+        cms_df = region_rows(cms_df, selected_region)
         if fdp_df is not None:
-            fdp_df = fdp_df[fdp_df['region'] == selected_region]
+            fdp_df = region_rows(fdp_df, selected_region)
+    
+    # Case counts for the selected region and dates, from each source's case cube (see case_cube)
+    cube_region = selected_region if selected_region != "All" else None
+    cms_counts = get_case_cube(cms_cases).select(cms_cases, start_datetime, end_datetime, region=cube_region)
+    fdp_counts = (
+        get_case_cube(fdp_cases).select(fdp_cases, start_datetime, end_datetime, region=cube_region)
+        if fdp_df is not None else None
+    )
     
     st.markdown("---")
     
@@ -421,30 +444,25 @@ def render_comparison_view(cms_df, jamati_member_df, fdp_df, user_regions=None):
     metric_col1, metric_col2, metric_col3 = st.columns(3)
     
     with metric_col1:
-        cms_total = len(cms_df)
-        fdp_total = len(fdp_df) if fdp_df is not None else 0
+        cms_total = cms_counts.total()
+        fdp_total = fdp_counts.total() if fdp_df is not None else 0
         st.metric("Total Cases", f"CMS: {cms_total:,} | FDP: {fdp_total:,}")
     
     with metric_col2:
-        cms_regions = len(cms_df['region'].unique())
-        fdp_regions = len(fdp_df['region'].unique()) if fdp_df is not None else 0
+        cms_regions = cms_counts.nunique('region')
+        fdp_regions = fdp_counts.nunique('region') if fdp_df is not None else 0
         st.metric("Regions Covered", f"CMS: {cms_regions} | FDP: {fdp_regions}")
     
     with metric_col3:
         cms_date_range = "N/A"
         fdp_date_range = "N/A"
-        if not cms_df['creationdate'].isna().all():
-            cms_min = cms_df['creationdate'].min().strftime('%Y-%m') if pd.notna(cms_df['creationdate'].min()) else "N/A"
-            cms_max = cms_df['creationdate'].max().strftime('%Y-%m') if pd.notna(cms_df['creationdate'].max()) else "N/A"
-            cms_date_range = f"{cms_min} to {cms_max}"
+        cms_months = cms_counts.month_range()
+        if cms_months is not None:
+            cms_date_range = f"{cms_months[0].strftime('%Y-%m')} to {cms_months[1].strftime('%Y-%m')}"
         
-        if fdp_df is not None and not fdp_df['creationdate'].isna().all():
-            try:
-                fdp_min = fdp_df['creationdate'].min().strftime('%Y-%m') if pd.notna(fdp_df['creationdate'].min()) else "N/A"
-                fdp_max = fdp_df['creationdate'].max().strftime('%Y-%m') if pd.notna(fdp_df['creationdate'].max()) else "N/A"
-                fdp_date_range = f"{fdp_min} to {fdp_max}"
-            except:
-                fdp_date_range = "Invalid dates"
+        fdp_months = fdp_counts.month_range() if fdp_df is not None else None
+        if fdp_months is not None:
+            fdp_date_range = f"{fdp_months[0].strftime('%Y-%m')} to {fdp_months[1].strftime('%Y-%m')}"
         
         st.write("**Date Ranges:**")
         st.write(f"CMS: {cms_date_range}")
@@ -456,135 +474,106 @@ def render_comparison_view(cms_df, jamati_member_df, fdp_df, user_regions=None):
     st.markdown("### 🗺️ Regional Summary Comparison")
     
     cms_col, fdp_col = st.columns(2)
+    # The regions and dates both frames were filtered to, for the summary view
+    summary_regions = [selected_region] if selected_region != "All" else user_regions
+    
+    data_version = get_data_version()
     
     with cms_col:
         st.markdown("#### CMS Data")
-        render_regional_summary(cms_df, jamati_member_df, "CMS")
+        render_regional_summary(cms_df, jamati_member_df, "CMS", summary_regions, start_date, end_date, data_version)
     
     with fdp_col:
         st.markdown("#### FDP Data")
         if fdp_df is not None:
-            render_regional_summary(fdp_df, pd.DataFrame(), "FDP")
+            render_regional_summary(fdp_df, pd.DataFrame(), "FDP", summary_regions, start_date, end_date, data_version)
         else:
             st.error("FDP data not available")
     
+    # Figures are cached per data version and filter state (see figure_cache)
+    figure_key = (data_version, "Compare Both", normalize_regions(user_regions), start_date, end_date, selected_region)
+    
     # Status Distribution Comparison
-    with st.expander("📊 Status Distribution Comparison (Pie Charts)", expanded=False):
-        status_col1, status_col2 = st.columns(2)
-        
-        with status_col1:
-            st.markdown("#### CMS Status Distribution")
-            cms_status_counts = cms_df['status'].value_counts()
-            cms_fig = px.pie(cms_status_counts, values=cms_status_counts.values, 
-                            names=cms_status_counts.index, title=f'CMS Case Status - {date_range_text}')
-            st.plotly_chart(cms_fig, use_container_width=True)
-        
-        with status_col2:
-            st.markdown("#### FDP Status Distribution")
-            if fdp_df is not None:
-                fdp_status_counts = fdp_df['status'].value_counts()
-                fdp_fig = px.pie(fdp_status_counts, values=fdp_status_counts.values, 
-                               names=fdp_status_counts.index, title=f'FDP Case Status - {date_range_text}')
-                st.plotly_chart(fdp_fig, use_container_width=True)
-            else:
-                st.error("FDP data not available")
+    with chart_section("📊 Status Distribution Comparison (Pie Charts)", "comparison_status_pie_charts", "comparison status pie charts") as chart_open:
+        if chart_open:
+            status_col1, status_col2 = st.columns(2)
+            
+            with status_col1:
+                st.markdown("#### CMS Status Distribution")
+                cms_fig = cached_figure('CMS status pie', figure_key, lambda: build_status_pie(
+                    cms_counts, f'CMS Case Status - {date_range_text}'
+                ))
+                show_chart(cms_fig, use_container_width=True)
+            
+            with status_col2:
+                st.markdown("#### FDP Status Distribution")
+                if fdp_df is not None:
+                    fdp_fig = cached_figure('FDP status pie', figure_key, lambda: build_status_pie(
+                        fdp_counts, f'FDP Case Status - {date_range_text}'
+                    ))
+                    show_chart(fdp_fig, use_container_width=True)
+                else:
+                    st.error("FDP data not available")
     
     # Case Status by Region Comparison
-    with st.expander("📊 Case Status by Region Comparison (Stacked Bar Charts)", expanded=False):
-        region_status_col1, region_status_col2 = st.columns(2)
-        
-        with region_status_col1:
-            st.markdown("#### CMS Case Status by Region")
-            cms_status_region_df = cms_df.groupby(['region', 'status']).size().reset_index(name='count')
+    with chart_section("📊 Case Status by Region Comparison (Stacked Bar Charts)", "comparison_status_by_region_charts", "comparison status by region charts") as chart_open:
+        if chart_open:
+            region_status_col1, region_status_col2 = st.columns(2)
             
-            if not cms_status_region_df.empty:
-                cms_stacked_fig = px.bar(
-                    cms_status_region_df, 
-                    x='region', 
-                    y='count', 
-                    color='status',
-                    title=f'CMS Case Status by Region - {date_range_text}',
-                    labels={'count': 'Number of Cases', 'region': 'Region'},
-                    color_discrete_sequence=px.colors.qualitative.Set3
-                )
-                
-                cms_stacked_fig.update_layout(
-                    xaxis_tickangle=-45,
-                    height=500,
-                    showlegend=True,
-                    legend=dict(
-                        orientation="v",
-                        yanchor="top",
-                        y=1,
-                        xanchor="left",
-                        x=1.02
-                    )
-                )
-                
-                st.plotly_chart(cms_stacked_fig, use_container_width=True)
-            else:
-                st.warning("No CMS data available for status distribution by region")
-        
-        with region_status_col2:
-            st.markdown("#### FDP Case Status by Region")
-            if fdp_df is not None:
-                fdp_status_region_df = fdp_df.groupby(['region', 'status']).size().reset_index(name='count')
-                
-                if not fdp_status_region_df.empty:
-                    fdp_stacked_fig = px.bar(
-                        fdp_status_region_df, 
-                        x='region', 
-                        y='count', 
-                        color='status',
-                        title=f'FDP Case Status by Region - {date_range_text}',
-                        labels={'count': 'Number of Cases', 'region': 'Region'},
-                        color_discrete_sequence=px.colors.qualitative.Set3
-                    )
-                    
-                    fdp_stacked_fig.update_layout(
-                        xaxis_tickangle=-45,
-                        height=500,
-                        showlegend=True,
-                        legend=dict(
-                            orientation="v",
-                            yanchor="top",
-                            y=1,
-                            xanchor="left",
-                            x=1.02
-                        )
-                    )
-                    
-                    st.plotly_chart(fdp_stacked_fig, use_container_width=True)
+            with region_status_col1:
+                st.markdown("#### CMS Case Status by Region")
+                cms_stacked_fig = cached_figure('CMS status by region', figure_key, lambda: build_status_by_region_bar(
+                    cms_counts, f'CMS Case Status by Region - {date_range_text}'
+                ))
+                if cms_stacked_fig is not None:
+                    show_chart(cms_stacked_fig, use_container_width=True)
                 else:
-                    st.warning("No FDP data available for status distribution by region")
-            else:
-                st.error("FDP data not available")
+                    st.warning("No CMS data available for status distribution by region")
+            
+            with region_status_col2:
+                st.markdown("#### FDP Case Status by Region")
+                if fdp_df is not None:
+                    fdp_stacked_fig = cached_figure('FDP status by region', figure_key, lambda: build_status_by_region_bar(
+                        fdp_counts, f'FDP Case Status by Region - {date_range_text}'
+                    ))
+                    if fdp_stacked_fig is not None:
+                        show_chart(fdp_stacked_fig, use_container_width=True)
+                    else:
+                        st.warning("No FDP data available for status distribution by region")
+                else:
+                    st.error("FDP data not available")
+
+def summarize_regions(df, jamati_df, data_label, allowed_regions=None, start_date=None, end_date=None, data_version=None):
+    """Return the number of cases, individuals, open and closed cases per region
 
-def render_regional_summary(df, jamati_df, data_label):
+    With summary_views on, the counts are read from the regional_case_summary
+    view for the same regions and dates ``df`` was filtered to; otherwise, or if
+    that read fails, they are computed from ``df`` (see regional_summary).
+    Given the shared dataset's ``data_version``, the result is memoized for that
+    version, source, regions and dates, so both views and later reruns reuse it.
+    """
+    def compute():
+        if SUMMARY_VIEWS:
+            summary = fetch_regional_summary(
+                data_label, allowed_regions=allowed_regions, start_date=start_date, end_date=end_date
+            )
+            if summary is not None:
+                return summary
+        return compute_regional_summary(df, jamati_df, data_label)
+
+    if data_version is None:
+        return compute()
+    filter_key = (data_version, data_label, normalize_regions(allowed_regions), start_date, end_date)
+    return cached_regional_summary(filter_key, compute)
+
+@profiled
+def render_regional_summary(df, jamati_df, data_label, allowed_regions=None, start_date=None, end_date=None, data_version=None):
     """Render regional summary for a specific dataset"""
-    case_counts = df.groupby('region')['caseid'].nunique().reset_index(name='Number of Cases')
-    
-    if data_label == "CMS" and not jamati_df.empty:
-        def count_individuals(region):
-            case_ids = df[df['region'] == region]['caseid'].unique()
-            return jamati_df[jamati_df['caseid'].isin(case_ids)].shape[0]
-        case_counts['Number of Individuals'] = case_counts['region'].apply(count_individuals)
-    else:
-        def count_fdp_individuals(region):
-            region_cases = df[df['region'] == region]
-            if 'number_in_family' in region_cases.columns:
-                return region_cases['number_in_family'].fillna(0).sum()
-            return 0
-        case_counts['Number of Individuals'] = case_counts['region'].apply(count_fdp_individuals)
-    
-    open_cases = df[df['status'].isin(['Open', 'Reopen'])]
-    open_counts = open_cases.groupby('region')['caseid'].nunique().reset_index(name='Open Cases')
-    case_counts = case_counts.merge(open_counts, on='region', how='left').fillna(0)
-    
-    closed_cases = df[df['status'].isin(['Closed'])]
-    closed_counts = closed_cases.groupby('region')['caseid'].nunique().reset_index(name='Closed Cases')
-    case_counts = case_counts.merge(closed_counts, on='region', how='left').fillna(0)
-    
+    case_counts = summarize_regions(
+        df, jamati_df, data_label, allowed_regions=allowed_regions, start_date=start_date, end_date=end_date,
+        data_version=data_version
+    )
+
     # Format numbers
     display_df = case_counts.copy()
     display_df['Number of Cases'] = display_df['Number of Cases'].map('{:,}'.format)
@@ -0,0 +1,38 @@
+"""Collapsible chart sections whose charts are built only while they are open.
+
+A collapsed st.expander still runs its body, so every chart in it would be
+aggregated, built and sent to the browser on every rerun. A chart_section() is
+an expander that reruns the app when it is opened or closed, like the main tabs
+(see app.py), and yields whether it is open; the caller builds its charts only
+then. With render_profiling on, the sections are timed, show_chart() records
+the size of each figure sent, and closed sections are reported as skipped (see
+render_profiler).
+"""
+from contextlib import contextmanager
+
+import streamlit as st
+
+from render_profiler import profile_section, record_chart_payload, skip_section
+
+@contextmanager
+def chart_section(label, key, name):
+    """Expander for one or more charts; yields True if it is open and its charts should be built
+
+    Args:
+        label: The expander's label
+        key: Widget key, unique on the page, that keeps the section's open state across reruns
+        name: Section name in the rerun profile
+    """
+    expander = st.expander(label, expanded=False, key=key, on_change="rerun")
+    with expander:
+        if not expander.open:
+            skip_section(name)
+            yield False
+            return
+        with profile_section(name):
+            yield True
+
+def show_chart(fig, **kwargs):
+    """Send a plotly figure with st.plotly_chart, recording its size for the rerun profile"""
+    st.plotly_chart(fig, **kwargs)
+    record_chart_payload(fig)
@@ -2,18 +2,17 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import re
+from render_profiler import profile_section, profiled
+
+# Tables this tab reads from the shared dataset
+REQUIRED_TABLES = ['SettlementCase', 'JamatiMember', 'Education']
 
 def get_col_name(preferred, alternative):
     """Get the appropriate column name with fallback options"""
     return preferred if preferred else alternative
 
-def render_children_tab(df, jamati_member_df, education_df, finance_df, physical_mental_health_df, social_inclusion_agency_df):
-    """Render the Children's Data tab with comprehensive children analysis"""
-    
-    st.subheader("Children's Data (18 and Under)")
-    
-    # Filter children based on birth year
-    current_year = 2025
+def select_children(jamati_member_df, current_year=2025):
+    """Return the members aged 18 and under, with an 'age' column"""
     children_df = jamati_member_df[
         (jamati_member_df['yearofbirth'].notna()) & 
         (jamati_member_df['yearofbirth'] >= current_year - 18) &
@@ -22,6 +21,34 @@ def render_children_tab(df, jamati_member_df, education_df, finance_df, physical
     
     # Calculate age for children
     children_df['age'] = current_year - children_df['yearofbirth']
+    return children_df
+
+def summarize_children_by_region(df, children_df, regions):
+    """Return [{'Region', 'Total Children', 'Children in Active Cases'}] for each region of the cases"""
+    active_cases = df[df['status'].isin(['Open', 'Reopen'])]['caseid'].unique()
+    children_active_cases = children_df[children_df['caseid'].isin(active_cases)]
+    
+    children_summary = []
+    for region in regions:
+        region_cases = df[df['region'] == region]['caseid'].unique()
+        region_children = children_df[children_df['caseid'].isin(region_cases)]
+        region_active_children = children_active_cases[children_active_cases['caseid'].isin(region_cases)]
+        
+        children_summary.append({
+            'Region': region,
+            'Total Children': len(region_children),
+            'Children in Active Cases': len(region_active_children)
+        })
+    return children_summary
+
+@profiled
+def render_children_tab(df, jamati_member_df, education_df):
+    """Render the Children's Data tab with comprehensive children analysis"""
+    
+    st.subheader("Children's Data (18 and Under)")
+    
+    # Filter children based on birth year
+    children_df = select_children(jamati_member_df)
     
     if not children_df.empty:
         # Summary table showing children linked to active cases per region
@@ -33,20 +60,7 @@ def render_children_tab(df, jamati_member_df, education_df, finance_df, physical
         else:
             regions = df['region'].dropna().unique()
             if len(regions) > 0:
-                active_cases = df[df['status'].isin(['Open', 'Reopen'])]['caseid'].unique()
-                children_active_cases = children_df[children_df['caseid'].isin(active_cases)]
-                
-                children_summary = []
-                for region in regions:
-                    region_cases = df[df['region'] == region]['caseid'].unique()
-                    region_children = children_df[children_df['caseid'].isin(region_cases)]
-                    region_active_children = children_active_cases[children_active_cases['caseid'].isin(region_cases)]
-                    
-                    children_summary.append({
-                        'Region': region,
-                        'Total Children': len(region_children),
-                        'Children in Active Cases': len(region_active_children)
-                    })
+                children_summary = summarize_children_by_region(df, children_df, regions)
                 
                 if children_summary:
                     summary_df = pd.DataFrame(children_summary)
@@ -69,7 +83,7 @@ def render_children_tab(df, jamati_member_df, education_df, finance_df, physical
         col1, col2 = st.columns(2)
         
         with col1:
-            with st.expander("📈 Children Age Distribution", expanded=False):
+            with st.expander("📈 Children Age Distribution", expanded=False), profile_section("children age chart"):
                 age_counts = children_df['age'].value_counts().sort_index()
                 age_fig = px.bar(
                     x=age_counts.index,
@@ -83,9 +97,9 @@ def render_children_tab(df, jamati_member_df, education_df, finance_df, physical
                 st.plotly_chart(age_fig, use_container_width=True)
         
         with col2:
-            with st.expander("🌍 Children Country of Origin Distribution", expanded=False):
+            with st.expander("🌍 Children Country of Origin Distribution", expanded=False), profile_section("children origin chart"):
                 children_origin_counts = children_df['countryoforigin'].dropna()
-                children_origin_counts = children_origin_counts[children_origin_counts != ""].value_counts()
+                children_origin_counts = children_origin_counts[children_origin_counts != ""].value_counts().loc[lambda counts: counts > 0]
                 
                 if not children_origin_counts.empty:
                     origin_fig = px.pie(
@@ -134,11 +148,11 @@ def render_children_tab(df, jamati_member_df, education_df, finance_df, physical
                     st.dataframe(edu_summary_df, hide_index=True)
                 
                 with col2:
-                    with st.expander("🏆 Academic Performance Distribution", expanded=False):
+                    with st.expander("🏆 Academic Performance Distribution", expanded=False), profile_section("academic performance chart"):
                         # Academic performance distribution
                         perf_col = 'academicperformance' if 'academicperformance' in children_edu_merged.columns else 'AcademicPerformance'
                         if perf_col in children_edu_merged.columns:
-                            perf_counts = children_edu_merged[perf_col].dropna().value_counts()
+                            perf_counts = children_edu_merged[perf_col].dropna().value_counts().loc[lambda counts: counts > 0]
                             if not perf_counts.empty:
                                 perf_fig = px.bar(
                                     x=perf_counts.index,
@@ -182,9 +196,9 @@ def render_children_tab(df, jamati_member_df, education_df, finance_df, physical
         
         if available_child_cols:
             children_display_df = children_df[available_child_cols].copy()
-            bool_columns = children_display_df.select_dtypes(include=['bool']).columns
+            bool_columns = children_display_df.select_dtypes(include=['bool', 'boolean']).columns
             for col in bool_columns:
-                children_display_df[col] = children_display_df[col].replace({True: 'Yes', False: 'No'})
+                children_display_df[col] = children_display_df[col].astype(object).replace({True: 'Yes', False: 'No'})
             
             st.dataframe(children_display_df, hide_index=True, use_container_width=True)
         
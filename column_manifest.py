@@ -0,0 +1,84 @@
+"""Columns each part of the app reads from the database, per table.
+
+The loader fetches only the union of the columns declared here, so when a tab
+starts reading a new field of a bulk-loaded table it must be added to that
+tab's manifest. The lookup tabs read the domain tables (and their free-text
+comment columns) as complete rows for one person or case through
+``detail_store``, so they declare only the bulk frames they read.
+"""
+
+# Columns always loaded so rows can be joined and looked up again
+TABLE_KEYS = {
+    'SettlementCase': ['caseid'],
+    'JamatiMember': ['personid', 'caseid'],
+    'Education': ['educationid', 'personid'],
+    'Finance': ['financeid', 'personid'],
+    'PhysicalMentalHealth': ['healthid', 'personid'],
+    'SocialInclusionAgency': ['socialinclusionid', 'personid'],
+    'fdp_cases': ['access_case'],
+}
+
+JAMATI_MEMBER_COLUMNS = [
+    'personid', 'caseid', 'firstname', 'lastname', 'yearofbirth', 'countryoforigin',
+    'relationtohead', 'legalstatus', 'usarrivalyear', 'borninusa', 'englishfluency',
+    'educationlevel',
+]
+
+EDUCATION_FLAG_COLUMNS = [
+    'isattendingschool', 'isattendingecdc', 'isattendingrec', 'hasacademicissues',
+    'hasextracurriculars', 'isbullied', 'hasbehaviorchallenges', 'hasdisability',
+    'hasspecializedlearningplans',
+]
+
+# Columns read by each consumer (tab renderer), per table
+TAB_COLUMNS = {
+    'cases': {
+        'SettlementCase': ['caseid', 'region', 'status', 'state', 'creationdate'],
+        'JamatiMember': ['caseid'],
+        'fdp_cases': [
+            'access_case', 'region', 'settlement_case_status', 'family_last_name',
+            'head_of_family_first_name', 'state_code_2_digits', 'access_case_creation_date',
+            'settlement_cm', 'phone', 'current_location', 'zip_code', 'number_in_family',
+        ],
+    },
+    'case_lookup': {
+        'SettlementCase': [
+            'caseid', 'region', 'jamatkhana', 'status', 'assignedto', 'inputtype',
+            'firstname', 'lastname', 'phonenumber', 'email', 'city', 'state', 'zip',
+            'creationdate', 'openreopendate', 'lastlogdate',
+        ],
+        'JamatiMember': JAMATI_MEMBER_COLUMNS,
+    },
+    'member_lookup': {
+        'JamatiMember': JAMATI_MEMBER_COLUMNS,
+    },
+    'demographics': {
+        'JamatiMember': JAMATI_MEMBER_COLUMNS,
+    },
+    'children': {
+        'SettlementCase': ['caseid', 'region', 'status'],
+        'JamatiMember': JAMATI_MEMBER_COLUMNS,
+        'Education': ['academicperformance'] + EDUCATION_FLAG_COLUMNS,
+    },
+}
+
+def required_columns(table, consumers=None):
+    """Return the key columns plus the union of columns the given consumers read
+
+    Args:
+        table: Table name as used in database.build_table_query
+        consumers: Iterable of TAB_COLUMNS keys; all consumers when None
+
+    Returns:
+        List of column names in a stable order, or an empty list if no consumer reads the table
+    """
+    if consumers is None:
+        consumers = TAB_COLUMNS.keys()
+
+    columns = []
+    for consumer in consumers:
+        columns.extend(TAB_COLUMNS[consumer].get(table, []))
+    if not columns:
+        return []
+
+    return list(dict.fromkeys(TABLE_KEYS.get(table, []) + columns))
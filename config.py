@@ -1,15 +1,94 @@
+import os
 import streamlit as st
 
 
-# Database configuration with decryption
-DB_HOST = st.secrets["db_host"]
-DB_NAME = st.secrets["db_name"]
-DB_USER = st.secrets["db_username"]
-DB_PASSWORD = st.secrets["db_password"]
-DB_PORT = st.secrets["db_port"]
+def _setting(key, default=None):
+    """Read an optional setting from SETTLEMENT_<KEY> in the environment, then secrets.toml"""
+    env_value = os.environ.get(f"SETTLEMENT_{key.upper()}")
+    if env_value is not None:
+        return env_value
+    try:
+        return st.secrets.get(key, default)
+    except FileNotFoundError:
+        return default
 
-# Construct database URL
-if DB_USER and DB_PASSWORD:
-    DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-else:
-    raise ValueError("Database credentials not properly configured or decrypted") 
\ No newline at end of file
+def _flag(key, default):
+    """Read a boolean setting, accepting true/false strings from the environment"""
+    value = _setting(key, default)
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+# Scripts (benchmarks, audits) can point at another database with SETTLEMENT_DATABASE_URL
+DATABASE_URL = os.environ.get("SETTLEMENT_DATABASE_URL")
+
+if not DATABASE_URL:
+    # Database configuration with decryption
+    DB_HOST = st.secrets["db_host"]
+    DB_NAME = st.secrets["db_name"]
+    DB_USER = st.secrets["db_username"]
+    DB_PASSWORD = st.secrets["db_password"]
+    DB_PORT = st.secrets["db_port"]
+
+    # Construct database URL
+    if DB_USER and DB_PASSWORD:
+        DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    else:
+        raise ValueError("Database credentials not properly configured or decrypted")
+
+# Connection pool sizing (shared by every session in the Streamlit process)
+DB_POOL_MINCONN = int(_setting("db_pool_minconn", 1))
+DB_POOL_MAXCONN = int(_setting("db_pool_maxconn", 10))
+DB_POOL_TIMEOUT = float(_setting("db_pool_timeout", 30))
+DB_POOL_HEALTH_CHECK_INTERVAL = float(_setting("db_pool_health_check_interval", 30))
+
+# Shared data snapshot cache (one entry per distinct region set)
+DATA_CACHE_TTL_SECONDS = int(_setting("data_cache_ttl_seconds", 900))
+DATA_CACHE_MAX_ENTRIES = int(_setting("data_cache_max_entries", 16))
+
+# Load SettlementCase, JamatiMember and the domain tables concurrently on separate pooled connections
+PARALLEL_TABLE_FETCH = _flag("parallel_table_fetch", True)
+TABLE_FETCH_WORKERS = int(_setting("table_fetch_workers", 4))
+
+# How query results are transferred: "read_sql" (row tuples via pandas), "copy" (COPY ... TO STDOUT as CSV)
+# or "stream" (a server-side cursor read stream_fetch_size rows at a time)
+DATA_LOADER = _setting("data_loader", "read_sql")
+STREAM_FETCH_SIZE = int(_setting("stream_fetch_size", 10000))
+
+# Per-person and per-case detail records kept by the lookup tabs' LRU cache
+DETAIL_CACHE_MAX_ENTRIES = int(_setting("detail_cache_max_entries", 2000))
+
+# Read the Cases tab's Regional Summary from the regional_case_summary materialized view (regional_summary.sql)
+SUMMARY_VIEWS = _flag("summary_views", False)
+# Regional summaries memoized per data version, source, region set and date range (see regional_summary)
+SUMMARY_CACHE_MAX_ENTRIES = int(_setting("summary_cache_max_entries", 64))
+
+# Cases tab figures kept per data version and filter state (see figure_cache)
+FIGURE_CACHE_MAX_ENTRIES = int(_setting("figure_cache_max_entries", 128))
+
+# Query instrumentation (see query_log): records kept for the diagnostics panel, and the slow-query threshold
+QUERY_LOG_SIZE = int(_setting("query_log_size", 500))
+SLOW_QUERY_MS = float(_setting("slow_query_ms", 500))
+
+# Users who see the diagnostics panel, as a comma-separated list of emails
+_admin_emails = _setting("admin_emails", "")
+if isinstance(_admin_emails, str):
+    _admin_emails = _admin_emails.split(",")
+ADMIN_EMAILS = {email.strip().lower() for email in _admin_emails if email.strip()}
+
+# Time render functions, loaders and chart blocks per rerun for the diagnostics panel (see render_profiler)
+RENDER_PROFILING = _flag("render_profiling", False)
+# Write a "cprofile" or "pyinstrument" profile of every rerun to profile_dir (off when empty)
+PROFILE_RERUNS = str(_setting("profile_reruns", "")).strip().lower()
+PROFILE_DIR = _setting("profile_dir", "profiles")
+
+# Directory for versioned on-disk snapshots of the loaded tables (disabled when empty)
+SNAPSHOT_DIR = _setting("snapshot_dir", "")
+SNAPSHOT_KEEP = int(_setting("snapshot_keep", 3))
+
+# How the background refresh updates a snapshot: "full" reload or "incremental" delta sync
+SYNC_MODE = _setting("sync_mode", "full")
+
+# Convert loaded frames to categoricals, nullable Int64/boolean and datetime64 (see frame_dtypes)
+COMPACT_DTYPES = _flag("compact_dtypes", True)
@@ -0,0 +1,273 @@
+import threading
+from datetime import datetime
+
+import streamlit as st
+from config import (
+    DATA_CACHE_TTL_SECONDS,
+    DATA_CACHE_MAX_ENTRIES,
+    SNAPSHOT_DIR,
+    SNAPSHOT_KEEP,
+    SUMMARY_VIEWS,
+    SYNC_MODE,
+)
+from database import DATASET_TABLES, fetch_full_dataset, get_data_fingerprint, refresh_regional_summaries, updated_tables
+from delta_sync import sync_dataset
+from detail_store import clear_detail_cache
+from fdp_pipeline import normalize_fdp_cases
+from figure_cache import clear_figure_cache
+from region_partitions import assemble_regions, partition_dataset
+from regional_summary import clear_summary_cache
+from render_profiler import profiled
+from snapshot_store import read_latest_snapshot, read_snapshot, snapshots_available, write_snapshot
+
+# Tables loaded with the shared dataset; the others are loaded the first time a tab needs them
+CORE_TABLES = ['SettlementCase', 'JamatiMember']
+
+# Held by the refresh that is fetching and swapping in new data, so an older fetch never replaces a newer one
+_refresh_lock = threading.Lock()
+# Held while tables are added to the shared dataset so each is only loaded once
+_load_lock = threading.Lock()
+# Held while the shared dataset's frames and partitions are swapped or read together
+_swap_lock = threading.Lock()
+
+def normalize_regions(allowed_regions):
+    """Return an order-independent, hashable key for a region list (None means all regions)"""
+    if not allowed_regions:
+        return None
+    return tuple(sorted(set(allowed_regions)))
+
+def disk_snapshots_enabled():
+    """Return True when snapshots are configured and pyarrow is available"""
+    return bool(SNAPSHOT_DIR) and snapshots_available()
+
+@st.cache_resource(show_spinner=False)
+def _load_shared_dataset():
+    """Load the all-regions CORE_TABLES once per process
+
+    Every session reads from the frames held here. A refresh swaps in new
+    frames rather than editing these, so a rerun that is still rendering keeps
+    a consistent set. Other tables are added by _ensure_tables(). 'version'
+    counts the refreshes, so caches of derived data can be keyed on it.
+    """
+    if disk_snapshots_enabled():
+        snapshot = read_latest_snapshot(SNAPSHOT_DIR, CORE_TABLES)
+        if snapshot is not None and all(table in snapshot[1] for table in CORE_TABLES):
+            manifest, frames = snapshot
+            print(f"Loaded data snapshot {manifest['version']} from disk")
+            frames, partitions = partition_dataset(frames)
+            return {
+                'frames': frames,
+                'partitions': partitions,
+                'fingerprint': manifest.get('fingerprint'),
+                'loaded_at': datetime.fromisoformat(manifest['created_at']),
+                'snapshot_version': manifest['version'],
+                'version': 0,
+            }
+        print("No data snapshot on disk; fetching from the database...")
+
+    fingerprint = get_data_fingerprint()
+    frames, partitions = partition_dataset(fetch_full_dataset(CORE_TABLES))
+    version = None
+    if disk_snapshots_enabled():
+        version = write_snapshot(SNAPSHOT_DIR, frames, fingerprint=fingerprint, keep=SNAPSHOT_KEEP)
+    return {
+        'frames': frames,
+        'partitions': partitions,
+        'fingerprint': fingerprint,
+        'loaded_at': datetime.now(),
+        'snapshot_version': version,
+        'version': 0,
+    }
+
+def _ensure_tables(dataset, tables):
+    """Add any of ``tables`` the shared dataset does not hold yet
+
+    Tables are read from the snapshot the dataset was loaded from when it has
+    them and fetched from the database otherwise; in that case a new snapshot
+    including them is written so the next process finds them on disk. A table
+    that fails to load is left out, so the next call fetches it again.
+    """
+    if all(table in dataset['frames'] for table in tables):
+        return
+
+    with _load_lock:
+        missing = [table for table in tables if table not in dataset['frames']]
+        if not missing:
+            return
+
+        loaded = {}
+        if disk_snapshots_enabled() and dataset['snapshot_version']:
+            snapshot = read_snapshot(SNAPSHOT_DIR, dataset['snapshot_version'], missing)
+            if snapshot is not None:
+                loaded = snapshot[1]
+        fetch = [table for table in missing if table not in loaded]
+        if fetch:
+            print(f"Loading {', '.join(fetch)} on first use...")
+            loaded.update(fetch_full_dataset(fetch))
+        if not loaded:
+            return
+
+        with _swap_lock:
+            frames, partitions = partition_dataset({**dataset['frames'], **loaded}, tables=list(loaded))
+            dataset['frames'] = frames
+            dataset['partitions'] = {**dataset['partitions'], **partitions}
+
+        if fetch and disk_snapshots_enabled():
+            dataset['snapshot_version'] = write_snapshot(
+                SNAPSHOT_DIR, frames, fingerprint=dataset['fingerprint'], keep=SNAPSHOT_KEEP
+            )
+
+def refresh_shared_dataset(force=False):
+    """Reload the shared dataset if the database changed since it was loaded
+
+    With sync_mode "incremental" only the changed rows are fetched and merged,
+    and tables with rows updated in place are reloaded (see
+    delta_sync.sync_dataset()); otherwise, or when forced, every loaded
+    table is reloaded. The new dataset is written to disk when snapshots are enabled,
+    and the regional_case_summary view is refreshed when summary_views is on.
+
+    Returns:
+        True if the dataset was replaced and the region views were cleared
+    """
+    dataset = _load_shared_dataset()
+    fingerprint = get_data_fingerprint()
+    if not force and dataset['fingerprint'] == fingerprint:
+        return False
+
+    if SYNC_MODE == 'incremental' and not force:
+        frames, stats = sync_dataset(dataset['frames'], updated_tables(dataset['fingerprint'], fingerprint))
+        changed = sum(s['fetched'] + s['deleted'] for t, s in stats.items() if t != 'fdp_cases')
+        print(f"Incremental sync fetched or deleted {changed} CMS rows")
+    else:
+        requested = list(dataset['frames'])
+        frames = fetch_full_dataset(requested)
+        failed = [table for table in requested if table not in frames]
+        if failed:
+            # Keep the loaded frames of tables that failed, and reload them on the next check
+            print(f"Could not reload {', '.join(failed)}; keeping the previous data")
+            fingerprint = None
+    # Merged rows are appended at the end, so the partitions are rebuilt either way
+    frames, partitions = partition_dataset(frames)
+
+    # Swap in the new frames; sessions still rendering with the old ones keep them until they finish
+    with _swap_lock:
+        # Keep tables a tab loaded while this refresh ran (the next refresh syncs them) or that failed to reload
+        for table in dataset['frames'].keys() - frames.keys():
+            frames[table] = dataset['frames'][table]
+            partitions[table] = dataset['partitions'][table]
+        dataset.update(
+            frames=frames, partitions=partitions, fingerprint=fingerprint,
+            loaded_at=datetime.now(), version=dataset['version'] + 1,
+        )
+    if disk_snapshots_enabled():
+        dataset['snapshot_version'] = write_snapshot(SNAPSHOT_DIR, frames, fingerprint=fingerprint, keep=SNAPSHOT_KEEP)
+        print(f"Wrote data snapshot {dataset['snapshot_version']}")
+    if SUMMARY_VIEWS:
+        refresh_regional_summaries()
+    _load_region_view.clear()
+    _load_fdp_view.clear()
+    clear_summary_cache()
+    clear_detail_cache()
+    clear_figure_cache()
+    return True
+
+def _start_background_refresh():
+    """Check for newer data in a daemon thread unless a check is already running"""
+    if not _refresh_lock.acquire(blocking=False):
+        return
+
+    def run():
+        try:
+            refresh_shared_dataset()
+        except Exception as e:
+            print(f"Error refreshing shared dataset: {e}")
+        finally:
+            _refresh_lock.release()
+
+    threading.Thread(target=run, name="dataset-refresh", daemon=True).start()
+
+# One entry per region set and table, so the limit scales with the number of tables
+@st.cache_resource(
+    ttl=DATA_CACHE_TTL_SECONDS, max_entries=DATA_CACHE_MAX_ENTRIES * len(DATASET_TABLES), show_spinner=False
+)
+def _load_region_view(region_key, table):
+    """Build one table's frame for a normalized region set; shared by every session with that key
+
+    The all-regions key returns the shared frame itself and a single region
+    returns a slice of its partition. Other keys hold one concatenation of their
+    partitions per distinct region set, however many sessions use it.
+    When an entry expires, the shared dataset is checked for changes in the
+    background while this view is rebuilt from the frames already in memory.
+    """
+    dataset = _load_shared_dataset()
+    _ensure_tables(dataset, [table])
+    _start_background_refresh()
+    with _swap_lock:
+        frames = {table: dataset['frames'][table]}
+        partitions = {table: dataset['partitions'][table]}
+    return assemble_regions(frames, partitions, region_key)[table]
+
+@profiled
+def load_data_snapshot(allowed_regions=None, tables=None):
+    """Return the frames a session may see, as views of the shared dataset
+
+    Only the requested tables are loaded; a table no session has asked for yet
+    is loaded from disk or the database at this point. Sessions whose regions
+    normalize to the same key share one view. The frames are shared and must be
+    treated as read-only.
+
+    Args:
+        allowed_regions: Region codes the session may see (None means all regions)
+        tables: Tables to return; defaults to CORE_TABLES
+
+    Returns:
+        Dict with 'frames' (table name -> DataFrame) and 'loaded_at', or None on failure
+    """
+    tables = list(tables or CORE_TABLES)
+    try:
+        dataset = _load_shared_dataset()
+        # Load every missing table in one parallel fetch before building the views
+        _ensure_tables(dataset, tables)
+        failed = [table for table in tables if table not in dataset['frames']]
+        if failed:
+            print(f"Could not load {', '.join(failed)}; retrying on the next request")
+            return None
+        region_key = normalize_regions(allowed_regions)
+        return {
+            'frames': {table: _load_region_view(region_key, table) for table in tables},
+            'loaded_at': dataset['loaded_at'],
+        }
+    except Exception as e:
+        print(f"Error loading data snapshot: {e}")
+        return None
+
+@st.cache_resource(ttl=DATA_CACHE_TTL_SECONDS, max_entries=DATA_CACHE_MAX_ENTRIES, show_spinner=False)
+def _load_fdp_view(region_key, version):
+    """Normalize one region set's fdp_cases rows; cached per data version and region set"""
+    return normalize_fdp_cases(_load_region_view(region_key, 'fdp_cases'))
+
+def load_fdp_cases(allowed_regions=None):
+    """Return the normalized, CMS-aligned fdp_cases rows for the given regions
+
+    The normalization (see fdp_pipeline) runs once per data version and region
+    set, so switching the Cases tab between data sources does not repeat it.
+    The frame is shared and must be treated as read-only.
+    """
+    dataset = _load_shared_dataset()
+    _ensure_tables(dataset, ['fdp_cases'])
+    return _load_fdp_view(normalize_regions(allowed_regions), dataset['version'])
+
+def get_data_version():
+    """Return the shared dataset's version, which changes whenever a refresh replaces its frames"""
+    return _load_shared_dataset()['version']
+
+def refresh_data_snapshots():
+    """Reload the shared dataset from the database now and rebuild every region view
+
+    Waits for a background refresh that is already running to swap in its data first.
+    """
+    try:
+        with _refresh_lock:
+            refresh_shared_dataset(force=True)
+    except Exception as e:
+        print(f"Error refreshing shared dataset: {e}")
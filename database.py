@@ -1,109 +1,637 @@
+import io
+import uuid
+import streamlit as st
 import psycopg2
 import pandas as pd
-from config import DATABASE_URL
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from config import (
+    DATABASE_URL,
+    DB_POOL_MINCONN,
+    DB_POOL_MAXCONN,
+    DB_POOL_TIMEOUT,
+    DB_POOL_HEALTH_CHECK_INTERVAL,
+    DATA_CACHE_TTL_SECONDS,
+    PARALLEL_TABLE_FETCH,
+    TABLE_FETCH_WORKERS,
+    DATA_LOADER,
+    STREAM_FETCH_SIZE,
+    COMPACT_DTYPES,
+)
+from db_pool import ConnectionPool
+from column_manifest import TABLE_KEYS, required_columns
+from frame_dtypes import CATEGORY_COLUMNS, compact_frame
+from query_log import approximate_frame_bytes, approximate_rows_bytes, note_connection_wait, track_query
+from render_profiler import profiled
 
-def connect_to_database():
-    """Establish connection to the database"""
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
+
+@st.cache_resource(show_spinner=False)
+def get_connection_pool():
+    """Create the process-wide connection pool shared by every session"""
+    print(f"Creating database connection pool (min={DB_POOL_MINCONN}, max={DB_POOL_MAXCONN})")
+    return ConnectionPool(
+        DATABASE_URL,
+        minconn=DB_POOL_MINCONN,
+        maxconn=DB_POOL_MAXCONN,
+        timeout=DB_POOL_TIMEOUT,
+        health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL,
+    )
+
+@contextmanager
+def get_connection():
+    """Check out a pooled connection for the duration of a with-block"""
+    pool = get_connection_pool()
+    with pool.connection() as conn:
+        # Charged to the first query run on this connection (see query_log)
+        note_connection_wait(pool.last_wait_seconds())
+        yield conn
+
+def get_pool_metrics():
+    """Return checkout/wait/timeout counters for the shared connection pool"""
     try:
-        conn = psycopg2.connect(DATABASE_URL)
-        print("Successfully connected to the database!")
-        return conn
+        return get_connection_pool().metrics()
     except psycopg2.Error as e:
-        print(f"Error connecting to the database: {e}")
-        return None
+        print(f"Error reading connection pool metrics: {e}")
+        return {}
+
+# Tables keyed by PersonID that hang off JamatiMember
+DOMAIN_TABLES = ['Education', 'Finance', 'PhysicalMentalHealth', 'SocialInclusionAgency']
+
+TABLE_LABELS = {
+    'SettlementCase': 'settlement case',
+    'JamatiMember': 'jamati member',
+    'Education': 'education',
+    'Finance': 'finance',
+    'PhysicalMentalHealth': 'physical and mental health',
+    'SocialInclusionAgency': 'social inclusion agency',
+}
+
+def build_table_query(table, allowed_regions=None, columns=None):
+    """Build the (query, params) pair used to load a table
+    
+    The region filter is applied to SettlementCase.Region and pushed down through
+    joins to the dependent tables, with the regions bound as a single array
+    parameter. The statement text is therefore the same for every user and its
+    size does not grow with the number of cases or people being loaded.
+    
+    Args:
+        table: Table to load
+        allowed_regions: Optional list of region codes to filter by
+        columns: Columns to select; defaults to the manifest union from required_columns()
+    """
+    if columns is None:
+        columns = required_columns(table) or ['*']
+    region_filter = bool(allowed_regions)
+    params = (list(allowed_regions),) if region_filter else None
+    
+    if table == 'SettlementCase':
+        query = f"SELECT {_select_list('sc', columns)} FROM SettlementCase sc"
+        if region_filter:
+            query += " WHERE sc.Region = ANY(%s)"
+    elif table == 'JamatiMember':
+        query = f"SELECT {_select_list('jm', columns)} FROM JamatiMember jm"
+        if region_filter:
+            query += (
+                " JOIN SettlementCase sc ON sc.CaseID = jm.CaseID"
+                " WHERE sc.Region = ANY(%s)"
+            )
+    elif table in DOMAIN_TABLES:
+        query = f"SELECT {_select_list('t', columns)} FROM {table} t"
+        if region_filter:
+            query += (
+                " JOIN JamatiMember jm ON jm.PersonID = t.PersonID"
+                " JOIN SettlementCase sc ON sc.CaseID = jm.CaseID"
+                " WHERE sc.Region = ANY(%s)"
+            )
+        else:
+            query += " WHERE t.PersonID IS NOT NULL"
+    elif table == 'fdp_cases':
+        query = f"SELECT {_select_list('f', columns)} FROM fdp_cases f"
+        if region_filter:
+            query += " WHERE f.region = ANY(%s)"
+    else:
+        raise ValueError(f"Unknown table: {table}")
+    
+    return query, params
+
+def _select_list(alias, columns):
+    """Qualify manifest column names with the table alias"""
+    return ", ".join(f"{alias}.{column}" for column in columns)
+
+def fetch_table(conn, table, allowed_regions=None, columns=None, loader=None):
+    """Load one table into a DataFrame using the region-filtered query"""
+    query, params = build_table_query(table, allowed_regions, columns)
+    label = f"load {table}" if not allowed_regions else f"load {table} by region"
+    if (loader or DATA_LOADER) == 'stream' and COMPACT_DTYPES:
+        # Build the categorical and datetime64 columns chunk by chunk instead of compacting an object copy later
+        with track_query(query, label) as entry:
+            frame = read_frame_stream(conn, query, params, category_columns=CATEGORY_COLUMNS.get(table, []), dates_as_datetime=True)
+            entry.update(rows=len(frame), bytes=approximate_frame_bytes(frame))
+        return frame
+    return read_frame(conn, query, params, loader=loader, label=label)
+
+# PostgreSQL type OIDs that need converting when parsing COPY output or streamed rows
+INTEGER_TYPE_OIDS = {20, 21, 23}
+FLOAT_TYPE_OIDS = {700, 701, 1700}
+NUMERIC_TYPE_OID = 1700
+BOOLEAN_TYPE_OIDS = {16}
+DATE_TYPE_OIDS = {1082}
+TIMESTAMP_TYPE_OIDS = {1114}
+TEXT_TYPE_OIDS = {25, 1042, 1043}
+
+def read_frame(conn, query, params=None, loader=None, label=None):
+    """Run a query into a DataFrame using the configured transfer path
+    
+    Args:
+        loader: "read_sql", "copy" or "stream"; defaults to the DATA_LOADER setting
+        label: Query type recorded by the query log; derived from the statement by default
+    """
+    loader = loader or DATA_LOADER
+    if loader not in ('read_sql', 'copy', 'stream'):
+        raise ValueError(f"Unknown data loader: {loader}")
+    with track_query(query, label) as entry:
+        if loader == 'copy':
+            frame = read_frame_copy(conn, query, params)
+        elif loader == 'stream':
+            frame = read_frame_stream(conn, query, params)
+        else:
+            frame = pd.read_sql(query, conn, params=params)
+        entry.update(rows=len(frame), bytes=approximate_frame_bytes(frame))
+    return frame
+
+def read_frame_copy(conn, query, params=None):
+    """Stream a query through COPY ... TO STDOUT (CSV) into a columnar CSV reader
+    
+    This skips building a Python tuple per row in the driver. NULLs are written as
+    \\N so they stay distinct from empty strings; booleans and dates are converted
+    afterwards from the column types reported by the server.
+    """
+    encoding = psycopg2.extensions.encodings.get(conn.encoding, 'utf-8')
+    with conn.cursor() as cursor:
+        # COPY cannot take bind parameters, so inline them with the driver's quoting
+        statement = cursor.mogrify(query, params).decode(encoding)
+        cursor.execute(f"SELECT * FROM ({statement}) AS q LIMIT 0")
+        column_types = [(column.name, column.type_code) for column in cursor.description]
+        buffer = io.BytesIO()
+        cursor.copy_expert(
+            f"COPY ({statement}) TO STDOUT WITH (FORMAT csv, HEADER true, NULL '\\N', ENCODING 'UTF8')",
+            buffer,
+        )
+    buffer.seek(0)
+    
+    if pa_csv is not None:
+        return _parse_copy_arrow(buffer, column_types)
+    return _parse_copy_pandas(buffer, column_types)
+
+def read_frame_stream(conn, query, params=None, fetch_size=None, category_columns=(), dates_as_datetime=False):
+    """Stream a query through a named (server-side) cursor, converting each chunk as it arrives
+    
+    The server holds the result and hands it over ``fetch_size`` rows at a time,
+    so the driver never buffers more than one chunk of row tuples. Each chunk is
+    turned into an Arrow record batch straight away, and the batches are handed
+    to pandas at the end with ``self_destruct`` so their buffers are released as
+    the columns are converted. Peak memory therefore stays close to the final
+    frame instead of the driver result plus the frame. Without pyarrow the
+    chunks are kept as DataFrames and concatenated.
+    
+    Args:
+        fetch_size: Rows per round trip; defaults to the STREAM_FETCH_SIZE setting
+        category_columns: Text columns to dictionary-encode per chunk and return as
+            categoricals (with sorted categories, as ``astype('category')`` gives)
+        dates_as_datetime: Return DATE columns as datetime64 instead of date objects
+    """
+    fetch_size = fetch_size or STREAM_FETCH_SIZE
+    batches = []
+    # Named cursors live inside the connection's transaction; returning the connection rolls it back
+    with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cursor:
+        cursor.itersize = fetch_size
+        cursor.execute(query, params)
+        rows = cursor.fetchmany(fetch_size)
+        column_types = [(column.name, column.type_code) for column in cursor.description]
+        arrow_types = _arrow_types(column_types, infer_other=True) if pa is not None else None
+        while rows:
+            batches.append(_stream_chunk(rows, column_types, arrow_types, category_columns, dates_as_datetime))
+            rows = cursor.fetchmany(fetch_size)
+    
+    if not batches:
+        return pd.DataFrame(columns=[name for name, _ in column_types])
+    if pa is None:
+        return pd.concat(batches, ignore_index=True)
+    # Each chunk has its own dictionary; unify them so each column converts to one categorical
+    table = pa.Table.from_batches(batches).unify_dictionaries()
+    del batches
+    frame = table.to_pandas(self_destruct=True, split_blocks=True)
+    for name in category_columns:
+        if name in frame.columns:
+            frame[name] = frame[name].cat.reorder_categories(sorted(frame[name].cat.categories))
+    return frame
+
+def _stream_chunk(rows, column_types, arrow_types, category_columns, dates_as_datetime):
+    """Convert one chunk of row tuples to a record batch (or a DataFrame without pyarrow)"""
+    if arrow_types is None:
+        return pd.DataFrame.from_records(rows, columns=[name for name, _ in column_types], coerce_float=True)
+    
+    arrays = []
+    for (name, type_oid), values in zip(column_types, zip(*rows)):
+        if type_oid == NUMERIC_TYPE_OID:
+            # Decimal values become floats, as pd.read_sql does with coerce_float
+            values = [None if value is None else float(value) for value in values]
+        array = pa.array(values, type=arrow_types[name])
+        if name in category_columns:
+            array = array.dictionary_encode()
+        elif dates_as_datetime and type_oid in DATE_TYPE_OIDS:
+            array = array.cast(pa.timestamp('ns'))
+        arrays.append(array)
+    return pa.RecordBatch.from_arrays(arrays, names=[name for name, _ in column_types])
 
-def fetch_all_data(allowed_regions=None):
+def _arrow_types(column_types, infer_other=False):
+    """Map server column types to Arrow types
+    
+    Other types are read as strings (COPY output is text), or left as None for
+    pyarrow to infer when ``infer_other`` is set (streamed values are Python objects).
+    """
+    arrow_types = {}
+    for name, type_oid in column_types:
+        if type_oid in INTEGER_TYPE_OIDS:
+            arrow_types[name] = pa.int64()
+        elif type_oid in FLOAT_TYPE_OIDS:
+            arrow_types[name] = pa.float64()
+        elif type_oid in BOOLEAN_TYPE_OIDS:
+            arrow_types[name] = pa.bool_()
+        elif type_oid in DATE_TYPE_OIDS:
+            arrow_types[name] = pa.date32()
+        elif type_oid in TIMESTAMP_TYPE_OIDS:
+            arrow_types[name] = pa.timestamp('us')
+        elif type_oid in TEXT_TYPE_OIDS:
+            arrow_types[name] = pa.string()
+        else:
+            arrow_types[name] = None if infer_other else pa.string()
+    return arrow_types
+
+def _parse_copy_arrow(buffer, column_types):
+    """Parse COPY CSV output with pyarrow's multithreaded reader"""
+    arrow_types = _arrow_types(column_types)
+    
+    table = pa_csv.read_csv(
+        buffer,
+        convert_options=pa_csv.ConvertOptions(
+            column_types=arrow_types,
+            null_values=['\\N'],
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False,
+            true_values=['t'],
+            false_values=['f'],
+        ),
+    )
+    # Dates come back as datetime.date objects and timestamps as datetime64, like pd.read_sql
+    return table.to_pandas()
+
+def _parse_copy_pandas(buffer, column_types):
+    """Parse COPY CSV output with pandas' C reader when pyarrow is unavailable"""
+    column_dtypes = {}
+    for name, type_oid in column_types:
+        if type_oid in FLOAT_TYPE_OIDS:
+            column_dtypes[name] = 'float64'
+        elif type_oid not in INTEGER_TYPE_OIDS:
+            column_dtypes[name] = str
+    frame = pd.read_csv(buffer, dtype=column_dtypes, na_values=['\\N'], keep_default_na=False)
+    
+    for name, type_oid in column_types:
+        if column_dtypes.get(name) is not str:
+            continue
+        values = frame[name].astype(object).where(frame[name].notna(), None)
+        if type_oid in BOOLEAN_TYPE_OIDS:
+            values = values.map({'t': True, 'f': False, None: None})
+            frame[name] = values.astype(bool) if values.notna().all() else values
+        elif type_oid in DATE_TYPE_OIDS:
+            frame[name] = pd.to_datetime(values).dt.date
+        elif type_oid in TIMESTAMP_TYPE_OIDS:
+            frame[name] = pd.to_datetime(values)
+        else:
+            # Match pd.read_sql, which returns None (not NaN) for NULL text
+            frame[name] = values
+    
+    return frame
+
+@profiled
+def fetch_all_data(allowed_regions=None, parallel=None, tables=None):
     """Fetch all required data from the database
     
     Args:
         allowed_regions: Optional list of region codes to filter by. If None, returns all data.
+        parallel: Load the tables concurrently on separate pooled connections.
+            Defaults to the PARALLEL_TABLE_FETCH setting.
+        tables: CMS tables to load, in the order they are returned. Defaults to CMS_TABLES.
     
     Returns:
         Tuple of dataframes: (df, jamati_member_df, education_df, finance_df, physical_mental_health_df, social_inclusion_agency_df)
+        by default, otherwise one per requested table. A domain table that failed to load in
+        parallel is None.
     """
+    if parallel is None:
+        parallel = PARALLEL_TABLE_FETCH
+    tables = list(tables or CMS_TABLES)
+    
     try:
-        conn = connect_to_database()
-        if not conn:
-            return None, None, None, None, None, None
-        
-        # Build region filter clause if regions are provided
-        # Fetch data from all tables
-        print("Fetching settlement case data...")
-        if allowed_regions and len(allowed_regions) > 0:
-            # Use parameterized query for region filtering
-            placeholders = ','.join(['%s'] * len(allowed_regions))
-            settlement_query = f"SELECT * FROM SettlementCase WHERE Region IN ({placeholders})"
-            df = pd.read_sql(settlement_query, conn, params=allowed_regions)
-        else:
-            settlement_query = "SELECT * FROM SettlementCase"
-            df = pd.read_sql(settlement_query, conn)
-        print("Settlement case data fetched successfully!")
-        
-        # If regions filtered, get only case IDs from filtered cases
-        if allowed_regions and len(allowed_regions) > 0 and not df.empty:
-            case_ids = df['caseid'].unique().tolist()
-            placeholders = ','.join(['%s'] * len(case_ids))
-            jamati_member_query = f"SELECT * FROM JamatiMember WHERE CaseID IN ({placeholders})"
-            print("Fetching jamati member data...")
-            jamati_member_df = pd.read_sql(jamati_member_query, conn, params=case_ids)
-            print("Jamati member data fetched successfully!")
-        else:
-            print("Fetching jamati member data...")
-            jamati_member_query = "SELECT * FROM JamatiMember"
-            jamati_member_df = pd.read_sql(jamati_member_query, conn)
-            print("Jamati member data fetched successfully!")
-        
-        # Filter other tables by PersonID if we have filtered jamati members
-        if not jamati_member_df.empty:
-            person_ids = jamati_member_df['personid'].unique().tolist()
-            placeholders = ','.join(['%s'] * len(person_ids))
-            
-            print("Fetching education data...")
-            education_query = f"SELECT * FROM Education WHERE PersonID IN ({placeholders})"
-            education_df = pd.read_sql(education_query, conn, params=person_ids)
-            print("Education data fetched successfully!")
-            
-            print("Fetching finance data...")
-            finance_query = f"SELECT * FROM Finance WHERE PersonID IN ({placeholders})"
-            finance_df = pd.read_sql(finance_query, conn, params=person_ids)
-            print("Finance data fetched successfully!")
-            
-            print("Fetching physical and mental health data...")
-            physical_mental_health_query = f"SELECT * FROM PhysicalMentalHealth WHERE PersonID IN ({placeholders})"
-            physical_mental_health_df = pd.read_sql(physical_mental_health_query, conn, params=person_ids)
-            print("Physical and mental health data fetched successfully!")
-            
-            print("Fetching social inclusion agency data...")
-            social_inclusion_agency_query = f"SELECT * FROM SocialInclusionAgency WHERE PersonID IN ({placeholders})"
-            social_inclusion_agency_df = pd.read_sql(social_inclusion_agency_query, conn, params=person_ids)
-            print("Social inclusion agency data fetched successfully!")
+        if parallel:
+            frames = _fetch_all_tables_parallel(allowed_regions, tables)
         else:
-            # If no jamati members, return empty dataframes
-            print("No jamati member data found. Returning empty dataframes.")
-            education_df = pd.DataFrame()
-            finance_df = pd.DataFrame()
-            physical_mental_health_df = pd.DataFrame()
-            social_inclusion_agency_df = pd.DataFrame()
+            with get_connection() as conn:
+                frames = []
+                for table in tables:
+                    frames.append(fetch_table(conn, table, allowed_regions))
         
-        # Close the connection
-        conn.close()
-        
-        return df, jamati_member_df, education_df, finance_df, physical_mental_health_df, social_inclusion_agency_df
+        if COMPACT_DTYPES:
+            # Replace each frame as it is compacted so only one table is held twice at a time
+            frames = list(frames)
+            for index, table in enumerate(tables):
+                if frames[index] is not None:
+                    frames[index] = compact_frame(frames[index], table)
+        return tuple(frames)
         
     except Exception as e:
         print(f"Error fetching data: {e}")
-        return None, None, None, None, None, None
+        return (None,) * len(tables)
+
+def _fetch_all_tables_parallel(allowed_regions, tables):
+    """Run every table query at once, each on its own pooled connection
+    
+    Because the region filter is pushed down into each query, none of them
+    depend on another's result. A failing domain table is returned as None so
+    the other tables still load and the caller can fetch it again later;
+    failures loading SettlementCase or JamatiMember are re-raised.
+    """
+    pool = get_connection_pool()
+    
+    def load(table):
+        with get_connection() as conn:
+            return fetch_table(conn, table, allowed_regions)
+    
+    # Leave one pooled connection free for other sessions while we load
+    max_workers = max(1, min(TABLE_FETCH_WORKERS, len(tables), pool.maxconn - 1))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch") as executor:
+        futures = {table: executor.submit(load, table) for table in tables}
+    
+    frames = []
+    for table, future in futures.items():
+        try:
+            frames.append(future.result())
+        except Exception as e:
+            if table not in DOMAIN_TABLES:
+                raise
+            print(f"Error fetching {TABLE_LABELS[table]} data: {e}")
+            frames.append(None)
+    
+    return tuple(frames)
+
+# Every table kept in the shared dataset; fdp_cases is loaded alongside the CMS tables
+CMS_TABLES = ['SettlementCase', 'JamatiMember'] + DOMAIN_TABLES
+DATASET_TABLES = CMS_TABLES + ['fdp_cases']
+
+def get_data_fingerprint():
+    """Return a cheap change marker for the dataset tables
+    
+    Uses the server's per-table insert/update/delete counters, so the cost is a
+    single catalog lookup regardless of table size. A statistics reset changes
+    the marker too, which only causes one unnecessary reload.
+    """
+    query = (
+        "SELECT relname, n_tup_ins, n_tup_upd, n_tup_del FROM pg_stat_user_tables "
+        "WHERE relname = ANY(%s) ORDER BY relname"
+    )
+    with get_connection() as conn:
+        with conn.cursor() as cursor, track_query(query, "data fingerprint") as entry:
+            cursor.execute(query, ([table.lower() for table in DATASET_TABLES],))
+            rows = cursor.fetchall()
+            entry.update(rows=len(rows), bytes=approximate_rows_bytes(rows))
+    return ';'.join(f"{name}:{ins}/{upd}/{dele}" for name, ins, upd, dele in rows)
+
+def updated_tables(previous, current):
+    """Return the dataset tables whose update counter differs between two data fingerprints
+
+    Every table counts as updated when ``previous`` is None (the dataset's
+    fingerprint is unknown), and a table missing from either one does too.
+    """
+    def update_counts(fingerprint):
+        counts = {}
+        for entry in (fingerprint or '').split(';'):
+            name, _, counters = entry.partition(':')
+            if counters.count('/') == 2:
+                counts[name] = counters.split('/')[1]
+        return counts
+
+    before, after = update_counts(previous), update_counts(current)
+    return [
+        table for table in DATASET_TABLES
+        if table.lower() not in before or before[table.lower()] != after.get(table.lower())
+    ]
+
+def fetch_full_dataset(tables=None):
+    """Fetch dataset tables for all regions as a dict of table name -> DataFrame
+
+    Args:
+        tables: Tables to load; defaults to every table in DATASET_TABLES
+
+    Domain tables that failed to load are left out of the result.
+    """
+    tables = list(tables or DATASET_TABLES)
+    cms_tables = [table for table in CMS_TABLES if table in tables]
+    dataset = {}
+    if cms_tables:
+        frames = fetch_all_data(tables=cms_tables)
+        if any(frame is None for table, frame in zip(cms_tables, frames) if table not in DOMAIN_TABLES):
+            raise RuntimeError("Failed to fetch data from the database")
+        dataset.update((table, frame) for table, frame in zip(cms_tables, frames) if frame is not None)
+    if 'fdp_cases' in tables:
+        with get_connection() as conn:
+            dataset['fdp_cases'] = fetch_table(conn, 'fdp_cases')
+    return dataset
+
+def refresh_regional_summaries():
+    """Recompute the regional_case_summary materialized view (see regional_summary.sql)
+
+    The refresh runs CONCURRENTLY, so readers keep the previous counts until it commits.
+
+    Returns:
+        True on success, False if the view is missing or the refresh failed
+    """
+    try:
+        query = "REFRESH MATERIALIZED VIEW CONCURRENTLY regional_case_summary"
+        with get_connection() as conn:
+            with conn.cursor() as cursor, track_query(query, "refresh regional summary"):
+                cursor.execute(query)
+            conn.commit()
+        return True
+
+    except Exception as e:
+        print(f"Error refreshing regional summaries: {e}")
+        return False
+
+def build_regional_summary_query(source, allowed_regions=None, start_date=None, end_date=None):
+    """Build the (query, params) pair that sums the regional_case_summary rows of one source
+
+    Args:
+        source: "CMS" or "FDP"
+        allowed_regions: Optional list of region codes to filter by. If None, returns all regions.
+        start_date, end_date: Optional inclusive creation date bounds
+    """
+    conditions = ["source = %s"]
+    params = [source]
+    if allowed_regions:
+        conditions.append("region = ANY(%s)")
+        params.append(list(allowed_regions))
+    if start_date:
+        conditions.append("creation_day >= %s")
+        params.append(start_date)
+    if end_date:
+        conditions.append("creation_day <= %s")
+        params.append(end_date)
+
+    query = (
+        'SELECT region, SUM(cases)::bigint AS "Number of Cases", SUM(individuals) AS "Number of Individuals", '
+        'SUM(open_cases)::bigint AS "Open Cases", SUM(closed_cases)::bigint AS "Closed Cases" '
+        f"FROM regional_case_summary WHERE {' AND '.join(conditions)} "
+        'GROUP BY region ORDER BY region COLLATE "C"'
+    )
+    return query, tuple(params)
+
+def fetch_regional_summary(source, allowed_regions=None, start_date=None, end_date=None):
+    """Fetch per-region case counts from the regional_case_summary view
+
+    Args: as for build_regional_summary_query()
+
+    Returns:
+        DataFrame with region, 'Number of Cases', 'Number of Individuals', 'Open Cases'
+        and 'Closed Cases' ordered by region, or None on failure
+    """
+    query, params = build_regional_summary_query(source, allowed_regions, start_date, end_date)
+    try:
+        with get_connection() as conn:
+            summary = read_frame(conn, query, params, loader='read_sql', label=f"regional summary {source}")
+    except Exception as e:
+        print(f"Error fetching regional summary: {e}")
+        return None
+
+    # CMS counts members; FDP sums its (float) family sizes, as the in-memory summary does
+    individuals = summary['Number of Individuals'].astype(float)
+    summary['Number of Individuals'] = individuals.astype(int) if source == "CMS" else individuals
+    return summary
+
+# Most recent activity on a case; GREATEST skips NULL dates
+CASE_ACTIVITY_DATE = "GREATEST(sc.CreationDate, sc.OpenReopenDate, sc.LastLogDate)"
+
+def build_delta_query(table, row_ids, parent_ids=None, since=None, columns=None):
+    """Build the (query, params) pair that loads the rows touched since the last sync
+
+    SettlementCase returns cases whose activity date is on or after ``since``;
+    JamatiMember returns the members of the cases in ``parent_ids``; the domain
+    tables return the rows of the people in ``parent_ids``. Every table also
+    returns the rows whose primary key is in ``row_ids``. Dates only have day
+    precision, so ``since`` is inclusive and same-day rows are fetched again.
+
+    Args:
+        table: One of CMS_TABLES
+        row_ids: Primary keys to load regardless of the other conditions
+        parent_ids: Case IDs (JamatiMember) or person IDs (domain tables)
+        since: Activity date watermark for SettlementCase
+        columns: Columns to select; defaults to the manifest union from required_columns()
+    """
+    if columns is None:
+        columns = required_columns(table) or ['*']
+    id_column = TABLE_KEYS[table][0]
+
+    if table == 'SettlementCase':
+        query = f"SELECT {_select_list('sc', columns)} FROM SettlementCase sc WHERE sc.{id_column} = ANY(%s)"
+        params = [list(row_ids)]
+        if since is not None:
+            query += f" OR {CASE_ACTIVITY_DATE} >= %s"
+            params.append(since)
+    elif table == 'JamatiMember':
+        query = (
+            f"SELECT {_select_list('jm', columns)} FROM JamatiMember jm"
+            " WHERE jm.PersonID = ANY(%s) OR jm.CaseID = ANY(%s)"
+        )
+        params = [list(row_ids), list(parent_ids or [])]
+    elif table in DOMAIN_TABLES:
+        query = (
+            f"SELECT {_select_list('t', columns)} FROM {table} t"
+            f" WHERE t.PersonID IS NOT NULL AND (t.{id_column} = ANY(%s) OR t.PersonID = ANY(%s))"
+        )
+        params = [list(row_ids), list(parent_ids or [])]
+    else:
+        raise ValueError(f"Delta queries are not supported for {table}")
+
+    return query, tuple(params)
+
+def fetch_key_sets(conn, tables=None):
+    """Return the current primary keys of the given CMS tables (default: all) as sets
+
+    These are primary-key index scans, far cheaper than reloading the rows, and
+    are compared with the cached keys to find inserted and deleted rows.
+    """
+    key_sets = {}
+    with conn.cursor() as cursor:
+        for table in tables or CMS_TABLES:
+            query = build_key_query(table)
+            with track_query(query, f"key set {table}") as entry:
+                cursor.execute(query)
+                rows = cursor.fetchall()
+                entry.update(rows=len(rows), bytes=approximate_rows_bytes(rows))
+            key_sets[table] = {row[0] for row in rows}
+    return key_sets
+
+def build_key_query(table):
+    """Build the query that lists a CMS table's primary keys (the rows a bulk load would return)"""
+    query = f"SELECT {TABLE_KEYS[table][0]} FROM {table}"
+    if table in DOMAIN_TABLES:
+        query += " WHERE PersonID IS NOT NULL"
+    return query
+
+def build_detail_query(table, by):
+    """Build the query that loads one person's or one case's rows of a domain table
+
+    Unlike the bulk queries this selects every column, comments included, and
+    takes a single key parameter.
+
+    Args:
+        table: One of DOMAIN_TABLES
+        by: 'person' to match PersonID, or 'case' to match the CaseID of the row's member
+    """
+    if table not in DOMAIN_TABLES:
+        raise ValueError(f"Detail queries are not supported for {table}")
+    id_column = TABLE_KEYS[table][0]
+    if by == 'person':
+        return f"SELECT t.* FROM {table} t WHERE t.PersonID = %s ORDER BY t.{id_column}"
+    if by == 'case':
+        return (
+            f"SELECT t.* FROM {table} t JOIN JamatiMember jm ON jm.PersonID = t.PersonID"
+            f" WHERE jm.CaseID = %s ORDER BY t.{id_column}"
+        )
+    raise ValueError(f"Unknown detail key: {by}")
+
+def _execute(cursor, query, params, label):
+    """Execute a statement under track_query, recording the cursor's rowcount"""
+    with track_query(query, label) as entry:
+        cursor.execute(query, params)
+        entry['rows'] = cursor.rowcount
+
+# Single-row lookups, shared with benchmarks.audit_queries so it explains the statements the app runs
+CASE_BY_ID_QUERY = "SELECT * FROM SettlementCase WHERE caseid = %s"
+CUSTOM_DATA_QUERY = "SELECT * FROM custom_data WHERE case_id = %s"
+CUSTOM_DATA_EXISTS_QUERY = "SELECT case_id FROM custom_data WHERE case_id = %s"
+SIGN_IN_QUERY = "SELECT id, email, first_name, last_name, regions FROM user_accounts WHERE email = %s AND password = %s"
+USER_REGIONS_QUERY = "SELECT regions FROM user_accounts WHERE id = %s"
 
 def get_case_data_by_id(case_id):
     """Fetch specific case data by case ID"""
     try:
-        conn = connect_to_database()
-        if not conn:
-            return None
-        
-        query = f"SELECT * FROM SettlementCase WHERE caseid = {case_id}"
-        case_data = pd.read_sql(query, conn)
-        conn.close()
+        with get_connection() as conn:
+            case_data = read_frame(conn, CASE_BY_ID_QUERY, (case_id,), loader='read_sql', label="case by id")
         
         return case_data.iloc[0] if not case_data.empty else None
         
@@ -114,26 +642,16 @@ def get_case_data_by_id(case_id):
 def get_custom_data_by_case_id(case_id):
     """Fetch custom data for a specific case ID"""
     try:
-        conn = connect_to_database()
-        if not conn:
-            return None
-        
-        query = "SELECT * FROM custom_data WHERE case_id = %s"
-        cursor = conn.cursor()
-        cursor.execute(query, (case_id,))
-        result = cursor.fetchone()
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                _execute(cursor, CUSTOM_DATA_QUERY, (case_id,), "custom data by case")
+                result = cursor.fetchone()
         
         if result:
             # Convert to dictionary
             columns = ['case_id', 'family_progress_status', 'languages_spoken', 'arrival_date']
-            custom_data = dict(zip(columns, result))
-            cursor.close()
-            conn.close()
-            return custom_data
-        else:
-            cursor.close()
-            conn.close()
-            return None
+            return dict(zip(columns, result))
+        return None
         
     except Exception as e:
         print(f"Error fetching custom data: {e}")
@@ -142,36 +660,29 @@ def get_custom_data_by_case_id(case_id):
 def save_custom_data(case_id, family_progress_status, languages_spoken, arrival_date):
     """Save or update custom data for a case"""
     try:
-        conn = connect_to_database()
-        if not conn:
-            return False
-        
-        cursor = conn.cursor()
-        
-        # Check if record exists
-        check_query = "SELECT case_id FROM custom_data WHERE case_id = %s"
-        cursor.execute(check_query, (case_id,))
-        exists = cursor.fetchone() is not None
-        
-        if exists:
-            # Update existing record
-            update_query = """
-                UPDATE custom_data 
-                SET family_progress_status = %s, languages_spoken = %s, arrival_date = %s
-                WHERE case_id = %s
-            """
-            cursor.execute(update_query, (family_progress_status, languages_spoken, arrival_date, case_id))
-        else:
-            # Insert new record
-            insert_query = """
-                INSERT INTO custom_data (case_id, family_progress_status, languages_spoken, arrival_date)
-                VALUES (%s, %s, %s, %s)
-            """
-            cursor.execute(insert_query, (case_id, family_progress_status, languages_spoken, arrival_date))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                # Check if record exists
+                _execute(cursor, CUSTOM_DATA_EXISTS_QUERY, (case_id,), "custom data by case")
+                exists = cursor.fetchone() is not None
+                
+                if exists:
+                    # Update existing record
+                    update_query = """
+                        UPDATE custom_data 
+                        SET family_progress_status = %s, languages_spoken = %s, arrival_date = %s
+                        WHERE case_id = %s
+                    """
+                    _execute(cursor, update_query, (family_progress_status, languages_spoken, arrival_date, case_id), "update custom data")
+                else:
+                    # Insert new record
+                    insert_query = """
+                        INSERT INTO custom_data (case_id, family_progress_status, languages_spoken, arrival_date)
+                        VALUES (%s, %s, %s, %s)
+                    """
+                    _execute(cursor, insert_query, (case_id, family_progress_status, languages_spoken, arrival_date), "insert custom data")
+            
+            conn.commit()
         return True
         
     except Exception as e:
@@ -181,18 +692,12 @@ def save_custom_data(case_id, family_progress_status, languages_spoken, arrival_
 def delete_custom_data(case_id):
     """Delete custom data for a specific case ID"""
     try:
-        conn = connect_to_database()
-        if not conn:
-            return False
-        
-        cursor = conn.cursor()
-        delete_query = "DELETE FROM custom_data WHERE case_id = %s"
-        cursor.execute(delete_query, (case_id,))
-        
-        rows_affected = cursor.rowcount
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                delete_query = "DELETE FROM custom_data WHERE case_id = %s"
+                _execute(cursor, delete_query, (case_id,), "delete custom data")
+                rows_affected = cursor.rowcount
+            conn.commit()
         
         return rows_affected > 0
         
@@ -203,17 +708,10 @@ def delete_custom_data(case_id):
 def authenticate_user(email, password):
     """Authenticate user by email and password"""
     try:
-        conn = connect_to_database()
-        if not conn:
-            return None
-        
-        cursor = conn.cursor()
-        query = "SELECT id, email, first_name, last_name, regions FROM user_accounts WHERE email = %s AND password = %s"
-        cursor.execute(query, (email, password))
-        result = cursor.fetchone()
-        
-        cursor.close()
-        conn.close()
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                _execute(cursor, SIGN_IN_QUERY, (email, password), "sign-in")
+                result = cursor.fetchone()
         
         if result:
             return {
@@ -232,17 +730,10 @@ def authenticate_user(email, password):
 def get_user_regions(user_id):
     """Get regions for a specific user"""
     try:
-        conn = connect_to_database()
-        if not conn:
-            return []
-        
-        cursor = conn.cursor()
-        query = "SELECT regions FROM user_accounts WHERE id = %s"
-        cursor.execute(query, (user_id,))
-        result = cursor.fetchone()
-        
-        cursor.close()
-        conn.close()
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                _execute(cursor, USER_REGIONS_QUERY, (user_id,), "user regions")
+                result = cursor.fetchone()
         
         if result and result[0]:
             return list(result[0])
@@ -250,4 +741,4 @@ def get_user_regions(user_id):
         
     except Exception as e:
         print(f"Error fetching user regions: {e}")
-        return []
\ No newline at end of file
+        return []
@@ -0,0 +1,97 @@
+"""Creation-date lookups over case frames ordered by region, then creation date.
+
+partition_dataset() orders SettlementCase by creationdate within each region,
+and normalize_fdp_cases() does the same for the FDP cases, so every case frame
+the Cases tab receives - the shared frame, a region's slice or several regions'
+slices concatenated - is a sequence of region blocks whose dates are sorted,
+with missing dates last. A DateIndex records those blocks once per frame; a
+date range is then a binary search in each block instead of two comparisons
+over every row, and the date pickers' bounds are read from it rather than
+scanned for on every rerun.
+"""
+import numpy as np
+import pandas as pd
+
+from frame_cache import cached_for_frame
+
+# Largest datetime64 value; missing dates are placed after every real date
+_LAST = np.iinfo(np.int64).max
+
+def date_sort_keys(dates):
+    """Return int64 sort keys for a datetime column that put missing dates last"""
+    keys = dates.to_numpy(dtype='datetime64[ns]').view(np.int64).copy()
+    keys[pd.isna(dates).to_numpy()] = _LAST
+    return keys
+
+class DateIndex:
+    """Block bounds and date range of a frame's creationdate column
+
+    ``ordered`` is False when the frame is not ordered by region then date (or
+    its dates are not datetimes); rows() then falls back to comparing every row.
+    """
+
+    def __init__(self, frame, column='creationdate'):
+        self.column = column
+        dates = frame[column]
+        self.ordered = pd.api.types.is_datetime64_any_dtype(dates)
+        self.blocks = []
+        self.min_date = dates.min() if self.ordered else None
+        self.max_date = dates.max() if self.ordered else None
+        if not self.ordered or frame.empty:
+            return
+
+        self._dates = dates.to_numpy(dtype='datetime64[ns]')
+        keys = date_sort_keys(dates)
+        regions = frame['region']
+        codes = regions.cat.codes.to_numpy() if isinstance(regions.dtype, pd.CategoricalDtype) else pd.factorize(regions)[0]
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(codes)) + 1])
+        stops = np.append(starts[1:], len(frame))
+        # Within each block the keys must not decrease
+        self.ordered = bool(np.all((np.diff(keys) >= 0) | (np.diff(codes) != 0)))
+        if not self.ordered:
+            return
+        missing = keys == _LAST
+        self.blocks = [
+            (int(start), int(stop), int(stop - np.count_nonzero(missing[start:stop])))
+            for start, stop in zip(starts, stops)
+        ]
+
+    def rows(self, frame, start=None, end=None):
+        """Return the rows of ``frame`` (the indexed frame) created from ``start`` to ``end`` inclusive
+
+        Either bound may be None. Rows without a date are never included when a
+        bound is given; the rows keep the frame's order.
+        """
+        if start is None and end is None:
+            return frame
+        dates = frame[self.column]
+        if not self.ordered:
+            mask = pd.Series(True, index=frame.index)
+            if start is not None:
+                mask &= dates >= start
+            if end is not None:
+                mask &= dates <= end
+            return frame[mask]
+
+        low = np.datetime64(pd.Timestamp(start), 'ns') if start is not None else None
+        high = np.datetime64(pd.Timestamp(end), 'ns') if end is not None else None
+        slices = []
+        for block_start, _, valid_stop in self.blocks:
+            block = self._dates[block_start:valid_stop]
+            first = np.searchsorted(block, low, 'left') if low is not None else 0
+            last = np.searchsorted(block, high, 'right') if high is not None else len(block)
+            if last <= first:
+                continue
+            if slices and slices[-1][1] == block_start + first:
+                # Adjacent to the previous block's rows, so one slice covers both
+                slices[-1] = (slices[-1][0], block_start + last)
+            else:
+                slices.append((block_start + first, block_start + last))
+        if len(slices) == 1:
+            return frame.iloc[slice(*slices[0])]
+        positions = np.concatenate([np.arange(a, b) for a, b in slices]) if slices else np.array([], dtype=np.int64)
+        return frame.iloc[positions]
+
+def get_date_index(frame):
+    """Return the DateIndex of a frame, building it the first time the frame is seen"""
+    return cached_for_frame(frame, 'date_index', DateIndex)
@@ -0,0 +1,169 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolTimeoutError(psycopg2.OperationalError):
+    """Raised when no pooled connection becomes free within the checkout timeout"""
+
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool with checkout health checks and metrics
+
+    Callers block (up to ``timeout`` seconds) when all ``maxconn`` connections are
+    checked out instead of failing immediately like ``ThreadedConnectionPool``.
+    ``minconn`` connections are opened up front; returned connections stay open
+    (up to ``maxconn``) for the next checkout, whereas ``ThreadedConnectionPool``
+    closes any beyond ``minconn``. Connections that sat idle longer than
+    ``health_check_interval`` seconds are probed with ``SELECT 1`` before being
+    handed out and replaced if they are dead.
+    """
+
+    def __init__(self, dsn, minconn=1, maxconn=10, timeout=30, health_check_interval=30):
+        self._dsn = dsn
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        # Open connections not checked out, as (connection, time returned), most recently returned last
+        self._idle = [(psycopg2.connect(dsn), None) for _ in range(minconn)]
+        self._closed = False
+        self._local = threading.local()
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._metrics = {
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'health_check_failures': 0,
+            'in_use': 0,
+            'peak_in_use': 0,
+            'total_wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+        }
+
+    def getconn(self):
+        """Check out a healthy connection, waiting for a free slot if necessary"""
+        started = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._metrics['waits'] += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self._metrics['timeouts'] += 1
+                raise PoolTimeoutError(
+                    f"No database connection available after {self.timeout}s "
+                    f"(pool size {self.maxconn})"
+                )
+
+        try:
+            conn = self._checkout_healthy()
+        except Exception:
+            self._slots.release()
+            raise
+
+        waited = time.perf_counter() - started
+        self._local.last_wait = waited
+        with self._lock:
+            self._metrics['checkouts'] += 1
+            self._metrics['in_use'] += 1
+            self._metrics['peak_in_use'] = max(self._metrics['peak_in_use'], self._metrics['in_use'])
+            self._metrics['total_wait_seconds'] += waited
+            self._metrics['max_wait_seconds'] = max(self._metrics['max_wait_seconds'], waited)
+        return conn
+
+    def putconn(self, conn, close=False):
+        """Return a connection to the pool, rolling back any open transaction"""
+        try:
+            if not conn.closed and not close:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+        except psycopg2.Error:
+            close = True
+        finally:
+            close = close or bool(conn.closed)
+            with self._lock:
+                close = close or self._closed or len(self._idle) >= self.maxconn
+                if not close:
+                    self._idle.append((conn, time.monotonic()))
+                self._metrics['in_use'] -= 1
+            if close:
+                self._close(conn)
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks out a connection and always returns it"""
+        conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+        except psycopg2.OperationalError:
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, close=broken or bool(conn.closed))
+
+    def last_wait_seconds(self):
+        """Time the current thread spent waiting for its most recent checkout"""
+        return getattr(self._local, 'last_wait', 0.0)
+
+    def metrics(self):
+        """Return a snapshot of the pool counters"""
+        with self._lock:
+            snapshot = dict(self._metrics)
+        snapshot['minconn'] = self.minconn
+        snapshot['maxconn'] = self.maxconn
+        snapshot['avg_wait_seconds'] = (
+            snapshot['total_wait_seconds'] / snapshot['checkouts'] if snapshot['checkouts'] else 0.0
+        )
+        return snapshot
+
+    def closeall(self):
+        """Close the idle connections; connections still checked out are closed when returned"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._close(conn)
+
+    def _checkout_healthy(self):
+        # Try a couple of times so a pool full of connections dropped by the
+        # server (e.g. after a failover) recovers without surfacing an error.
+        for _ in range(self.maxconn + 1):
+            with self._lock:
+                if self._closed:
+                    raise psycopg2.OperationalError("Connection pool is closed")
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                return psycopg2.connect(self._dsn)
+            conn, last_used = entry
+            if self._is_healthy(conn, last_used):
+                return conn
+            with self._lock:
+                self._metrics['health_check_failures'] += 1
+            self._close(conn)
+        raise psycopg2.OperationalError("Could not obtain a healthy database connection")
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _is_healthy(self, conn, last_used):
+        if conn.closed:
+            return False
+        if last_used is not None and time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
@@ -0,0 +1,128 @@
+"""Incremental refresh of the shared all-regions dataset.
+
+Instead of reloading every table, a sync keeps a high-water mark per table and
+only fetches what changed since the cached copy was taken:
+
+- SettlementCase: cases whose latest activity date (CreationDate,
+  OpenReopenDate or LastLogDate) is on or after the cached maximum, plus any
+  case ID not in the cache.
+- JamatiMember: every member of those cases, plus new person IDs (the SERIAL
+  key acts as the table's watermark).
+- Domain tables: every row of those members, plus new row IDs.
+
+Deleted rows are found by comparing the cached keys with the table's current
+key set. Rows edited in place carry no marker of their own, so a table whose
+update counter moved since the dataset was loaded (see
+database.updated_tables()) is reloaded in full instead. fdp_cases has no change
+tracking and is reloaded in full on every sync. Only the tables the dataset
+already holds are synced; the others are loaded when first needed.
+"""
+import pandas as pd
+
+from database import (
+    CMS_TABLES,
+    DOMAIN_TABLES,
+    build_delta_query,
+    fetch_key_sets,
+    fetch_table,
+    get_connection,
+    read_frame,
+)
+from column_manifest import TABLE_KEYS
+from config import COMPACT_DTYPES
+from frame_dtypes import compact_frame
+
+ACTIVITY_DATE_COLUMNS = ['creationdate', 'openreopendate', 'lastlogdate']
+
+# Column linking each dependent table to the table synced before it
+PARENT_COLUMNS = {'JamatiMember': 'caseid', **{table: 'personid' for table in DOMAIN_TABLES}}
+
+def case_activity_watermark(cases):
+    """Return the latest activity date in a SettlementCase frame, or None if it has none"""
+    latest = None
+    for column in ACTIVITY_DATE_COLUMNS:
+        if column not in cases.columns:
+            continue
+        value = pd.to_datetime(cases[column], errors='coerce').max()
+        if pd.notna(value) and (latest is None or value > latest):
+            latest = value
+    return latest.date() if latest is not None else None
+
+def merge_rows(cached, updates, id_column, deleted_ids):
+    """Replace cached rows by key with freshly fetched ones and drop deleted keys
+
+    Returns a new frame; the cached frame is shared with readers and is not modified.
+    """
+    stale = cached[id_column].isin(set(updates[id_column]) | deleted_ids)
+    kept = cached[~stale]
+    if updates.empty:
+        return kept.reset_index(drop=True)
+    if kept.empty:
+        return updates.reset_index(drop=True)
+    return pd.concat([kept, updates[cached.columns]], ignore_index=True)
+
+def sync_dataset(dataset, reload_tables=()):
+    """Bring a cached dataset up to date with the rows changed since it was loaded
+
+    Args:
+        dataset: Dict of table name -> DataFrame as returned by fetch_full_dataset()
+        reload_tables: Tables with rows updated in place since the dataset was
+            loaded; they are fetched in full
+
+    Returns:
+        Tuple of (new dataset dict, stats dict of table -> {'fetched', 'deleted', 'rows'})
+    """
+    synced = {}
+    stats = {}
+    tables = [table for table in CMS_TABLES if table in dataset]
+
+    with get_connection() as conn:
+        key_sets = fetch_key_sets(conn, tables)
+        parent_ids = set()
+        for table in tables:
+            cached = dataset[table]
+            id_column = TABLE_KEYS[table][0]
+            if table in reload_tables or id_column not in cached.columns:
+                # Edited rows cannot be told apart (or the table failed to load last time); fetch it in full
+                synced[table] = fetch_table(conn, table)
+                if COMPACT_DTYPES:
+                    synced[table] = compact_frame(synced[table], table)
+                stats[table] = {'fetched': len(synced[table]), 'deleted': 0, 'rows': len(synced[table])}
+                if table in reload_tables:
+                    # Edits to the next table's rows move its own update counter, so its rows need no refetch by parent
+                    parent_ids = set()
+                elif table in ('SettlementCase', 'JamatiMember'):
+                    parent_ids = set(synced[table][TABLE_KEYS[table][0]].tolist())
+                continue
+
+            cached_ids = set(cached[id_column].tolist())
+            row_ids = key_sets[table] - cached_ids
+            deleted_ids = cached_ids - key_sets[table]
+
+            if table == 'SettlementCase':
+                query, params = build_delta_query(table, row_ids, since=case_activity_watermark(cached))
+            else:
+                # Rows that hung off a changed parent are refetched too, in case they moved
+                parent_column = PARENT_COLUMNS[table]
+                row_ids |= set(cached.loc[cached[parent_column].isin(parent_ids), id_column].tolist())
+                query, params = build_delta_query(table, row_ids - deleted_ids, parent_ids=parent_ids)
+            updates = read_frame(conn, query, params, label=f"delta {table}")
+            if COMPACT_DTYPES:
+                updates = compact_frame(updates, table)
+
+            if table == 'SettlementCase':
+                parent_ids = set(updates['caseid'].tolist())
+            elif table == 'JamatiMember':
+                parent_ids = set(updates['personid'].tolist())
+
+            synced[table] = merge_rows(cached, updates, id_column, deleted_ids)
+            if COMPACT_DTYPES:
+                # Categories of the fetched rows differ from the cached ones, so concat falls back to object
+                synced[table] = compact_frame(synced[table], table)
+            stats[table] = {'fetched': len(updates), 'deleted': len(deleted_ids), 'rows': len(synced[table])}
+
+        if 'fdp_cases' in dataset:
+            synced['fdp_cases'] = fetch_table(conn, 'fdp_cases')
+            stats['fdp_cases'] = {'fetched': len(synced['fdp_cases']), 'deleted': 0, 'rows': len(synced['fdp_cases'])}
+
+    return synced, stats
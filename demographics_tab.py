@@ -1,7 +1,30 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from render_profiler import profile_section, profiled
 
+# Tables this tab reads from the shared dataset
+REQUIRED_TABLES = ['JamatiMember']
+
+def value_distribution(values):
+    """Return the counts of a column's values, leaving out nulls and empty strings"""
+    values = values.dropna()
+    return values[values != ""].value_counts().loc[lambda counts: counts > 0]
+
+def member_ages(jamati_member_df):
+    """Return the members with a plausible birth year, with an 'age' column"""
+    # Filter out rows with NaN or empty yearofbirth
+    valid_years_df = jamati_member_df.dropna(subset=['yearofbirth'])
+    valid_years_df = valid_years_df[valid_years_df['yearofbirth'] != ""]
+    
+    # Filter out yearofbirth values greater than 2024 or equal to 0
+    valid_years_df = valid_years_df[(valid_years_df['yearofbirth'] <= 2024) & (valid_years_df['yearofbirth'] > 1800)]
+
+    current_year = pd.Timestamp.now().year
+    valid_years_df['age'] = current_year - valid_years_df['yearofbirth']
+    return valid_years_df
+
+@profiled
 def render_demographics_tab(jamati_member_df):
     """Render the Jamati Demographics tab with demographics visualizations"""
     
@@ -9,26 +32,17 @@ def render_demographics_tab(jamati_member_df):
     col1, col2 = st.columns(2)
 
     with col1:
-        with st.expander("🌍 Country of Origin Distribution", expanded=False):
-            origin_counts = jamati_member_df['countryoforigin'].dropna()
-            origin_counts = origin_counts[origin_counts != ""].value_counts()
+        with st.expander("🌍 Country of Origin Distribution", expanded=False), profile_section("country of origin chart"):
+            origin_counts = value_distribution(jamati_member_df['countryoforigin'])
 
             fig = px.pie(origin_counts, values=origin_counts.values, names=origin_counts.index, title='Country of Origin Distribution')
             st.plotly_chart(fig, use_container_width=True)
     
     with col2:
-        with st.expander("📊 Age Distribution", expanded=False):
+        with st.expander("📊 Age Distribution", expanded=False), profile_section("age chart"):
             # Calculate age from yearofbirth
             if 'yearofbirth' in jamati_member_df.columns:
-                # Filter out rows with NaN or empty yearofbirth
-                valid_years_df = jamati_member_df.dropna(subset=['yearofbirth'])
-                valid_years_df = valid_years_df[valid_years_df['yearofbirth'] != ""]
-                
-                # Filter out yearofbirth values greater than 2024 or equal to 0
-                valid_years_df = valid_years_df[(valid_years_df['yearofbirth'] <= 2024) & (valid_years_df['yearofbirth'] > 1800)]
-
-                current_year = pd.Timestamp.now().year
-                valid_years_df['age'] = current_year - valid_years_df['yearofbirth']
+                valid_years_df = member_ages(jamati_member_df)
                 
                 # Create a histogram of ages with visual distinction
                 age_histogram = px.histogram(valid_years_df, x='age', nbins=20, title='Age Distribution', opacity=0.8)
@@ -39,11 +53,10 @@ def render_demographics_tab(jamati_member_df):
                 st.write("Year of birth data is not available in the dataset.")
 
     # Add education level visualization
-    with st.expander("🎓 Education Level Distribution", expanded=False):
+    with st.expander("🎓 Education Level Distribution", expanded=False), profile_section("education level chart"):
         if 'educationlevel' in jamati_member_df.columns:
             # Filter out null values and empty strings, then get value counts
-            education_counts = jamati_member_df['educationlevel'].dropna()
-            education_counts = education_counts[education_counts != ""].value_counts()
+            education_counts = value_distribution(jamati_member_df['educationlevel'])
             
             if not education_counts.empty:  # Only create visualization if we have data
                 # Create a bar chart for education levels
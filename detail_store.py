@@ -0,0 +1,65 @@
+"""On-demand detail records for a single person or case.
+
+The lookup tabs show one member, or one case's family, at a time. Rather than
+holding the full domain tables they fetch those rows by key with
+fetch_person_details() or fetch_case_details(). Results are kept in a bounded,
+process-wide LRU cache shared by every session; it is cleared whenever the
+shared dataset is refreshed, so details never outlive the data shown beside them.
+"""
+import pandas as pd
+
+from config import DETAIL_CACHE_MAX_ENTRIES
+from database import DOMAIN_TABLES, build_detail_query, get_connection, read_frame
+from lru_cache import LRUCache
+
+_detail_cache = LRUCache(DETAIL_CACHE_MAX_ENTRIES)
+
+def _fetch_details(by, key, tables):
+    """Return {table: rows matching ``key``}, querying only the tables not cached"""
+    details = {}
+    missing = []
+    for table in tables or DOMAIN_TABLES:
+        found, frame = _detail_cache.get((by, table, key))
+        if found:
+            details[table] = frame
+        else:
+            missing.append(table)
+    if not missing:
+        return details
+
+    try:
+        with get_connection() as conn:
+            for table in missing:
+                frame = read_frame(conn, build_detail_query(table, by), (key,), label=f"detail {table} by {by}")
+                _detail_cache.put((by, table, key), frame)
+                details[table] = frame
+    except Exception as e:
+        print(f"Error fetching {by} details for {key}: {e}")
+        for table in missing:
+            details.setdefault(table, pd.DataFrame(columns=['personid']))
+    return details
+
+def fetch_person_details(person_id, tables=None):
+    """Return {table: DataFrame} of one person's rows in the domain tables
+
+    Args:
+        person_id: JamatiMember.PersonID
+        tables: Domain tables to return; defaults to DOMAIN_TABLES
+    """
+    return _fetch_details('person', int(person_id), tables)
+
+def fetch_case_details(case_id, tables=None):
+    """Return {table: DataFrame} of the domain rows of every member of one case
+
+    One query per table covers the whole family, so a case lookup does not need
+    a round trip per member.
+    """
+    return _fetch_details('case', case_id, tables)
+
+def get_detail_cache_stats():
+    """Return {'entries', 'max_entries', 'hits', 'misses', 'evictions', 'hit_rate'} for the detail cache"""
+    return _detail_cache.stats()
+
+def clear_detail_cache():
+    """Forget every cached detail record, e.g. after the shared dataset was refreshed"""
+    _detail_cache.clear()
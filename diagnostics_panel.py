@@ -0,0 +1,141 @@
+"""Admin-only diagnostics for the sidebar.
+
+Shows the process-wide query log (see query_log) and connection pool counters,
+so slow pages can be traced to the queries behind them, the in-memory caches'
+hit rates, the memory saved by compact dtypes, and the session's last rerun
+profile (see render_profiler) when render_profiling is on. Only users listed in the admin_emails setting see it.
+"""
+import pandas as pd
+import streamlit as st
+
+from config import ADMIN_EMAILS, RENDER_PROFILING, SLOW_QUERY_MS
+from database import get_pool_metrics
+from detail_store import get_detail_cache_stats
+from figure_cache import get_figure_cache_stats
+from frame_dtypes import get_compaction_report
+from query_log import clear_query_log, get_query_log_stats, query_latency_percentiles, slow_queries
+from render_profiler import get_render_history, get_render_profile
+
+def is_admin(email):
+    """Return True if the signed-in user may see the diagnostics panel"""
+    return bool(email) and email.lower() in ADMIN_EMAILS
+
+def render_query_diagnostics():
+    """Render pool counters, latency percentiles per query type and the slowest recent queries"""
+    stats = get_query_log_stats()
+    st.caption(
+        f"Last {stats['buffered']:,} of {stats['total']:,} queries since the server started "
+        f"(keeps {stats['max_entries']:,})"
+    )
+
+    pool = get_pool_metrics()
+    if pool:
+        st.markdown(
+            f"**Connection pool:** {pool['in_use']}/{pool['maxconn']} in use (peak {pool['peak_in_use']}), "
+            f"{pool['waits']:,} waits, {pool['timeouts']:,} timeouts, "
+            f"avg wait {pool['avg_wait_seconds'] * 1000:.1f} ms"
+        )
+
+    st.markdown("**Latency by query type (ms)**")
+    latencies = query_latency_percentiles()
+    if latencies:
+        latency_df = pd.DataFrame(latencies)[
+            ['type', 'count', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'avg_wait_ms', 'rows', 'avg_bytes', 'errors']
+        ]
+        st.dataframe(latency_df.set_index('type'))
+    else:
+        st.write("No queries recorded yet.")
+
+    st.markdown(f"**Slow queries (≥ {SLOW_QUERY_MS:,.0f} ms)**")
+    slow = slow_queries()
+    if slow:
+        slow_df = pd.DataFrame(slow)[['at', 'type', 'duration_ms', 'rows', 'bytes', 'wait_ms', 'error', 'statement']]
+        st.dataframe(slow_df, hide_index=True)
+    else:
+        st.write("No slow queries in the log.")
+
+    if st.button("Clear query log", key="clear_query_log"):
+        clear_query_log()
+        st.rerun()
+
+def render_cache_diagnostics():
+    """Render the size and hit rate of the process-wide LRU caches"""
+    st.markdown("**Caches**")
+    caches = {'figures': get_figure_cache_stats(), 'detail records': get_detail_cache_stats()}
+    cache_df = pd.DataFrame([{'cache': name, **stats} for name, stats in caches.items()])
+    cache_df['hit_rate'] = (cache_df['hit_rate'] * 100).round(1).astype(str) + '%'
+    st.dataframe(cache_df.set_index('cache'))
+
+def render_compaction_diagnostics():
+    """Render each table's memory before and after its most recent dtype compaction"""
+    report = get_compaction_report()
+    if not report:
+        return
+    st.markdown("**Compact dtypes (last load of each table)**")
+    compaction_df = pd.DataFrame([
+        {
+            'table': table,
+            'rows': stats['rows'],
+            'loaded_mb': round(stats['before_bytes'] / 1_000_000, 1),
+            'compact_mb': round(stats['after_bytes'] / 1_000_000, 1),
+            'saved': f"{100 * (stats['before_bytes'] - stats['after_bytes']) / stats['before_bytes']:.0f}%"
+            if stats['before_bytes'] else None,
+        }
+        for table, stats in report.items()
+    ])
+    st.dataframe(compaction_df.set_index('table'))
+
+def render_rerun_profile():
+    """Render the timings of this session's last profiled rerun and the totals of the ones before it"""
+    if not RENDER_PROFILING:
+        return
+
+    profile = get_render_profile()
+    st.markdown("**Last rerun profile**")
+    if profile is None:
+        st.write("No profiled rerun yet.")
+        return
+
+    st.caption(f"{profile['total_ms']:,.0f} ms at {profile['at'].strftime('%H:%M:%S')}")
+    if profile['sections']:
+        sections_df = pd.DataFrame([
+            {
+                'section': '\u00a0\u00a0' * section['depth'] + section['name'],
+                'ms': section['ms'],
+                'frame_rows': section['frame_rows'],
+                'frame_mb': round(section['frame_bytes'] / 1_000_000, 2),
+                'payload_kb': round(section['payload_bytes'] / 1000, 1) if section['payload_bytes'] is not None else None,
+            }
+            for section in profile['sections']
+        ])
+        st.dataframe(sections_df, hide_index=True)
+    render_skipped_sections(profile['skipped'])
+    if profile['dump']:
+        st.caption(f"Profile written to {profile['dump']}")
+
+    history = get_render_history()
+    if len(history) > 1:
+        st.markdown("**Recent rerun totals (ms)**")
+        st.line_chart(pd.DataFrame(history).set_index('at')['total_ms'])
+
+def render_skipped_sections(skipped):
+    """Summarize the collapsed chart sections the last rerun did not build, and what that saved"""
+    if not skipped:
+        return
+    known = [section for section in skipped if section['ms'] is not None]
+    saved_ms = sum(section['ms'] for section in known)
+    saved_kb = sum(section['payload_bytes'] for section in known) / 1000
+    summary = f"{len(skipped)} collapsed chart section(s) not built"
+    if known:
+        summary += f", saving about {saved_ms:,.0f} ms and {saved_kb:,.0f} KB of chart payload"
+    if len(known) < len(skipped):
+        summary += f" ({len(skipped) - len(known)} not yet opened this session, so not estimated)"
+    st.caption(summary)
+    st.dataframe(pd.DataFrame([
+        {
+            'skipped section': section['name'],
+            'last built ms': section['ms'],
+            'payload_kb': round(section['payload_bytes'] / 1000, 1) if section['payload_bytes'] is not None else None,
+        }
+        for section in skipped
+    ]), hide_index=True)
@@ -0,0 +1,68 @@
+"""Normalization of the FDP cases into the CMS case layout.
+
+fdp_cases is a flat import with its own column names, a text creation date and
+FDP status labels. normalize_fdp_cases() renames the columns to their CMS
+equivalents, parses the date, maps the statuses and gives the frame the same
+dtypes and row order as SettlementCase, so the Cases tab can treat both
+sources alike. The data store runs it once per data version and region set
+(see data_store.load_fdp_cases()), not on every rerun.
+"""
+import pandas as pd
+
+from config import COMPACT_DTYPES
+
+# FDP column -> CMS SettlementCase column
+FDP_COLUMN_MAP = {
+    'access_case': 'caseid',
+    'settlement_case_status': 'status',
+    'family_last_name': 'lastname',
+    'head_of_family_first_name': 'firstname',
+    'state_code_2_digits': 'state',
+    'access_case_creation_date': 'creationdate',
+    'settlement_cm': 'assignedto',
+    'phone': 'phonenumber',
+    'current_location': 'city',
+    'zip_code': 'zip',
+}
+
+# FDP status -> CMS status; other values are kept as they are
+FDP_STATUS_MAP = {
+    'Active': 'Open',
+    'Closed': 'Closed',
+    'On Hold': 'Open',
+    'Completed': 'Closed',
+}
+
+# Columns the Cases tab reads from either source
+REQUIRED_COLUMNS = ['caseid', 'region', 'status', 'creationdate', 'firstname', 'lastname', 'state']
+
+# Stored as categoricals, like the same columns of SettlementCase
+CATEGORY_COLUMNS = ['region', 'status', 'state']
+
+def normalize_fdp_cases(fdp_raw):
+    """Return raw fdp_cases rows as a CMS-aligned frame
+
+    The input is a shared frame and is not modified.
+    """
+    # rename returns a new frame, so the shared one is untouched
+    fdp_df = fdp_raw.rename(columns=FDP_COLUMN_MAP)
+
+    # The creation date is stored as text
+    fdp_df['creationdate'] = pd.to_datetime(fdp_df['creationdate'], errors='coerce')
+    fdp_df['status'] = fdp_df['status'].map(FDP_STATUS_MAP).fillna(fdp_df['status'])
+
+    for col in REQUIRED_COLUMNS:
+        if col not in fdp_df.columns:
+            fdp_df[col] = 'N/A'
+
+    # Handle missing or null regions
+    fdp_df['region'] = fdp_df['region'].fillna('Unknown')
+
+    # Filter out any completely invalid rows
+    fdp_df = fdp_df.dropna(subset=['caseid'])
+
+    if COMPACT_DTYPES:
+        fdp_df = fdp_df.astype({col: 'category' for col in CATEGORY_COLUMNS})
+
+    # Order by region, then creation date, like the partitioned SettlementCase (see date_index)
+    return fdp_df.sort_values(['region', 'creationdate'], na_position='last', kind='stable').reset_index(drop=True)
@@ -0,0 +1,41 @@
+"""Plotly figures of the Cases tab, kept per data version and filter state.
+
+Switching back and forth between data sources, date ranges, regions and the
+Total/Open views rebuilds the same charts. cached_figure() keeps each built
+figure in a bounded, process-wide LRU cache shared by every session, keyed by
+the data version, the chart and the filters it was built for, so a repeated
+view skips both the aggregation and the figure construction. The cache is
+cleared when the shared dataset is refreshed; its hit rate is shown in the
+diagnostics panel.
+
+Streamlit serializes a copy of the figure it is given, so a cached figure is
+never modified by being shown.
+"""
+from config import FIGURE_CACHE_MAX_ENTRIES
+from lru_cache import LRUCache
+
+_figure_cache = LRUCache(FIGURE_CACHE_MAX_ENTRIES)
+
+def cached_figure(chart, filter_key, build):
+    """Return build()'s figure for one chart and filter state, calling build() only on a miss
+
+    Args:
+        chart: Name of the chart, unique within the tab
+        filter_key: Hashable tuple of the data version and everything else the
+            figure depends on (source, user regions, dates, region, view)
+        build: Callable returning the figure, or None when there is nothing to plot
+    """
+    key = (chart, filter_key)
+    found, fig = _figure_cache.get(key)
+    if not found:
+        fig = build()
+        _figure_cache.put(key, fig)
+    return fig
+
+def get_figure_cache_stats():
+    """Return {'entries', 'max_entries', 'hits', 'misses', 'evictions', 'hit_rate'} for the figure cache"""
+    return _figure_cache.stats()
+
+def clear_figure_cache():
+    """Forget every cached figure, e.g. after the shared dataset was refreshed"""
+    _figure_cache.clear()
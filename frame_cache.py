@@ -0,0 +1,32 @@
+"""Values derived from a DataFrame, computed once per frame object.
+
+The shared frames and region views live for a data version and are read by
+every rerun, so indexes and aggregates derived from them (see date_index and
+case_cube) are built on first use and kept alongside the frame until it is
+garbage collected, without hashing its contents.
+"""
+import threading
+import weakref
+
+_values = {}
+_lock = threading.Lock()
+
+def cached_for_frame(frame, name, build):
+    """Return build(frame), computed the first time ``name`` is asked for this frame object"""
+    key = (id(frame), name)
+    with _lock:
+        entry = _values.get(key)
+        if entry is not None and entry[0]() is frame:
+            return entry[1]
+
+    value = build(frame)
+    with _lock:
+        _values[key] = (weakref.ref(frame), value)
+    weakref.finalize(frame, _forget, key, value)
+    return value
+
+def _forget(key, value):
+    with _lock:
+        entry = _values.get(key)
+        if entry is not None and entry[1] is value:
+            del _values[key]
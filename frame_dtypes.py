@@ -0,0 +1,83 @@
+"""Compact dtypes for the loaded frames.
+
+pd.read_sql returns text as Python str objects, integer columns that contain
+NULL as float64, boolean columns that contain NULL as object and DATE columns
+as datetime.date objects. compact_frame() runs right after loading and converts
+low-cardinality text to categoricals, those integers and booleans to the
+nullable Int64/boolean dtypes and dates to datetime64, and records how much
+memory that saved for the diagnostics panel (get_compaction_report()).
+
+Renderers that test a single row's flags for truthiness should go through
+row_for_display(), because a missing nullable boolean is pd.NA rather than None.
+"""
+import pandas as pd
+from pandas.api.types import infer_dtype
+
+# Low-cardinality text columns stored as categoricals
+CATEGORY_COLUMNS = {
+    'SettlementCase': ['region', 'status', 'state', 'jamatkhana', 'assignedto', 'inputtype', 'city'],
+    'JamatiMember': ['countryoforigin', 'relationtohead', 'legalstatus', 'englishfluency', 'educationlevel'],
+    'Education': ['educationlevel', 'englishfluency', 'schoolgrade', 'academicperformance'],
+    'Finance': ['financedomainstatus', 'governmentbenefits', 'taxfiling', 'financialsupport', 'sendmoneybackhome'],
+    'PhysicalMentalHealth': [
+        'healthdomainstatus', 'typeofhealthinsurance', 'preventivecareexams',
+        'littleinterestorpleasurefrequency', 'depressionfrequency', 'anxiousfrequency',
+    ],
+    'SocialInclusionAgency': [
+        'socialinclusiondomainstatus', 'jkinstitutionalacceptance', 'attendjkhowoften', 'currentsituation',
+    ],
+}
+
+# INT columns that read_sql widens to float64 when they contain NULL
+INTEGER_COLUMNS = {
+    'SettlementCase': ['numfamilyemployed'],
+    'JamatiMember': ['yearofbirth', 'usarrivalyear'],
+}
+
+# Memory before/after the last compaction of each table, for diagnostics
+_compaction_report = {}
+
+def frame_memory(frame):
+    """Return the deep memory usage of a frame in bytes"""
+    return int(frame.memory_usage(deep=True).sum())
+
+def compact_frame(frame, table):
+    """Return a copy of a freshly loaded frame with compact dtypes
+
+    Columns already in their compact dtype are left alone, so frames merged from
+    compacted and freshly fetched rows can be passed through again.
+    """
+    before = frame_memory(frame)
+    compacted = frame.copy()
+
+    for column in CATEGORY_COLUMNS.get(table, []):
+        if column in compacted.columns and not isinstance(compacted[column].dtype, pd.CategoricalDtype):
+            compacted[column] = compacted[column].astype('category')
+
+    for column in INTEGER_COLUMNS.get(table, []):
+        if column in compacted.columns:
+            compacted[column] = compacted[column].astype('Int64')
+
+    for column in compacted.columns:
+        if compacted[column].dtype != object:
+            continue
+        kind = infer_dtype(compacted[column], skipna=True)
+        if kind == 'boolean':
+            compacted[column] = compacted[column].astype('boolean')
+        elif kind in ('date', 'datetime'):
+            compacted[column] = pd.to_datetime(compacted[column])
+
+    _compaction_report[table] = {'rows': len(compacted), 'before_bytes': before, 'after_bytes': frame_memory(compacted)}
+    return compacted
+
+def get_compaction_report():
+    """Return {table: {'rows', 'before_bytes', 'after_bytes'}} for the most recent compaction of each table"""
+    return dict(_compaction_report)
+
+def row_for_display(row):
+    """Return a single row with missing values as None
+
+    Compacted frames use pd.NA and NaT for missing values, which cannot be used
+    in an ``if``; None keeps the renderers' truthiness checks working.
+    """
+    return row.astype(object).where(row.notna(), None)
@@ -2,15 +2,22 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import re
+from detail_store import fetch_person_details
+from frame_dtypes import row_for_display
+from render_profiler import profiled
 
-def render_jamati_member_lookup_tab(jamati_member_df, education_df, finance_df, physical_mental_health_df, social_inclusion_agency_df):
+# Tables this tab reads from the shared dataset; domain rows are fetched per person by detail_store
+REQUIRED_TABLES = ['JamatiMember']
+
+@profiled
+def render_jamati_member_lookup_tab(jamati_member_df):
     """Render the Jamati Member Lookup tab with member lookup and data display"""
     
     st.subheader("Jamati Member Lookup")
     st.markdown("Search and view detailed information for any jamati member in the system.")
     
     # Member detailed lookup
-    render_member_detailed_lookup(jamati_member_df, education_df, finance_df, physical_mental_health_df, social_inclusion_agency_df)
+    render_member_detailed_lookup(jamati_member_df)
     
     st.markdown("---")
     
@@ -18,6 +25,23 @@ def render_jamati_member_lookup_tab(jamati_member_df, education_df, finance_df,
     st.markdown("## 📊 All Jamati Member Data")
     st.markdown("Complete dataset of all jamati members in the system.")
     
+    member_display_df = build_member_display_frame(jamati_member_df)
+    if member_display_df is not None:
+        # Add search functionality
+        st.markdown("### 🔍 Search Members")
+        search_term = st.text_input("Search by name, case ID, or person ID:", key="member_search")
+        
+        if search_term:
+            filtered_df = search_members(member_display_df, search_term)
+            st.markdown(f"**Found {len(filtered_df)} members matching '{search_term}'**")
+            st.dataframe(filtered_df, hide_index=True, use_container_width=True)
+        else:
+            st.dataframe(member_display_df, hide_index=True, use_container_width=True)
+    else:
+        st.error("No compatible columns found in jamati member data.")
+
+def build_member_display_frame(jamati_member_df):
+    """Return the member table shown by the lookup tab (with age, Yes/No booleans), or None if no column matches"""
     # Calculate age for display
     current_year = 2025
     display_df = jamati_member_df.copy()
@@ -53,37 +77,31 @@ def render_jamati_member_lookup_tab(jamati_member_df, education_df, finance_df,
                 available_cols.append(col_name)
                 break
     
-    if available_cols:
-        member_display_df = display_df[available_cols].copy()
-        
-        # Convert boolean columns to Yes/No for better readability
-        bool_columns = member_display_df.select_dtypes(include=['bool']).columns
-        for col in bool_columns:
-            member_display_df[col] = member_display_df[col].replace({True: 'Yes', False: 'No'})
-        
-        # Add search functionality
-        st.markdown("### 🔍 Search Members")
-        search_term = st.text_input("Search by name, case ID, or person ID:", key="member_search")
-        
-        if search_term:
-            # Create a mask for search
-            search_mask = pd.Series([False] * len(member_display_df))
-            
-            for col in member_display_df.columns:
-                if member_display_df[col].dtype == 'object':
-                    search_mask |= member_display_df[col].astype(str).str.contains(search_term, case=False, na=False)
-                elif pd.api.types.is_numeric_dtype(member_display_df[col]):
-                    search_mask |= member_display_df[col].astype(str).str.contains(search_term, na=False)
-            
-            filtered_df = member_display_df[search_mask]
-            st.markdown(f"**Found {len(filtered_df)} members matching '{search_term}'**")
-            st.dataframe(filtered_df, hide_index=True, use_container_width=True)
-        else:
-            st.dataframe(member_display_df, hide_index=True, use_container_width=True)
-    else:
-        st.error("No compatible columns found in jamati member data.")
+    if not available_cols:
+        return None
+    member_display_df = display_df[available_cols].copy()
+    
+    # Convert boolean columns to Yes/No for better readability
+    bool_columns = member_display_df.select_dtypes(include=['bool', 'boolean']).columns
+    for col in bool_columns:
+        member_display_df[col] = member_display_df[col].astype(object).replace({True: 'Yes', False: 'No'})
+    return member_display_df
 
-def render_member_detailed_lookup(jamati_member_df, education_df, finance_df, physical_mental_health_df, social_inclusion_agency_df):
+def search_members(member_display_df, search_term):
+    """Return the rows of the member table with a text or numeric column containing the search term"""
+    # Create a mask for search
+    search_mask = pd.Series(False, index=member_display_df.index)
+    
+    for col in member_display_df.columns:
+        if member_display_df[col].dtype == 'object' or isinstance(member_display_df[col].dtype, pd.CategoricalDtype):
+            search_mask |= member_display_df[col].astype(str).str.contains(search_term, case=False, na=False)
+        elif pd.api.types.is_numeric_dtype(member_display_df[col]):
+            search_mask |= member_display_df[col].astype(str).str.contains(search_term, na=False)
+    
+    return member_display_df[search_mask]
+
+@profiled
+def render_member_detailed_lookup(jamati_member_df):
     """Render the detailed member lookup section"""
     
     st.markdown("### 🔍 Member Detailed Lookup")
@@ -101,23 +119,10 @@ def render_member_detailed_lookup(jamati_member_df, education_df, finance_df, ph
     year_col = 'yearofbirth' if 'yearofbirth' in jamati_member_df.columns else 'YearOfBirth'
     
     # Calculate age for all members
-    current_year = 2025
-    display_df = jamati_member_df.copy()
-    if year_col in display_df.columns:
-        display_df['age'] = display_df[year_col].apply(
-            lambda x: current_year - x if pd.notna(x) and x != 0 else "Unknown"
-        )
-    else:
-        display_df['age'] = "Unknown"
+    display_df = with_member_ages(jamati_member_df, year_col)
     
     # Create options for the selectbox
-    member_options = []
-    for idx, member in display_df.iterrows():
-        member_name = f"{member[firstname_col]} {member[lastname_col]}"
-        member_id = member[person_id_col]
-        case_id = member[case_id_col]
-        age = member['age']
-        member_options.append(f"{member_name} (Age: {age}, Person ID: {member_id}, Case ID: {case_id})")
+    member_options = build_member_options(display_df, person_id_col, case_id_col, firstname_col, lastname_col)
     
     selected_member_option = st.selectbox(
         "Select a jamati member to view detailed information:",
@@ -130,12 +135,15 @@ def render_member_detailed_lookup(jamati_member_df, education_df, finance_df, ph
         person_id_match = re.search(r'Person ID: (\d+)', selected_member_option)
         if person_id_match:
             selected_person_id = int(person_id_match.group(1))
-            selected_member = display_df[display_df[person_id_col] == selected_person_id].iloc[0]
+            selected_member = row_for_display(display_df[display_df[person_id_col] == selected_person_id].iloc[0])
             
             # Display detailed member information
             st.markdown("---")
             st.markdown(f"## 👤 Detailed Information for {selected_member[firstname_col]} {selected_member[lastname_col]}")
             
+            # Domain records of this member, fetched by person ID
+            details = fetch_person_details(selected_person_id)
+            
             # Create tabs for different data categories
             member_tabs = st.tabs(["Personal Info", "Education", "Social Inclusion", "Finance", "Health", "Jamati Activity Eligibility"])
             
@@ -143,20 +151,43 @@ def render_member_detailed_lookup(jamati_member_df, education_df, finance_df, ph
                 render_personal_info_tab(selected_member, person_id_col, firstname_col, lastname_col)
             
             with member_tabs[1]:  # Education
-                render_education_tab(education_df, person_id_col, selected_person_id)
+                render_education_tab(details['Education'], person_id_col, selected_person_id)
             
             with member_tabs[2]:  # Social Inclusion
-                render_social_inclusion_tab(social_inclusion_agency_df, person_id_col, selected_person_id)
+                render_social_inclusion_tab(details['SocialInclusionAgency'], person_id_col, selected_person_id)
             
             with member_tabs[3]:  # Finance
-                render_finance_tab(finance_df, person_id_col, selected_person_id)
+                render_finance_tab(details['Finance'], person_id_col, selected_person_id)
             
             with member_tabs[4]:  # Health
-                render_health_tab(physical_mental_health_df, person_id_col, selected_person_id)
+                render_health_tab(details['PhysicalMentalHealth'], person_id_col, selected_person_id)
             
             with member_tabs[5]:  # Jamati Activity Eligibility
                 render_jamati_activity_eligibility_tab(selected_member, firstname_col)
 
+def with_member_ages(jamati_member_df, year_col):
+    """Return a copy of the members with an 'age' column ("Unknown" without a birth year)"""
+    current_year = 2025
+    display_df = jamati_member_df.copy()
+    if year_col in display_df.columns:
+        display_df['age'] = display_df[year_col].apply(
+            lambda x: current_year - x if pd.notna(x) and x != 0 else "Unknown"
+        )
+    else:
+        display_df['age'] = "Unknown"
+    return display_df
+
+def build_member_options(display_df, person_id_col, case_id_col, firstname_col, lastname_col):
+    """Return the member selectbox labels: name, age, person ID and case ID of every row"""
+    member_options = []
+    for idx, member in display_df.iterrows():
+        member_name = f"{member[firstname_col]} {member[lastname_col]}"
+        member_id = member[person_id_col]
+        case_id = member[case_id_col]
+        age = member['age']
+        member_options.append(f"{member_name} (Age: {age}, Person ID: {member_id}, Case ID: {case_id})")
+    return member_options
+
 def render_personal_info_tab(selected_member, person_id_col, firstname_col, lastname_col):
     """Render the personal info tab for a member"""
     col1, col2 = st.columns(2)
@@ -212,7 +243,7 @@ def render_education_tab(education_df, person_id_col, selected_person_id):
     member_education = education_df[education_df[person_id_col] == selected_person_id]
     
     if not member_education.empty:
-        edu = member_education.iloc[0]
+        edu = row_for_display(member_education.iloc[0])
         
         col1, col2 = st.columns(2)
         
@@ -268,7 +299,7 @@ def render_education_tab(education_df, person_id_col, selected_person_id):
             if disability_col in edu.index:
                 st.markdown(f"**Has Disability:** {'Yes' if edu[disability_col] else 'No'}")
         
-        # Display all comments
+        # Display all comments (detail rows include the comment columns)
         comments = []
         comment_fields = [
             'comfortablewithteachercomments',
@@ -291,7 +322,7 @@ def render_social_inclusion_tab(social_inclusion_agency_df, person_id_col, selec
     member_social = social_inclusion_agency_df[social_inclusion_agency_df[person_id_col] == selected_person_id]
     
     if not member_social.empty:
-        social = member_social.iloc[0]
+        social = row_for_display(member_social.iloc[0])
         
         col1, col2 = st.columns(2)
         
@@ -331,7 +362,7 @@ def render_social_inclusion_tab(social_inclusion_agency_df, person_id_col, selec
                     st.markdown(f"**JK Attendance Frequency:** {social[col]}")
                     break
         
-        # Display all comments
+        # Display all comments (detail rows include the comment columns)
         comments = []
         comment_fields = [
             'socialsupportcomments',
@@ -357,7 +388,7 @@ def render_finance_tab(finance_df, person_id_col, selected_person_id):
     member_finance = finance_df[finance_df[person_id_col] == selected_person_id]
     
     if not member_finance.empty:
-        finance = member_finance.iloc[0]
+        finance = row_for_display(member_finance.iloc[0])
         
         col1, col2 = st.columns(2)
         
@@ -403,7 +434,7 @@ def render_finance_tab(finance_df, person_id_col, selected_person_id):
                     st.markdown(f"**Receives Financial Support:** {'Yes' if finance[col] else 'No'}")
                     break
         
-        # Display all comments
+        # Display all comments (detail rows include the comment columns)
         comments = []
         comment_fields = [
             'governmentbenefits',
@@ -430,7 +461,7 @@ def render_health_tab(physical_mental_health_df, person_id_col, selected_person_
     member_health = physical_mental_health_df[physical_mental_health_df[person_id_col] == selected_person_id]
     
     if not member_health.empty:
-        health = member_health.iloc[0]
+        health = row_for_display(member_health.iloc[0])
         
         col1, col2 = st.columns(2)
         
@@ -470,7 +501,7 @@ def render_health_tab(physical_mental_health_df, person_id_col, selected_person_
                     st.markdown(f"**Currently in Counseling:** {'Yes' if health[col] else 'No'}")
                     break
         
-        # Display all comments
+        # Display all comments (detail rows include the comment columns)
         comments = []
         comment_fields = [
             'medicalcomments',
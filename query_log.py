@@ -0,0 +1,177 @@
+"""Instrumentation for the queries issued by the data access layer.
+
+Every query in database.py runs inside track_query(), which records its SQL
+fingerprint (the statement with literals and parameters replaced by ``?``),
+query type, duration, row count, approximate result size and the time spent
+waiting for a pooled connection. Records are kept in a process-wide ring buffer
+of the last query_log_size queries, for the admin diagnostics panel, and written
+as JSON to the ``settlement.queries`` logger: slow and failed queries at WARNING,
+the others at DEBUG.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+from config import QUERY_LOG_SIZE, SLOW_QUERY_MS
+
+logger = logging.getLogger("settlement.queries")
+
+# Rows measured when estimating a result's size; the total is scaled from them
+SIZE_SAMPLE_ROWS = 1000
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+_RELATION = re.compile(r"\b(?:from|into|update|view(?: concurrently)?)\s+([\w.]+)", re.IGNORECASE)
+
+class QueryLog:
+    """Thread-safe ring buffer of query records"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._records = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self._total = 0
+
+    def append(self, record):
+        with self._lock:
+            self._records.append(record)
+            self._total += 1
+
+    def records(self):
+        """Return the buffered records, oldest first"""
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def total(self):
+        """Return how many queries were recorded since the process started"""
+        with self._lock:
+            return self._total
+
+_query_log = QueryLog(QUERY_LOG_SIZE)
+# Connection wait of the thread's latest pool checkout, charged to the next query it runs
+_local = threading.local()
+
+def fingerprint_sql(query):
+    """Return the statement with literals and bind parameters replaced by ?, on one line"""
+    return ' '.join(_LITERAL.sub('?', query).split())
+
+def query_type(statement):
+    """Return a short label such as 'select settlementcase' for a statement without one"""
+    verb = statement.split(' ', 1)[0].lower()
+    match = _RELATION.search(statement)
+    return f"{verb} {match.group(1).lower()}" if match else verb
+
+def approximate_frame_bytes(frame):
+    """Estimate a DataFrame's in-memory size from the deep size of its first rows"""
+    if frame.empty:
+        return 0
+    sample = frame.iloc[:SIZE_SAMPLE_ROWS]
+    return int(sample.memory_usage(deep=True, index=False).sum() * len(frame) / len(sample))
+
+def approximate_rows_bytes(rows):
+    """Estimate the size of fetched row tuples from the text length of the first ones"""
+    if not rows:
+        return 0
+    sample = rows[:SIZE_SAMPLE_ROWS]
+    return int(sum(len(str(value)) for row in sample for value in row) * len(rows) / len(sample))
+
+def note_connection_wait(seconds):
+    """Remember how long this thread waited for the connection it just checked out"""
+    _local.pending_wait = seconds
+
+@contextmanager
+def track_query(query, label=None):
+    """Time the query run inside the with-block and record it
+
+    The block sets 'rows' and 'bytes' on the yielded dict once it has the result.
+    Exceptions are recorded and re-raised.
+    """
+    statement = fingerprint_sql(query)
+    entry = {'rows': None, 'bytes': None}
+    wait = getattr(_local, 'pending_wait', 0.0)
+    _local.pending_wait = 0.0
+    error = None
+    started = time.perf_counter()
+    try:
+        yield entry
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        record = {
+            'at': datetime.now().isoformat(timespec='milliseconds'),
+            'type': label or query_type(statement),
+            'fingerprint': hashlib.md5(statement.encode()).hexdigest()[:12],
+            'statement': statement,
+            'duration_ms': round(duration_ms, 2),
+            'rows': entry['rows'],
+            'bytes': entry['bytes'],
+            'wait_ms': round(wait * 1000, 2),
+            'error': error,
+            'thread': threading.current_thread().name,
+        }
+        _query_log.append(record)
+        slow = duration_ms >= SLOW_QUERY_MS
+        logger.log(logging.WARNING if slow or error else logging.DEBUG, json.dumps(record), extra={'query': record})
+
+def recent_queries(limit=None):
+    """Return the most recent query records, newest first"""
+    records = _query_log.records()[::-1]
+    return records[:limit] if limit else records
+
+def slow_queries(threshold_ms=None, limit=20):
+    """Return the slowest buffered queries at or above the threshold (default: slow_query_ms), slowest first"""
+    threshold_ms = SLOW_QUERY_MS if threshold_ms is None else threshold_ms
+    slow = [record for record in _query_log.records() if record['duration_ms'] >= threshold_ms]
+    return sorted(slow, key=lambda record: record['duration_ms'], reverse=True)[:limit]
+
+def query_latency_percentiles():
+    """Return per-type latency percentiles over the buffered queries, by total time spent
+
+    Returns:
+        List of dicts with type, count, errors, p50_ms, p95_ms, p99_ms, max_ms,
+        total_ms, rows, avg_bytes and avg_wait_ms
+    """
+    by_type = {}
+    for record in _query_log.records():
+        by_type.setdefault(record['type'], []).append(record)
+
+    summary = []
+    for kind, records in by_type.items():
+        durations = np.array([record['duration_ms'] for record in records])
+        p50, p95, p99 = np.percentile(durations, [50, 95, 99])
+        sizes = [record['bytes'] for record in records if record['bytes'] is not None]
+        summary.append({
+            'type': kind,
+            'count': len(records),
+            'errors': sum(1 for record in records if record['error']),
+            'p50_ms': round(float(p50), 2),
+            'p95_ms': round(float(p95), 2),
+            'p99_ms': round(float(p99), 2),
+            'max_ms': round(float(durations.max()), 2),
+            'total_ms': round(float(durations.sum()), 2),
+            'rows': sum(record['rows'] or 0 for record in records),
+            'avg_bytes': int(np.mean(sizes)) if sizes else None,
+            'avg_wait_ms': round(float(np.mean([record['wait_ms'] for record in records])), 2),
+        })
+    return sorted(summary, key=lambda row: row['total_ms'], reverse=True)
+
+def get_query_log_stats():
+    """Return {'buffered', 'max_entries', 'total'} for the query ring buffer"""
+    return {'buffered': len(_query_log.records()), 'max_entries': _query_log.max_entries, 'total': _query_log.total()}
+
+def clear_query_log():
+    """Empty the ring buffer; the total count is kept"""
+    _query_log.clear()
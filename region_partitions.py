@@ -0,0 +1,118 @@
+"""Region partitions of the shared dataset.
+
+partition_dataset() orders every table by the region its rows belong to - a
+case's own Region, a member's case, a domain row's member - so each region's
+SettlementCase, JamatiMember and domain rows form one contiguous block per
+table. Serving a region set is then a matter of slicing those blocks (a single
+region is a slice of the shared frames) and concatenating them, and
+region_rows() finds one region in any region-ordered frame by binary search
+instead of comparing every row. Within a region, cases are ordered by creation
+date (see date_index).
+"""
+import numpy as np
+import pandas as pd
+
+from database import DOMAIN_TABLES
+from date_index import date_sort_keys
+
+def _row_regions(frames, tables):
+    """Return {table: Series of each row's region (NaN where it has none)} for the given tables"""
+    cases = frames['SettlementCase']
+    case_region = pd.Series(cases['region'].astype(object).to_numpy(), index=cases['caseid'].to_numpy())
+    case_region = case_region[~case_region.index.duplicated()]
+
+    members = frames['JamatiMember']
+    member_region = members['caseid'].map(case_region)
+    person_region = pd.Series(member_region.to_numpy(), index=members['personid'].to_numpy())
+    person_region = person_region[~person_region.index.duplicated()]
+
+    regions = {}
+    for table in tables:
+        frame = frames[table]
+        if table == 'SettlementCase':
+            regions[table] = cases['region'].astype(object)
+        elif table == 'JamatiMember':
+            regions[table] = member_region
+        elif table in DOMAIN_TABLES:
+            regions[table] = frame['personid'].map(person_region) if 'personid' in frame.columns else pd.Series(np.nan, index=frame.index)
+        elif table == 'fdp_cases':
+            regions[table] = frame['region'].astype(object)
+    return regions
+
+def partition_dataset(frames, tables=None):
+    """Order tables by region and record where each region's rows are
+
+    Rows without a region (for example members of a case with no Region) are
+    placed after all regions and are only served to users who see every region.
+
+    Args:
+        frames: Dict of table name -> DataFrame; must hold SettlementCase and JamatiMember
+        tables: Tables to reorder (default: all of ``frames``); the others are returned as-is
+
+    Returns:
+        Tuple of (frames dict, partitions dict of table -> {region: (start, stop)} for ``tables``)
+    """
+    row_regions = _row_regions(frames, tables or list(frames))
+    all_regions = sorted({r for series in row_regions.values() for r in series.dropna().unique()})
+    region_codes = {region: code for code, region in enumerate(all_regions)}
+
+    partitioned = dict(frames)
+    partitions = {}
+    for table, regions in row_regions.items():
+        codes = regions.map(region_codes).fillna(len(all_regions)).to_numpy(dtype=np.int64)
+        frame = frames[table]
+        if 'creationdate' in frame.columns and pd.api.types.is_datetime64_any_dtype(frame['creationdate']):
+            # Cases are ordered by creation date within their region, for date_index
+            order = np.lexsort((date_sort_keys(frame['creationdate']), codes))
+        else:
+            order = np.argsort(codes, kind='stable')
+        partitioned[table] = frames[table].iloc[order].reset_index(drop=True)
+        bounds = np.searchsorted(codes[order], np.arange(len(all_regions) + 1))
+        partitions[table] = {
+            region: (int(bounds[code]), int(bounds[code + 1]))
+            for region, code in region_codes.items()
+            if bounds[code + 1] > bounds[code]
+        }
+    return partitioned, partitions
+
+def assemble_regions(frames, partitions, allowed_regions):
+    """Return {table: frame} holding only the partitions of the given regions
+
+    All regions returns the shared frames, a single region returns slices of
+    them, and several regions are concatenated in region order.
+    """
+    if not allowed_regions:
+        return dict(frames)
+
+    regions = sorted(set(allowed_regions))
+    assembled = {}
+    for table, frame in frames.items():
+        if table not in partitions:
+            assembled[table] = frame
+            continue
+        blocks = [frame.iloc[slice(*partitions[table][r])] for r in regions if r in partitions[table]]
+        if not blocks:
+            assembled[table] = frame.iloc[0:0]
+        elif len(blocks) == 1:
+            assembled[table] = blocks[0]
+        else:
+            assembled[table] = pd.concat(blocks)
+    return assembled
+
+def region_rows(frame, region):
+    """Return the rows of one region from a region-ordered frame
+
+    Uses a binary search over the categorical codes of ``region`` when the frame
+    is ordered by them (as partition_dataset() and any row filter of its output
+    leave it), and falls back to a boolean mask otherwise.
+    """
+    values = frame['region']
+    if isinstance(values.dtype, pd.CategoricalDtype) and region in values.cat.categories:
+        codes = values.cat.codes.to_numpy()
+        code = values.cat.categories.get_loc(region)
+        # Rows without a region (code -1) are ordered after every region
+        valid = np.count_nonzero(codes >= 0)
+        if np.all(codes[valid:] < 0) and np.all(np.diff(codes[:valid]) >= 0):
+            start, stop = np.searchsorted(codes[:valid], [code, code + 1])
+            return frame.iloc[start:stop]
+    return frame[values == region]
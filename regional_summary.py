@@ -0,0 +1,72 @@
+"""Per-region case counts for the Cases tab's Regional Summary.
+
+compute_regional_summary() flags each case row once - first row of its case in
+the region, open, closed, its number of individuals (for CMS a lookup of the
+case's member count rather than a scan of the members per region) - and sums
+the flags in a single grouping by region. A case repeated in the rows counts
+once per region. The regional_case_summary view (regional_summary.sql) counts
+distinct cases per region and creation day instead, so it gives the same counts
+only while each case has a single row, as the primary keys of SettlementCase and
+fdp_cases ensure; a case repeated on two days would count twice there.
+
+Summaries are memoized per filter state - data version, source, regions and
+dates - so the single and comparison views, every rerun and every session with
+the same filters share one computation (see cached_regional_summary()).
+"""
+import pandas as pd
+import streamlit as st
+
+from config import DATA_CACHE_TTL_SECONDS, SUMMARY_CACHE_MAX_ENTRIES
+
+OPEN_STATUSES = ['Open', 'Reopen']
+CLOSED_STATUSES = ['Closed']
+SUMMARY_COLUMNS = ['region', 'Number of Cases', 'Number of Individuals', 'Open Cases', 'Closed Cases']
+
+def compute_regional_summary(df, jamati_df, data_label):
+    """Return the number of cases, individuals, open and closed cases per region of ``df``
+
+    CMS individuals are the members of each region's cases in ``jamati_df``;
+    otherwise (FDP, or CMS without members) they are the sum of number_in_family.
+    A case is open or closed in a region if any of its rows there has that status.
+    """
+    keys = pd.DataFrame({'region': df['region'], 'caseid': df['caseid']})
+    # Each case counts once per region; only FDP imports can repeat a case
+    repeated = keys.duplicated()
+    has_repeats = repeated.any()
+    counted = df['caseid'].notna()
+
+    columns = {'region': df['region'], 'Number of Cases': counted & ~repeated}
+    if data_label == "CMS" and not jamati_df.empty:
+        members_per_case = jamati_df['caseid'].value_counts()
+        members = pd.Series(members_per_case.reindex(df['caseid'].to_numpy()).to_numpy(), index=df.index)
+        columns['Number of Individuals'] = members.fillna(0).astype(int).where(counted & ~repeated, 0)
+    elif 'number_in_family' in df.columns:
+        columns['Number of Individuals'] = df['number_in_family'].fillna(0)
+    else:
+        columns['Number of Individuals'] = 0
+
+    for column, statuses in (('Open Cases', OPEN_STATUSES), ('Closed Cases', CLOSED_STATUSES)):
+        matches = counted & df['status'].isin(statuses)
+        if has_repeats:
+            matches &= ~keys.assign(matches=matches).duplicated()
+        columns[column] = matches
+
+    summary = pd.DataFrame(columns).groupby('region', observed=True).sum().reset_index()
+    return summary[SUMMARY_COLUMNS]
+
+@st.cache_resource(ttl=DATA_CACHE_TTL_SECONDS, max_entries=SUMMARY_CACHE_MAX_ENTRIES, show_spinner=False)
+def _cached_summary(filter_key, _compute):
+    return _compute()
+
+def cached_regional_summary(filter_key, compute):
+    """Return compute()'s summary, computed once per filter key and shared across sessions
+
+    ``filter_key`` must identify the rows being summarized (the data version,
+    source, regions and dates they were filtered to). The returned frame is a
+    copy the caller may modify.
+    """
+    return _cached_summary(filter_key, compute).copy()
+
+def clear_summary_cache():
+    """Drop every memoized summary (after the shared dataset is replaced)"""
+    _cached_summary.clear()
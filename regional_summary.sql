@@ -0,0 +1,64 @@
+-- Materialized view: public.regional_case_summary
+--
+-- Per-region, per-day case counts for the Cases tab's Regional Summary, for both
+-- CMS (SettlementCase) and FDP (fdp_cases) data. The app sums the days inside the
+-- selected date range instead of aggregating every case row itself (see
+-- database.fetch_regional_summary()). It is refreshed after each data sync
+-- (database.refresh_regional_summaries()) and read only when the summary_views
+-- setting is on.
+
+-- DROP MATERIALIZED VIEW IF EXISTS public.regional_case_summary;
+-- DROP FUNCTION IF EXISTS public.settlement_try_date(text);
+
+-- fdp_cases stores its creation date as text; unparseable values become NULL like pd.to_datetime(errors='coerce')
+CREATE OR REPLACE FUNCTION public.settlement_try_date(value text)
+    RETURNS date
+    LANGUAGE plpgsql
+    IMMUTABLE
+AS $$
+BEGIN
+    RETURN value::date;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END;
+$$;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.regional_case_summary AS
+-- CMS: cases without a Region are left out, as the app's groupby drops them
+SELECT
+    'CMS'::text AS source,
+    sc.Region::text AS region,
+    sc.CreationDate AS creation_day,
+    COUNT(*) AS cases,
+    COUNT(*) FILTER (WHERE sc.Status IN ('Open', 'Reopen')) AS open_cases,
+    COUNT(*) FILTER (WHERE sc.Status = 'Closed') AS closed_cases,
+    COALESCE(SUM(members.individuals), 0) AS individuals
+FROM SettlementCase sc
+LEFT JOIN (
+    SELECT CaseID, COUNT(*) AS individuals FROM JamatiMember GROUP BY CaseID
+) members ON members.CaseID = sc.CaseID
+WHERE sc.Region IS NOT NULL
+GROUP BY sc.Region, sc.CreationDate
+
+UNION ALL
+
+-- FDP: statuses are matched before and after fdp_pipeline.FDP_STATUS_MAP maps them to CMS labels.
+-- Rows without an access_case are dropped as normalize_fdp_cases() drops them. access_case is the
+-- table's primary key, so each case counts once; were a case repeated on different days, it would
+-- count once per day here but once per region in compute_regional_summary()
+SELECT
+    'FDP'::text AS source,
+    COALESCE(f.region, 'Unknown') AS region,
+    public.settlement_try_date(f.access_case_creation_date) AS creation_day,
+    COUNT(DISTINCT f.access_case) AS cases,
+    COUNT(DISTINCT f.access_case) FILTER (WHERE f.settlement_case_status IN ('Active', 'On Hold', 'Open', 'Reopen')) AS open_cases,
+    COUNT(DISTINCT f.access_case) FILTER (WHERE f.settlement_case_status IN ('Closed', 'Completed')) AS closed_cases,
+    COALESCE(SUM(f.number_in_family), 0) AS individuals
+FROM public.fdp_cases f
+WHERE f.access_case IS NOT NULL
+GROUP BY COALESCE(f.region, 'Unknown'), public.settlement_try_date(f.access_case_creation_date)
+WITH DATA;
+
+-- Required by REFRESH MATERIALIZED VIEW CONCURRENTLY, which keeps the view readable while it runs
+CREATE UNIQUE INDEX IF NOT EXISTS regional_case_summary_key
+    ON public.regional_case_summary (source, region, creation_day);
@@ -0,0 +1,208 @@
+"""Opt-in timing of the work done in one Streamlit rerun.
+
+With the render_profiling setting on, the render_* functions and data loaders
+decorated with @profiled, and the chart blocks wrapped in profile_section(),
+record their wall time and the rows and approximate size of the DataFrames they
+receive and return. app.py brackets each rerun with start_rerun() and
+finish_rerun(); the finished profile is kept in the session for the admin
+diagnostics panel. Work done outside the rerun's thread (background refreshes,
+parallel table fetches) is not attributed to it.
+
+Setting SETTLEMENT_PROFILE_RERUNS to "cprofile" or "pyinstrument" also profiles
+every rerun and writes one file per rerun to SETTLEMENT_PROFILE_DIR (.prof files
+for cProfile, .html for pyinstrument).
+
+Chart sections built only while open (see chart_sections) report the size of
+the figures they send with record_chart_payload(), and the sections left closed
+with skip_section(); each rerun's profile then estimates the time and payload
+the closed sections saved from what they cost when last built in the session.
+
+With profiling off, @profiled returns the function unchanged and
+profile_section() and the chart hooks are no-ops, so they cost nothing.
+"""
+import cProfile
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import pandas as pd
+import plotly.io as pio
+import streamlit as st
+
+from config import PROFILE_DIR, PROFILE_RERUNS, RENDER_PROFILING
+from query_log import approximate_frame_bytes
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+except ImportError:
+    PyinstrumentProfiler = None
+
+# Reruns whose totals are kept for the diagnostics panel
+HISTORY_SIZE = 20
+
+_local = threading.local()
+
+def _frames_in(value):
+    """Yield the DataFrames in a value, a sequence of values or a dict's values"""
+    if isinstance(value, pd.DataFrame):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _frames_in(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _frames_in(item)
+
+def _frame_stats(values):
+    frames = [frame for value in values for frame in _frames_in(value)]
+    return sum(len(frame) for frame in frames), sum(approximate_frame_bytes(frame) for frame in frames)
+
+@contextmanager
+def _timed(name, inputs=()):
+    sections = getattr(_local, 'sections', None)
+    if sections is None:
+        # Not inside a profiled rerun on this thread
+        yield None
+        return
+    rows, nbytes = _frame_stats(inputs)
+    section = {
+        'name': name, 'depth': _local.depth, 'ms': None, 'frame_rows': rows, 'frame_bytes': nbytes,
+        'payload_bytes': None, 'measuring_seconds': 0.0,
+    }
+    sections.append(section)
+    _local.open_sections.append(section)
+    _local.depth += 1
+    started = time.perf_counter()
+    try:
+        yield section
+    finally:
+        # Time spent measuring payloads is the profiler's, not the section's
+        elapsed = time.perf_counter() - started - section.pop('measuring_seconds')
+        section['ms'] = round(elapsed * 1000, 2)
+        _local.open_sections.pop()
+        _local.depth -= 1
+
+def profiled(func):
+    """Time every call of a render function or loader within the current rerun"""
+    if not RENDER_PROFILING:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _timed(func.__name__, list(args) + list(kwargs.values())) as section:
+            result = func(*args, **kwargs)
+            if section is not None:
+                rows, nbytes = _frame_stats([result])
+                section['frame_rows'] += rows
+                section['frame_bytes'] += nbytes
+            return result
+    return wrapper
+
+def profile_section(name):
+    """Context manager timing one block of a rerun, such as building and sending a chart"""
+    if not RENDER_PROFILING:
+        return nullcontext()
+    return _timed(name)
+
+def record_chart_payload(fig):
+    """Add the serialized size of a plotly figure sent to the browser to the innermost open section"""
+    open_sections = getattr(_local, 'open_sections', None)
+    if getattr(_local, 'sections', None) is None or not open_sections:
+        return
+    started = time.perf_counter()
+    payload = len(pio.to_json(fig, validate=False))
+    section = open_sections[-1]
+    section['payload_bytes'] = (section['payload_bytes'] or 0) + payload
+    for open_section in open_sections:
+        open_section['measuring_seconds'] += time.perf_counter() - started
+
+def skip_section(name):
+    """Record that a collapsed chart section was not built in this rerun"""
+    skipped = getattr(_local, 'skipped', None)
+    if skipped is not None:
+        skipped.append(name)
+
+def start_rerun():
+    """Begin collecting this rerun's timings (and its profile, when dumps are enabled)"""
+    _stop_profiler()
+    _local.sections = [] if RENDER_PROFILING else None
+    _local.skipped = [] if RENDER_PROFILING else None
+    _local.open_sections = []
+    _local.depth = 0
+    _local.started = time.perf_counter()
+    _local.profiler = None
+    if PROFILE_RERUNS == 'pyinstrument' and PyinstrumentProfiler is not None:
+        _local.profiler = PyinstrumentProfiler()
+        _local.profiler.start()
+    elif PROFILE_RERUNS in ('cprofile', 'pyinstrument'):
+        if PROFILE_RERUNS == 'pyinstrument':
+            print("pyinstrument is not installed; profiling reruns with cProfile")
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            _local.profiler = profiler
+        except ValueError as e:
+            # Only one cProfile can run at a time; another session's rerun holds it
+            print(f"Rerun not profiled: {e}")
+
+def finish_rerun():
+    """Store this rerun's timings in the session and write its profile dump, if any"""
+    total_ms = round((time.perf_counter() - getattr(_local, 'started', time.perf_counter())) * 1000, 2)
+    dump_path = _stop_profiler()
+    sections = getattr(_local, 'sections', None)
+    skipped = getattr(_local, 'skipped', None) or []
+    _local.sections = None
+    _local.skipped = None
+    if sections is None:
+        return
+
+    # What each chart section cost when last built in this session, the estimate of what skipping it saves
+    costs = st.session_state.get('chart_section_costs', {})
+    for section in sections:
+        if section['payload_bytes'] is not None:
+            costs[section['name']] = {'ms': section['ms'], 'payload_bytes': section['payload_bytes']}
+    st.session_state.chart_section_costs = costs
+    skipped = [{'name': name, **costs.get(name, {'ms': None, 'payload_bytes': None})} for name in skipped]
+
+    profile = {
+        'at': datetime.now(), 'total_ms': total_ms, 'sections': sections, 'skipped': skipped, 'dump': dump_path,
+    }
+    st.session_state.render_profile = profile
+    history = st.session_state.get('render_profile_history', [])
+    history.append({'at': profile['at'], 'total_ms': total_ms})
+    st.session_state.render_profile_history = history[-HISTORY_SIZE:]
+
+def get_render_profile():
+    """Return the session's latest finished rerun profile, or None"""
+    return st.session_state.get('render_profile')
+
+def get_render_history():
+    """Return [{'at', 'total_ms'}] for the session's recent profiled reruns, oldest first"""
+    return st.session_state.get('render_profile_history', [])
+
+def _stop_profiler():
+    """Stop the thread's rerun profiler, if one is running, and write its dump; returns the file path"""
+    profiler = getattr(_local, 'profiler', None)
+    _local.profiler = None
+    if profiler is None:
+        return None
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = os.path.join(PROFILE_DIR, f"rerun-{datetime.now():%Y%m%d-%H%M%S-%f}")
+    try:
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+            path = f"{stem}.prof"
+            profiler.dump_stats(path)
+        else:
+            profiler.stop()
+            path = f"{stem}.html"
+            with open(path, 'w') as handle:
+                handle.write(profiler.output_html())
+        return path
+    except Exception as e:
+        print(f"Error writing rerun profile: {e}")
+        return None
@@ -0,0 +1,150 @@
+"""Versioned on-disk snapshots of the loaded tables.
+
+Each snapshot is a directory of uncompressed Arrow IPC (Feather v2) files, one
+per table, plus a ``manifest.json``. Snapshots are written to a temporary
+directory and renamed into place, and the ``LATEST`` pointer is only updated
+once a snapshot is complete, so readers never see a partial snapshot. A fresh
+process reads the latest snapshot instead of querying Postgres first. The files
+are memory-mapped, which only saves a separate read into a buffer: the tables are
+still converted to pandas, so every column is copied into memory on load.
+"""
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:
+    pa = feather = None
+
+LATEST_POINTER = 'LATEST'
+MANIFEST_FILE = 'manifest.json'
+
+def snapshots_available():
+    """Return True when pyarrow is installed so snapshots can be read and written"""
+    return feather is not None
+
+def write_snapshot(directory, frames, fingerprint=None, keep=3):
+    """Persist a dict of table name -> DataFrame as a new snapshot version
+
+    Args:
+        directory: Root snapshot directory (created if missing)
+        frames: Mapping of table name to DataFrame
+        fingerprint: Opaque value describing the source data, stored in the manifest
+        keep: Number of most recent snapshot versions to retain
+
+    Returns:
+        The new version string
+    """
+    os.makedirs(directory, exist_ok=True)
+    version = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    staging = os.path.join(directory, f'.{version}.tmp')
+    os.makedirs(staging)
+
+    try:
+        tables = {}
+        for name, frame in frames.items():
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            feather.write_feather(table, os.path.join(staging, f'{name}.arrow'), compression='uncompressed')
+            tables[name] = len(frame)
+
+        manifest = {
+            'version': version,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'fingerprint': fingerprint,
+            'tables': tables,
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as handle:
+            json.dump(manifest, handle, indent=2, default=str)
+
+        os.replace(staging, os.path.join(directory, version))
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    _write_pointer(directory, version)
+    prune_snapshots(directory, keep=keep)
+    return version
+
+def read_latest_snapshot(directory, tables=None):
+    """Read the most recent complete snapshot
+
+    Args:
+        directory: Root snapshot directory
+        tables: Tables to read (default: every table in the snapshot); ones it lacks are skipped
+
+    Returns:
+        Tuple of (manifest dict, dict of table name -> DataFrame), or None if no snapshot exists
+    """
+    version = latest_version(directory)
+    if version is None:
+        return None
+    return read_snapshot(directory, version, tables)
+
+def read_snapshot(directory, version, tables=None):
+    """Read tables of one snapshot version into DataFrames
+
+    Returns:
+        Tuple of (manifest dict, dict of table name -> DataFrame), or None if the version was pruned
+    """
+    path = os.path.join(directory, version)
+    try:
+        with open(os.path.join(path, MANIFEST_FILE)) as handle:
+            manifest = json.load(handle)
+    except FileNotFoundError:
+        return None
+
+    frames = {}
+    for name in manifest['tables']:
+        if tables is not None and name not in tables:
+            continue
+        # The conversion copies the mapped columns; mapping just avoids reading the file into a buffer first
+        table = feather.read_table(os.path.join(path, f'{name}.arrow'), memory_map=True)
+        frames[name] = table.to_pandas()
+    return manifest, frames
+
+def read_latest_manifest(directory):
+    """Return the manifest of the most recent snapshot without loading any table"""
+    version = latest_version(directory)
+    if version is None:
+        return None
+    with open(os.path.join(directory, version, MANIFEST_FILE)) as handle:
+        return json.load(handle)
+
+def latest_version(directory):
+    """Return the version named by the LATEST pointer, or None"""
+    try:
+        with open(os.path.join(directory, LATEST_POINTER)) as handle:
+            version = handle.read().strip()
+    except FileNotFoundError:
+        return None
+    if not version or not os.path.isdir(os.path.join(directory, version)):
+        return None
+    return version
+
+def prune_snapshots(directory, keep=3):
+    """Delete all but the ``keep`` newest snapshot versions"""
+    current = latest_version(directory)
+    versions = sorted(
+        entry for entry in os.listdir(directory)
+        if not entry.startswith('.') and os.path.isdir(os.path.join(directory, entry))
+    )
+    for version in versions[:-keep] if keep else versions:
+        if version != current:
+            shutil.rmtree(os.path.join(directory, version), ignore_errors=True)
+
+    # Staging directories left behind by a crashed writer
+    for entry in os.listdir(directory):
+        path = os.path.join(directory, entry)
+        if entry.endswith('.tmp') and os.path.isdir(path) and time.time() - os.path.getmtime(path) > 3600:
+            shutil.rmtree(path, ignore_errors=True)
+
+def _write_pointer(directory, version):
+    pointer = os.path.join(directory, LATEST_POINTER)
+    staging = f'{pointer}.tmp'
+    with open(staging, 'w') as handle:
+        handle.write(version)
+    os.replace(staging, pointer)